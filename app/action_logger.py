@@ -1,11 +1,17 @@
 from pynput import mouse, keyboard
+import queue
 import time
 import threading
 from datetime import datetime
 
+_STOP = None  # Queue sentinel that ends the consumer thread
+
 class ActionLogger:
     """
     Logs user input events (mouse clicks and keyboard activity) without recording specific keystrokes.
+
+    The pynput callbacks only push raw (kind, time, x, y) tuples into a SimpleQueue;
+    a consumer thread formats the log lines, and `stop_logging()` drains the queue.
     """
 
     def __init__(self):
@@ -14,30 +20,50 @@ class ActionLogger:
         self.mouse_listener = None
         self.keyboard_listener = None
         self.start_time = None
+        self._queue = queue.SimpleQueue()
+        self._consumer = None
+
+    def start_logging(self, listeners=True):
+        """
+        Starts logging mouse and keyboard events.
 
-    def start_logging(self):
-        """Starts logging mouse and keyboard events."""
+        Args:
+            listeners (bool): Hook the real mouse and keyboard; False only accepts direct callback calls.
+        """
         if not self.logging:
             self.logging = True
             self.logs = []
             self.start_time = time.time()
-            
-            # Setup listeners
-            self.mouse_listener = mouse.Listener(on_click=self._on_click)
-            self.keyboard_listener = keyboard.Listener(on_press=self._on_press)
-            
-            self.mouse_listener.start()
-            self.keyboard_listener.start()
+            self._queue = queue.SimpleQueue()
+            self._consumer = threading.Thread(target=self._consume, name="action-events", daemon=True)
+            self._consumer.start()
+
+            if listeners:
+                # Setup listeners
+                self.mouse_listener = mouse.Listener(on_click=self._on_click)
+                self.keyboard_listener = keyboard.Listener(on_press=self._on_press)
+
+                self.mouse_listener.start()
+                self.keyboard_listener.start()
             print("Action logging started...")
 
     def stop_logging(self):
         """Stops logging events and returns the log list."""
         if self.logging:
             self.logging = False
-            if self.mouse_listener:
-                self.mouse_listener.stop()
-            if self.keyboard_listener:
-                self.keyboard_listener.stop()
+            # Join the listeners before queuing the sentinel: a callback that already
+            # passed the `self.logging` check may still be putting its event
+            for listener in (self.mouse_listener, self.keyboard_listener):
+                if listener:
+                    listener.stop()
+            for listener in (self.mouse_listener, self.keyboard_listener):
+                if listener:
+                    listener.join()
+            self.mouse_listener = None
+            self.keyboard_listener = None
+            self._queue.put(_STOP)
+            self._consumer.join()
+            self._consumer = None
             print("Action logging stopped.")
             return self.logs
         return []
@@ -49,20 +75,28 @@ class ActionLogger:
     def _on_click(self, x, y, button, pressed):
         """Callback for mouse clicks."""
         if pressed and self.logging:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] Mouse Click at ({x}, {y})"
-            self.logs.append(log_entry)
+            self._queue.put(("click", time.time(), x, y))
 
     def _on_press(self, key):
         """Callback for key presses. Does not record the key itself."""
         if self.logging:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] Keyboard Activity Detected"
-            # Avoid spamming logs with every single key press if typing fast
-            # We could add a small debounce here if needed, but for now we log all.
-            # To reduce noise, we might only log unique events per second in a real app.
-            if not self.logs or self.logs[-1] != log_entry:
-                 self.logs.append(log_entry)
+            self._queue.put(("key", time.time(), None, None))
+
+    def _consume(self):
+        """Formats queued events into log lines."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            kind, event_time, x, y = item
+            timestamp = datetime.fromtimestamp(event_time).strftime("%H:%M:%S")
+            if kind == "click":
+                self.logs.append(f"[{timestamp}] Mouse Click at ({x}, {y})")
+            else:
+                log_entry = f"[{timestamp}] Keyboard Activity Detected"
+                # One keyboard line per second is enough to show typing
+                if not self.logs or self.logs[-1] != log_entry:
+                    self.logs.append(log_entry)
 
 if __name__ == "__main__":
     # Test the logger
@@ -1,52 +1,95 @@
 import cv2
-import numpy as np
 import mss
+import os
+import sys
 import threading
 import time
 from datetime import datetime
 
+# Ensure the project root is in the python path (also when this file is run directly)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.frame_queue import FrameQueue, LatestFrameSlot, DROP_OLDEST
+from src.utils.frame_convert import FrameConverter
+from src.services.preview_service import PreviewService
+
 class ScreenRecorder:
     """
     Records the screen activity to an MP4 video file.
-    Runs in a separate thread to avoid blocking the main application.
+
+    Capture and encoding run in separate threads: a producer thread grabs and
+    timestamps frames into a bounded FrameQueue, and one or more encoder workers
+    convert and write them, so a slow VideoWriter no longer throttles the capture.
+    The preview window is a separate low-rate consumer (PreviewService) that
+    never slows down the encoders.
     """
 
-    def __init__(self, output_file="output.mp4", fps=10.0):
+    def __init__(self, output_file="output.mp4", fps=10.0, queue_size=32,
+                 backpressure=DROP_OLDEST, encoder_workers=1, preview=True):
         """
         Initialize the ScreenRecorder.
 
         Args:
             output_file (str): Path to save the video file.
             fps (float): Frames per second for the recording.
+            queue_size (int): Capacity of the frame buffer between capture and encoding.
+            backpressure (str): What to do when the buffer is full ("drop_oldest" or "block").
+            encoder_workers (int): Number of threads converting and writing frames.
+            preview (bool): Show the preview window ('q' closes it, the recording goes on).
         """
         self.output_file = output_file
         self.fps = fps
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.encoder_workers = max(1, encoder_workers)
         self.recording = False
         self.thread = None
         self.width = 1920
         self.height = 1080
+        self.frames_captured = 0
+        self.frames_written = 0
         self._stop_event = threading.Event()
+        self._queue = None
+        self._writer = None
+        self._workers = []
+        self._write_cond = threading.Condition()
+        self._next_write = 0
+        self._preview_slot = LatestFrameSlot()
+        self.preview = PreviewService(self._preview_slot, enabled=preview)
+
+    @property
+    def frames_dropped(self):
+        """Number of frames discarded by the back-pressure policy."""
+        return self._queue.dropped if self._queue is not None else 0
 
     def start_recording(self):
         """Starts the screen recording in a separate thread."""
         if not self.recording:
             self.recording = True
             self._stop_event.clear()
+            self.frames_captured = 0
+            self.frames_written = 0
+            self._next_write = 0
+            self._queue = FrameQueue(maxsize=self.queue_size, policy=self.backpressure)
             self.thread = threading.Thread(target=self._record)
             self.thread.start()
+            self.preview.start()
             print(f"Started recording to {self.output_file}...")
 
     def stop_recording(self):
-        """Stops the screen recording."""
+        """Stops the screen recording and waits for the encoders to drain the buffer."""
         if self.recording:
             self.recording = False
             self._stop_event.set()
             if self.thread:
                 self.thread.join()
-            print("Recording stopped.")
+            self.preview.stop()
+            self._preview_slot.clear()
+            print(f"Recording stopped. {self.frames_written} frames written, "
+                  f"{self.frames_dropped} dropped.")
 
     def _record(self):
-        """Internal method to capture screen and write to video file."""
+        """Internal method to capture the screen and feed the encoder workers."""
         with mss.mss() as sct:
             # Get the primary monitor dimensions
             monitor = sct.monitors[1]
@@ -56,40 +99,63 @@ class ScreenRecorder:
             # Define the codec and create VideoWriter object
             # mp4v is a good option for MP4 files
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(self.output_file, fourcc, self.fps, (self.width, self.height))
+            self._writer = cv2.VideoWriter(self.output_file, fourcc, self.fps, (self.width, self.height))
+
+            self._workers = [
+                threading.Thread(target=self._encode_worker, name=f"encoder-{i}", daemon=True)
+                for i in range(self.encoder_workers)
+            ]
+            for worker in self._workers:
+                worker.start()
 
             frame_duration = 1.0 / self.fps
 
-            while not self._stop_event.is_set():
-                start_time = time.time()
-
-                # Capture the screen
-                img = sct.grab(monitor)
-                
-                # Convert to numpy array and then to BGR (OpenCV format)
-                frame = np.array(img)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
-                # Write the frame
-                out.write(frame)
-
-                # Visual Feedback
-                # Resize for preview to avoid taking up too much screen
-                preview_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-                cv2.imshow("Gravando Processo (Pressione 'q' para minimizar)", preview_frame)
-                
-                # Check for 'q' key to close the preview window (but continue recording)
-                # waitKey(1) is required for imshow to work
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    cv2.destroyAllWindows()
-
-                # Control FPS
-                elapsed = time.time() - start_time
-                wait_time = max(0, frame_duration - elapsed)
-                time.sleep(wait_time)
-
-            out.release()
-            cv2.destroyAllWindows()
+            try:
+                while not self._stop_event.is_set():
+                    start_time = time.time()
+
+                    # Capture the screen and stamp it; conversion happens in the workers
+                    img = sct.grab(monitor)
+                    self._queue.put((start_time, img))
+                    if self.preview.enabled:
+                        self._preview_slot.publish(img)
+                    self.frames_captured += 1
+
+                    # Control FPS
+                    elapsed = time.time() - start_time
+                    wait_time = max(0, frame_duration - elapsed)
+                    time.sleep(wait_time)
+            finally:
+                self._queue.close()
+                for worker in self._workers:
+                    worker.join()
+                self._writer.release()
+                self._writer = None
+
+    def _encode_worker(self):
+        """Converts queued frames to BGR and writes them in capture order."""
+        # Each worker converts into its own reused buffer; it is free again once the frame is written
+        converter = FrameConverter()
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            ticket, (timestamp, img) = entry
+
+            # Wrap the BGRA buffer without copying and convert to BGR (OpenCV format)
+            frame = converter.convert(img)
+
+            # Wait for our turn so parallel workers keep the frame order
+            with self._write_cond:
+                while self._next_write != ticket:
+                    self._write_cond.wait()
+                try:
+                    self._writer.write(frame)
+                    self.frames_written += 1
+                finally:
+                    self._next_write += 1
+                    self._write_cond.notify_all()
+
 
 if __name__ == "__main__":
     # Test the recorder
@@ -0,0 +1,68 @@
+"""
+Encodes a fixed synthetic screen sequence with every available encoder backend
+and reports throughput, CPU time (including the ffmpeg child process) and bytes.
+
+Usage:
+    python benchmarks/bench_encoders.py [--size 1280x720] [--frames 300] [--crf 28] [--preset veryfast]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_recording_profiles import synthetic_screen
+from src.utils.video_encoders import ENCODER_BACKENDS, create_encoder
+
+
+def run_backend(backend, frames, fps, options):
+    height, width = frames[0].shape[:2]
+    path = os.path.join(tempfile.gettempdir(), f"bench_encoder_{backend}.mp4")
+
+    # os.times() includes terminated child processes (ffmpeg) on POSIX; on Windows children are not counted
+    times_before = os.times()
+    wall_start = time.perf_counter()
+    encoder = create_encoder(path, fps, (width, height), backend=backend, options=options)
+    for frame in frames:
+        encoder.write(frame)
+    encoder.release()
+    wall = time.perf_counter() - wall_start
+    times_after = os.times()
+
+    cpu = sum(after - before for after, before in zip(times_after[:4], times_before[:4]))
+    size = os.path.getsize(path)
+    os.remove(path)
+    return len(frames) / wall, cpu, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--crf", type=int, default=28)
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--tune", default="stillimage")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    frames = [cv2.cvtColor(synthetic_screen(width, height, i), cv2.COLOR_BGRA2BGR) for i in range(args.frames)]
+    options = {"crf": args.crf, "preset": args.preset, "tune": args.tune}
+
+    print(f"{args.frames} frames at {width}x{height}")
+    print(f"{'backend':<10}{'fps':>10}{'cpu s':>10}{'KiB':>10}")
+    for backend, encoder_class in ENCODER_BACKENDS.items():
+        if not encoder_class.available():
+            print(f"{backend:<10}{'(not available)':>30}")
+            continue
+        encode_fps, cpu, size = run_backend(backend, frames, args.fps, options)
+        print(f"{backend:<10}{encode_fps:>10.1f}{cpu:>10.2f}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Runs the full recorder pipeline (capture -> convert -> encode) on synthetic frames.
+
+Needs no display, so recorder changes can be measured on a headless machine.
+Every scenario records for `--seconds` and reports the achieved frame rate,
+written / skipped / dropped frames, p95 stage latencies and the output size.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--seconds 10] [--source 1920x1080] [--fps 10]
+        [--profile 720p] [--encoder auto] [--scenario typing]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import RECORDING_PROFILES, RECORDING_ENCODER_OPTIONS
+from src.services.recorder_service import RecorderService
+from src.utils.capture_sources import SyntheticCaptureSource
+
+# name: (typing_rate, switch_seconds, skip_unchanged)
+SCENARIOS = {
+    "static": (0.0, 0.0, True),
+    "typing": (5.0, 0.0, True),
+    "switching": (5.0, 2.0, True),
+    "typing-cfr": (5.0, 0.0, False),
+}
+
+
+def run_scenario(name, args, source_size, output_dir):
+    typing_rate, switch_seconds, skip_unchanged = SCENARIOS[name]
+    source = SyntheticCaptureSource(source_size[0], source_size[1], typing_rate=typing_rate,
+                                    switch_seconds=switch_seconds)
+    recorder = RecorderService(
+        output_file=os.path.join(output_dir, f"bench_{name}.mp4"),
+        fps=args.fps,
+        encoder_workers=args.workers,
+        skip_unchanged=skip_unchanged,
+        max_size=RECORDING_PROFILES[args.profile],
+        preview=False,
+        encoder_backend=args.encoder,
+        encoder_options=RECORDING_ENCODER_OPTIONS,
+        capture_source=source,
+    )
+    recorder.start_recording()
+    time.sleep(args.seconds)
+    recorder.stop_recording()
+
+    stats = recorder.get_stats()
+    size = sum(os.path.getsize(path) for path in recorder.video_paths if os.path.exists(path))
+    return stats, size, (recorder.width, recorder.height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--source", default="1920x1080", help="Synthetic screen size, e.g. 3840x2160")
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--profile", default="720p", choices=list(RECORDING_PROFILES))
+    parser.add_argument("--encoder", default="auto", choices=["auto", "opencv", "ffmpeg"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Scenario to run (repeatable); defaults to all")
+    args = parser.parse_args()
+    source_size = tuple(int(v) for v in args.source.lower().split("x"))
+
+    output_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        print(f"Source {source_size[0]}x{source_size[1]}, profile {args.profile}, {args.fps:g} fps, "
+              f"{args.seconds:g}s per scenario, encoder {args.encoder}")
+        print(f"{'scenario':<12}{'output':>11}{'fps':>7}{'written':>9}{'skipped':>9}{'dropped':>9}"
+              f"{'late':>6}{'cap p95':>9}{'enc p95':>9}{'KiB':>9}{'KiB/min':>9}")
+        for name in args.scenario or SCENARIOS:
+            stats, size, (width, height) = run_scenario(name, args, source_size, output_dir)
+            latency = stats["latency"]
+            print(f"{name:<12}{f'{width}x{height}':>11}{stats['achieved_fps']:>7.1f}"
+                  f"{stats['frames_written']:>9}{stats['frames_skipped']:>9}{stats['frames_dropped']:>9}"
+                  f"{stats['missed_deadlines']:>6}{latency['capture']['p95_ms']:>9}"
+                  f"{latency['encode']['p95_ms']:>9}{size / 1024:>9.0f}{size / 1024 * 60 / args.seconds:>9.0f}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures CPU time per frame and output size for each recording profile.
+
+Usage:
+    python benchmarks/bench_recording_profiles.py [--source 3840x2160] [--frames 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import RECORDING_PROFILES
+from src.utils.frame_scaling import compute_output_size, scale_frame
+
+
+def synthetic_screen(width, height, index):
+    """Builds a BGRA office-like screen: static chrome, a form and a growing line of text."""
+    frame = np.full((height, width, 4), 245, dtype=np.uint8)
+    frame[:height // 20] = (60, 60, 60, 255)                        # title bar
+    frame[height // 20:, :width // 6] = (230, 225, 220, 255)        # side panel
+    for row in range(8):
+        top = height // 8 + row * height // 12
+        cv2.rectangle(frame, (width // 4, top), (width * 3 // 4, top + height // 30), (200, 200, 200, 255), 2)
+    text = "Pedido 4711 - cliente ACME " + "x" * (index % 40)
+    cv2.putText(frame, text, (width // 4 + 10, height // 8 + height // 40), cv2.FONT_HERSHEY_SIMPLEX,
+                height / 1400, (20, 20, 20, 255), 2)
+    return frame
+
+
+def run_profile(name, max_size, source_size, frames, fps):
+    width, height = compute_output_size(source_size[0], source_size[1], max_size)
+    path = os.path.join(tempfile.gettempdir(), f"bench_profile_{name}.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+
+    sources = [synthetic_screen(source_size[0], source_size[1], i) for i in range(frames)]
+    prepare_cpu = 0.0
+    encode_cpu = 0.0
+    for source in sources:
+        start = time.process_time()
+        frame = cv2.cvtColor(scale_frame(source, (width, height)), cv2.COLOR_BGRA2BGR)
+        prepare_cpu += time.process_time() - start
+
+        start = time.process_time()
+        writer.write(frame)
+        encode_cpu += time.process_time() - start
+    writer.release()
+
+    size = os.path.getsize(path)
+    os.remove(path)
+    return width, height, prepare_cpu / frames * 1000, encode_cpu / frames * 1000, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="1920x1080", help="Source screen size, e.g. 3840x2160")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--fps", type=float, default=10.0)
+    args = parser.parse_args()
+    source_size = tuple(int(v) for v in args.source.lower().split("x"))
+
+    print(f"Source {source_size[0]}x{source_size[1]}, {args.frames} frames, mp4v")
+    print(f"{'profile':<14}{'output':>11}{'scale+cvt ms':>14}{'encode ms':>11}{'KiB':>10}")
+    for name, max_size in RECORDING_PROFILES.items():
+        width, height, prepare_ms, encode_ms, size = run_profile(
+            name, max_size, source_size, args.frames, args.fps
+        )
+        print(f"{name:<14}{f'{width}x{height}':>11}{prepare_ms:>14.2f}{encode_ms:>11.2f}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Times the cross-session variant analysis on synthetic traces.
+
+Generates `--sessions` traces of a process with `--steps` activities: most
+follow the happy path, some skip or repeat a step, and a few are random.
+Checks the numpy edit distance against a plain dynamic-programming version,
+then times the analysis with one worker and with the process pool. Finally
+writes `--journals` session journals and times loading their traces
+in-process, with the pool and with the service's own choice.
+
+Usage:
+    python benchmarks/bench_variants.py [--sessions 5000] [--steps 40] [--workers 0] [--journals 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.journal_service import JOURNAL_SUFFIX
+from src.services.variant_service import VariantService
+from src.utils.trace_distance import edit_distance
+
+
+def reference_distance(a, b):
+    """Textbook Levenshtein distance, for checking."""
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, start=1):
+        current = [i]
+        for j, y in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def synthetic_traces(sessions, steps, seed=0):
+    rng = random.Random(seed)
+    happy = [f"Step {i} - App{i % 5}" for i in range(steps)]
+    traces = {}
+    for index in range(sessions):
+        roll = rng.random()
+        trace = list(happy)
+        if roll < 0.02:
+            trace = [rng.choice(happy) for _ in range(rng.randint(steps // 2, steps * 2))]
+        elif roll < 0.5:
+            for _ in range(rng.randint(1, 4)):
+                position = rng.randrange(len(trace))
+                if rng.random() < 0.5:
+                    del trace[position]
+                else:
+                    trace.insert(position, trace[rng.randrange(len(trace))])
+        traces[f"session{index:05d}"] = trace
+    return traces
+
+
+def write_journals(directory, traces, inputs_per_step=50):
+    """Writes each trace as a journal, with mouse input between the activities."""
+    paths = []
+    for name, trace in traces.items():
+        path = os.path.join(directory, name + JOURNAL_SUFFIX)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(["session", {"video": name + ".mp4"}]) + "\n")
+            for step, label in enumerate(trace):
+                f.write(json.dumps(["activity", step, label, float(step)]) + "\n")
+                for i in range(inputs_per_step):
+                    f.write(json.dumps(["input", "move", step * 10 ** 9 + i, i, i, None, 0, 0]) + "\n")
+            f.write(json.dumps(["end", {}]) + "\n")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=0, help="Pool size (0: one per CPU)")
+    parser.add_argument("--journals", type=int, default=20, help="Session journals written for the load timing")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    for _ in range(300):
+        a = [rng.randrange(6) for _ in range(rng.randint(0, 30))]
+        b = [rng.randrange(6) for _ in range(rng.randint(0, 30))]
+        expected = reference_distance(a, b)
+        if edit_distance(a, b) != expected or edit_distance(a, b, 3) != min(expected, 4):
+            print(f"FAIL: edit distance mismatch for {a} / {b}")
+            return 1
+
+    traces = synthetic_traces(args.sessions, args.steps)
+    for workers in (1, args.workers or None):
+        service = VariantService(workers=workers, chunk_size=32 if workers != 1 else len(traces))
+        start = time.perf_counter()
+        result = service.analyze(traces)
+        elapsed = time.perf_counter() - start
+        label = workers or os.cpu_count()
+        print(f"{label:>3} worker(s): {elapsed:6.2f}s  {result['sessions']} sessions, "
+              f"{len(result['variants'])} variants, {len(result['clusters'])} clusters, "
+              f"{len(result['outliers'])} outliers, happy path {result['happy_path']['share']:.0%}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_journals(directory, synthetic_traces(args.journals, args.steps, seed=2))
+        for label, service in (("in-process", VariantService(workers=1)),
+                               ("pool", VariantService(workers=args.workers or None, pool_min_journals=0)),
+                               ("auto", VariantService(workers=args.workers or None))):
+            start = time.perf_counter()
+            loaded = service.load_traces(paths)
+            elapsed = time.perf_counter() - start
+            print(f"load {len(paths)} journals {label:>10}: {elapsed:6.3f}s  {len(loaded)} traces")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Replays a flood of synthetic input events through the logger callbacks and checks none is lost.
+
+Two producer threads (mouse and keyboard, like the pynput listeners) call the
+callbacks directly at `--rate` events per second in total. After `stop_logging()`
+every event must be in the log. Also reports the callback cost seen by the
+producers, which is what the OS hook thread would pay.
+
+A second check runs `--cycles` short sessions with listener threads started and
+stopped by the loggers themselves (pynput's Listener replaced by a thread that
+fires the callbacks until stopped), so `stop_logging()` races with callbacks
+still in flight. Every event a callback managed to queue must be in the log.
+
+Usage:
+    python benchmarks/stress_input_events.py [--rate 100000] [--seconds 3] [--cycles 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import queue
+import sys
+import threading
+import time
+import types
+
+# Ensure the project root is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.action_logger as action_logger_module
+import src.services.logger_service as logger_service_module
+from app.action_logger import ActionLogger
+from src.services.logger_service import LoggerService
+from src.utils.input_events import CLICK, KEY
+
+
+class _Button:
+    name = "left"
+
+
+def replay(callback, args, rate, seconds, sent, index, batch=100):
+    """Calls `callback(*args)` `rate` times per second, in paced batches."""
+    interval = batch / rate
+    deadline = time.perf_counter()
+    end = deadline + seconds
+    busy = 0.0
+    count = 0
+    while deadline < end:
+        start = time.perf_counter()
+        for _ in range(batch):
+            callback(*args)
+        busy += time.perf_counter() - start
+        count += batch
+        deadline += interval
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    sent[index] = (count, busy)
+
+
+def run(logger, rate, seconds):
+    """
+    Floods `logger` with events from a mouse and a keyboard thread.
+
+    Returns:
+        tuple: (clicks sent, keys sent, what stop_logging() returned, report line).
+    """
+    sent = [None, None]
+    producers = [
+        threading.Thread(target=replay, args=(logger._on_click, (10, 20, _Button(), True), rate / 2, seconds, sent, 0)),
+        threading.Thread(target=replay, args=(logger._on_press, (None,), rate / 2, seconds, sent, 1)),
+    ]
+    logger.start_logging(listeners=False)
+    started = time.perf_counter()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    elapsed = time.perf_counter() - started
+
+    stop_start = time.perf_counter()
+    result = logger.stop_logging()
+    drain = time.perf_counter() - stop_start
+
+    (clicks, click_busy), (keys, key_busy) = sent
+    total = clicks + keys
+    report = (f"{type(logger).__name__}: sent {total} events in {elapsed:.2f}s ({total / elapsed:,.0f}/s), "
+              f"callback {(click_busy + key_busy) / total * 1e6:.2f} us/event, drain {drain * 1000:.0f} ms")
+    return clicks, keys, result, report
+
+
+class ReplayListener(threading.Thread):
+    """Stand-in for a pynput Listener: a thread that fires its callbacks until stopped."""
+
+    def __init__(self, on_click=None, on_press=None, **callbacks):
+        super().__init__(daemon=True)
+        self.on_click = on_click
+        self.on_press = on_press
+        self._stopped = threading.Event()
+
+    def run(self):
+        button = _Button()
+        while not self._stopped.is_set():
+            if self.on_click:
+                self.on_click(10, 20, button, True)
+            if self.on_press:
+                self.on_press(None)
+
+    def stop(self):
+        self._stopped.set()
+
+
+class CountingQueue:
+    """SimpleQueue that counts the events put into it, by kind (the stop sentinel is not counted)."""
+
+    instances = []
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.counts = {}
+        CountingQueue.instances.append(self)
+
+    def put(self, item):
+        if item is not None:
+            with self._lock:
+                self.counts[item[0]] = self.counts.get(item[0], 0) + 1
+        self._queue.put(item)
+
+    def get(self):
+        return self._queue.get()
+
+
+def run_listener_cycles(logger_class, module, cycles, session_seconds=0.005):
+    """
+    Starts and stops `logger_class` with listener threads `cycles` times.
+
+    Returns:
+        list: (events queued by kind, what stop_logging() returned) per cycle.
+    """
+    fake_input = types.SimpleNamespace(Listener=ReplayListener)
+    saved = module.mouse, module.keyboard, module.queue
+    module.mouse, module.keyboard = fake_input, fake_input
+    module.queue = types.SimpleNamespace(SimpleQueue=CountingQueue)
+    results = []
+    try:
+        for _ in range(cycles):
+            logger = logger_class()
+            with contextlib.redirect_stdout(io.StringIO()):
+                logger.start_logging()
+                time.sleep(session_seconds)
+                result = logger.stop_logging()
+            results.append((CountingQueue.instances[-1].counts, result))
+    finally:
+        module.mouse, module.keyboard, module.queue = saved
+        CountingQueue.instances.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=100000, help="Total events per second")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--cycles", type=int, default=200, help="Sessions with listener threads")
+    args = parser.parse_args()
+    failures = 0
+
+    clicks, keys, events, report = run(LoggerService(), args.rate, args.seconds)
+    stored_clicks = sum(1 for event in events if event.kind == CLICK)
+    stored_keys = sum(1 for event in events if event.kind == KEY)
+    print(report)
+    print(f"  stored {stored_clicks}/{clicks} clicks, {stored_keys}/{keys} keys")
+    if (stored_clicks, stored_keys) != (clicks, keys):
+        print("  FAIL: events lost")
+        failures += 1
+
+    clicks, keys, logs, report = run(ActionLogger(), args.rate, args.seconds)
+    # Keyboard lines are collapsed per second, so only clicks can be counted one by one
+    stored_clicks = sum(1 for line in logs if "Mouse Click" in line)
+    print(report)
+    print(f"  stored {stored_clicks}/{clicks} clicks")
+    if stored_clicks != clicks:
+        print("  FAIL: events lost")
+        failures += 1
+
+    lost = 0
+    for counts, events in run_listener_cycles(LoggerService, logger_service_module, args.cycles):
+        stored = (sum(1 for event in events if event.kind == CLICK), sum(1 for event in events if event.kind == KEY))
+        lost += counts.get(CLICK, 0) + counts.get(KEY, 0) - sum(stored)
+    print(f"LoggerService with listener threads: {args.cycles} start/stop cycles, {lost} queued events lost")
+    if lost:
+        print("  FAIL: events queued after the stop sentinel")
+        failures += 1
+
+    lost = 0
+    for counts, logs in run_listener_cycles(ActionLogger, action_logger_module, args.cycles):
+        lost += counts.get("click", 0) - sum(1 for line in logs if "Mouse Click" in line)
+    print(f"ActionLogger with listener threads: {args.cycles} start/stop cycles, {lost} queued clicks lost")
+    if lost:
+        print("  FAIL: events queued after the stop sentinel")
+        failures += 1
+
+    print("OK" if not failures else f"{failures} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,13 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 ENV_PATH = os.path.join(BASE_DIR, ".env")
+REFERENCES_DIR = os.path.join(DATA_DIR, "references")  # Reference flowcharts for conformance checks
 
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(ASSETS_DIR, exist_ok=True)
+os.makedirs(REFERENCES_DIR, exist_ok=True)
 
 # --- Appearance ---
 THEME_MODE = "Dark"
@@ -48,3 +50,87 @@ FONT_TIMER = ("Consolas", 60, "bold")
 WINDOW_TITLE = "Analisador de Processos Corporativos com IA"
 WINDOW_SIZE = "800x600"
 WINDOW_RESIZABLE = False
+
+# --- Recording ---
+RECORDING_FPS = 10.0
+RECORDING_QUEUE_SIZE = 32             # Frames buffered between capture and encoding
+RECORDING_BACKPRESSURE = "drop_oldest"  # "drop_oldest" or "block" when the buffer is full
+RECORDING_ENCODER_WORKERS = 1
+RECORDING_LATE_FRAME_POLICY = "skip"  # "skip" missed frame slots or "catch_up" on them
+RECORDING_CAPTURE_MODE = "monitor"    # "monitor" (primary screen) or "active_window" (any monitor, letterboxed)
+RECORDING_SKIP_UNCHANGED = True       # Variable frame rate: do not encode unchanged screens
+RECORDING_CHANGE_THRESHOLD = 0.0002   # Fraction of the downscaled frame that must change
+RECORDING_MAX_SKIP_SECONDS = 5.0      # Keep at least one frame this often on a static screen
+RECORDING_SEGMENT_SECONDS = 300       # Rotate into a new MP4 chunk every N seconds (0 disables)
+RECORDING_SEGMENT_MB = 0              # ...or every M megabytes (0 disables)
+
+# Video encoder: "auto" uses ffmpeg/libx264 when an ffmpeg executable is found (PATH or FFMPEG_PATH), else OpenCV mp4v
+RECORDING_ENCODER = "auto"
+RECORDING_ENCODER_OPTIONS = {
+    "crf": 28,
+    "preset": "veryfast",
+    "tune": "stillimage",
+}
+
+# Recording profiles: box (width, height) the captured screen is downscaled into before encoding.
+# "model-optimal" matches the frame size Gemini actually samples, so nothing encoded is thrown away.
+RECORDING_PROFILES = {
+    "native": None,
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+    "model-optimal": (768, 768),
+}
+RECORDING_PROFILE = "720p"
+
+# Live preview window (runs out of the capture loop; set False for headless or low-power machines)
+PREVIEW_ENABLED = True
+PREVIEW_FPS = 2.0
+
+# Idle auto-pause: pause capture and window polling after this long without input or screen changes
+IDLE_AUTO_PAUSE = True
+IDLE_TIMEOUT_SECONDS = 120
+
+# Input logging: key presses closer than this (seconds) form one typing session in the logs
+TYPING_BURST_GAP_SECONDS = 2.0
+INPUT_TRACK_MOUSE = True              # Also log mouse paths, scrolling and drags (decimated)
+INPUT_MOVE_MIN_DISTANCE_PX = 8        # Pointer positions closer than this to the last kept one are dropped
+INPUT_MOVE_MIN_INTERVAL = 0.05        # ...as are positions less than this many seconds apart
+INPUT_PATH_GAP_SECONDS = 0.5          # Pointer rest that ends a mouse path
+INPUT_PATH_EPSILON_PX = 6.0           # Douglas-Peucker tolerance for mouse paths
+INPUT_DRAG_MIN_DISTANCE_PX = 12       # Press-to-release distance that makes a drag
+INPUT_SCROLL_GAP_SECONDS = 1.0        # Scroll steps closer than this form one scroll session
+
+# Active window tracking: only changes are logged; polling speeds up while input events arrive
+WINDOW_POLL_ACTIVE_SECONDS = 0.25     # Poll period while the user is active
+WINDOW_POLL_IDLE_SECONDS = 2.0        # Poll period after WINDOW_ACTIVE_SECONDS without input
+WINDOW_ACTIVE_SECONDS = 3.0
+PROCESS_SUMMARY_ACTIVITIES = 10       # Activities (windows) listed in the local process summary
+PROCESS_SUMMARY_TRANSITIONS = 10      # Most frequent window transitions listed
+
+# Cross-session variant analysis (all session journals in DATA_DIR)
+VARIANT_MAX_CENTERS = 20              # Most frequent variants used as cluster centers
+VARIANT_SIMILARITY = 0.3              # Edit distance (fraction of the trace length) to join a cluster
+VARIANT_WORKERS = None                # Processes for the distance computation (None: one per CPU)
+CONFORMANCE_WORKERS = None            # Processes for conformance checks against a reference (None: one per CPU)
+
+# Click hotspots: clicks within this radius of each other are summarized as one repeated target
+HOTSPOT_RADIUS_PX = 24
+HOTSPOT_MIN_CLICKS = 3                # Clicks needed for a hotspot
+HOTSPOT_MAX_LINES = 15                # Hotspots summarized in the prompt (the rest stay as single clicks)
+
+# Session journal: every event is appended to <video>.journal.jsonl, so long sessions keep only a
+# tail in memory and a crashed session can be analyzed on the next start
+JOURNAL_ENABLED = True
+JOURNAL_FSYNC_SECONDS = 2.0           # Flush the journal to disk this often
+JOURNAL_MEMORY_EVENTS = 50000         # Input events kept in memory while recording
+JOURNAL_MEMORY_LOGS = 5000            # Window log lines kept in memory while recording
+
+# --- Analysis ---
+# "video": upload the recording to Gemini; "stills": send only the keyframes (no upload/processing wait)
+ANALYSIS_MODE = "video"
+KEYFRAME_HASH_THRESHOLD = 0.12        # Fraction of perceptual-hash bits that marks a new screen
+KEYFRAME_HIST_THRESHOLD = 0.25        # Histogram (Bhattacharyya) distance that marks a new screen
+KEYFRAME_MIN_INTERVAL = 1.0           # Seconds between two keyframes
+KEYFRAME_MAX_STILLS = 40              # Images sent to Gemini in "stills" mode
+UPLOAD_CACHE_ENABLED = True           # Reuse videos already on Gemini (same content) instead of uploading again
+UPLOAD_CACHE_FILE = os.path.join(DATA_DIR, "gemini_uploads.json")  # SHA-256 -> uploaded Gemini file
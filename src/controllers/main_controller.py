@@ -2,20 +2,62 @@ import threading
 import time
 import os
 from datetime import datetime
-from config.settings import DATA_DIR, REPORTS_DIR
+from config.settings import (
+    DATA_DIR, REPORTS_DIR, REFERENCES_DIR, RECORDING_FPS, RECORDING_QUEUE_SIZE,
+    RECORDING_BACKPRESSURE, RECORDING_ENCODER_WORKERS, RECORDING_SKIP_UNCHANGED,
+    RECORDING_CHANGE_THRESHOLD, RECORDING_MAX_SKIP_SECONDS, RECORDING_PROFILES, RECORDING_PROFILE,
+    PREVIEW_ENABLED, PREVIEW_FPS, RECORDING_SEGMENT_SECONDS, RECORDING_SEGMENT_MB,
+    RECORDING_ENCODER, RECORDING_ENCODER_OPTIONS, ANALYSIS_MODE, KEYFRAME_HASH_THRESHOLD,
+    KEYFRAME_HIST_THRESHOLD, KEYFRAME_MIN_INTERVAL, KEYFRAME_MAX_STILLS, RECORDING_LATE_FRAME_POLICY,
+    RECORDING_CAPTURE_MODE, IDLE_AUTO_PAUSE, IDLE_TIMEOUT_SECONDS,
+    TYPING_BURST_GAP_SECONDS, INPUT_TRACK_MOUSE, INPUT_MOVE_MIN_DISTANCE_PX, INPUT_MOVE_MIN_INTERVAL,
+    INPUT_PATH_GAP_SECONDS, INPUT_PATH_EPSILON_PX, INPUT_DRAG_MIN_DISTANCE_PX, INPUT_SCROLL_GAP_SECONDS,
+    JOURNAL_ENABLED, JOURNAL_FSYNC_SECONDS, JOURNAL_MEMORY_EVENTS, JOURNAL_MEMORY_LOGS,
+    HOTSPOT_RADIUS_PX, HOTSPOT_MIN_CLICKS, HOTSPOT_MAX_LINES,
+    WINDOW_POLL_ACTIVE_SECONDS, WINDOW_POLL_IDLE_SECONDS, WINDOW_ACTIVE_SECONDS,
+    PROCESS_SUMMARY_ACTIVITIES, PROCESS_SUMMARY_TRANSITIONS,
+    VARIANT_MAX_CENTERS, VARIANT_SIMILARITY, VARIANT_WORKERS, CONFORMANCE_WORKERS,
+    UPLOAD_CACHE_ENABLED, UPLOAD_CACHE_FILE
+)
 from config.secrets_manager import SecretsManager
 from src.services.recorder_service import RecorderService
 from src.services.logger_service import LoggerService
 from src.services.miner_service import MinerService
 from src.services.ai_service import AIService
 from src.services.report_service import ReportService
+from src.services.keyframe_service import KeyframeService
+from src.services.idle_service import IdleService
+from src.services.journal_service import JournalService
+from src.services.variant_service import VariantService, describe_variants
+from src.services.event_log_service import EventLogService
+from src.services.conformance_service import ConformanceService, describe_conformance
+from src.utils.video_encoders import is_playable
+from src.utils.segment_writer import read_frame_at
+from src.utils.click_hotspots import ClickHotspotAnalyzer, describe_hotspot, render_heatmap
+from src.utils.process_graph import describe_graph
+from src.utils.upload_cache import UploadCache
 
 class MainController:
     def __init__(self):
         # Services
         self.recorder = None
-        self.logger = LoggerService()
-        self.miner = MinerService()
+        self.idle = None
+        self.journal = None
+        self.logger = LoggerService(
+            track_mouse=INPUT_TRACK_MOUSE,
+            move_min_distance=INPUT_MOVE_MIN_DISTANCE_PX,
+            move_min_interval=INPUT_MOVE_MIN_INTERVAL,
+            path_gap=INPUT_PATH_GAP_SECONDS,
+            path_epsilon=INPUT_PATH_EPSILON_PX,
+            drag_min_distance=INPUT_DRAG_MIN_DISTANCE_PX
+        )
+        self.miner = MinerService(
+            fast_interval=WINDOW_POLL_ACTIVE_SECONDS,
+            idle_interval=WINDOW_POLL_IDLE_SECONDS,
+            active_seconds=WINDOW_ACTIVE_SECONDS
+        )
+        # Input events make the window polling faster
+        self.logger.activity_listeners.append(self.miner.notify_activity)
         self.ai_service = None
         self.report_service = ReportService(output_dir=REPORTS_DIR)
 
@@ -24,8 +66,15 @@ class MainController:
         self.start_time = None
         self.current_video_path = None
         self.last_report_path = None
+        self.last_flowchart = None      # FLOWCHART_JSON steps of the last analysis
+        self.last_window_labels = None  # Window number in its logs -> normalized title
         self.logs_visible = False
         self.current_language = "Português"
+        self.current_profile = RECORDING_PROFILE
+        self.preview_enabled = PREVIEW_ENABLED
+        self.analysis_mode = ANALYSIS_MODE
+        # Journals of sessions that crashed before being analyzed
+        self.recoverable_sessions = JournalService.find_unfinished(DATA_DIR) if JOURNAL_ENABLED else []
 
         # Callbacks (UI updates)
         self.on_status_change = None
@@ -33,6 +82,8 @@ class MainController:
         self.on_log_message = None
         self.on_stage_change = None
         self.on_error = None
+        self.on_recording_stats = None
+        self.on_preview_change = None
 
         # Initialize AI in background
         threading.Thread(target=self._init_ai_service, daemon=True).start()
@@ -40,7 +91,8 @@ class MainController:
     def _init_ai_service(self):
         try:
             self.log("Inicializando serviço de IA...")
-            self.ai_service = AIService()
+            upload_cache = UploadCache(UPLOAD_CACHE_FILE) if UPLOAD_CACHE_ENABLED else None
+            self.ai_service = AIService(upload_cache=upload_cache)
             if self.ai_service.model:
                 self.log("Serviço de IA pronto.")
             else:
@@ -50,8 +102,11 @@ class MainController:
             if self.on_error:
                 self.on_error("Erro na inicialização da IA")
 
-    def set_callbacks(self, on_status_change=None, on_timer_update=None, on_log_message=None, on_stage_change=None, on_error=None):
+    def set_callbacks(self, on_status_change=None, on_timer_update=None, on_log_message=None, on_stage_change=None, on_error=None,
+                      on_recording_stats=None, on_preview_change=None):
         self.on_status_change = on_status_change
+        self.on_recording_stats = on_recording_stats
+        self.on_preview_change = on_preview_change
         self.on_timer_update = on_timer_update
         self.on_log_message = on_log_message
         self.on_stage_change = on_stage_change
@@ -73,28 +128,119 @@ class MainController:
         self.log("API Key salva. Reinicializando IA...")
         threading.Thread(target=self._init_ai_service, daemon=True).start()
 
-    def start_recording(self, language):
+    def start_recording(self, language, profile=RECORDING_PROFILE, analysis_mode=ANALYSIS_MODE):
         self.current_language = language
+        self.analysis_mode = analysis_mode
+        self.current_profile = profile if profile in RECORDING_PROFILES else RECORDING_PROFILE
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"recording_{timestamp}.mp4"
         self.current_video_path = os.path.join(DATA_DIR, filename)
+
+        keyframes = None
+        if self.analysis_mode == "stills":
+            keyframes = self._create_keyframe_service(self.current_video_path)
         
-        self.recorder = RecorderService(output_file=self.current_video_path)
+        self.recorder = RecorderService(
+            output_file=self.current_video_path,
+            fps=RECORDING_FPS,
+            queue_size=RECORDING_QUEUE_SIZE,
+            backpressure=RECORDING_BACKPRESSURE,
+            encoder_workers=RECORDING_ENCODER_WORKERS,
+            skip_unchanged=RECORDING_SKIP_UNCHANGED,
+            change_threshold=RECORDING_CHANGE_THRESHOLD,
+            max_skip_seconds=RECORDING_MAX_SKIP_SECONDS,
+            max_size=RECORDING_PROFILES[self.current_profile],
+            preview=self.preview_enabled,
+            preview_fps=PREVIEW_FPS,
+            segment_seconds=RECORDING_SEGMENT_SECONDS,
+            segment_mb=RECORDING_SEGMENT_MB,
+            on_segment_complete=self._on_segment_complete,
+            on_preview_closed=self._on_preview_closed,
+            on_error=self._on_recording_error,
+            encoder_backend=RECORDING_ENCODER,
+            encoder_options=RECORDING_ENCODER_OPTIONS,
+            keyframes=keyframes,
+            late_frame_policy=RECORDING_LATE_FRAME_POLICY,
+            capture_mode=RECORDING_CAPTURE_MODE,
+            region_provider=self.miner.get_active_window_rect
+        )
         
+        self.journal = None
+        if JOURNAL_ENABLED:
+            self.journal = JournalService(JournalService.journal_path(self.current_video_path),
+                                          fsync_interval=JOURNAL_FSYNC_SECONDS)
+            self.journal.open(
+                self.current_video_path, time.monotonic_ns(), time.time(),
+                language=language, analysis_mode=self.analysis_mode, profile=self.current_profile,
+                timestamps_file=self.recorder.timestamps_file, variable_frame_rate=RECORDING_SKIP_UNCHANGED
+            )
+
         self.is_recording = True
         self.start_time = time.time()
         
         self.recorder.start_recording()
-        self.logger.start_logging()
-        self.miner.start_monitoring()
+        self.logger.start_logging(journal=self.journal,
+                                  max_events=JOURNAL_MEMORY_EVENTS if self.journal else None)
+        self.miner.start_monitoring(journal=self.journal,
+                                    max_logs=JOURNAL_MEMORY_LOGS if self.journal else None)
+        if IDLE_AUTO_PAUSE:
+            self.idle = IdleService(
+                self.logger, self.recorder, self.miner, timeout=IDLE_TIMEOUT_SECONDS,
+                on_pause=self._on_idle_pause, on_resume=self._on_idle_resume, journal=self.journal
+            )
+            self.idle.start()
         
-        self.log(f"Gravação iniciada: {filename}")
+        self.log(f"Gravação iniciada: {filename} (perfil: {self.current_profile})")
         if self.on_stage_change:
             self.on_stage_change("recording")
         
         self.update_status("Gravando...")
         self._start_timer_thread()
 
+    def _create_keyframe_service(self, video_path):
+        return KeyframeService(
+            output_dir=os.path.splitext(video_path)[0] + "_stills",
+            hash_threshold=KEYFRAME_HASH_THRESHOLD,
+            hist_threshold=KEYFRAME_HIST_THRESHOLD,
+            min_interval=KEYFRAME_MIN_INTERVAL
+        )
+
+    def _on_segment_complete(self, segment):
+        """Starts uploading each finished chunk while the user keeps working."""
+        if self.journal:
+            self.journal.write_segment(segment)
+        if not (RECORDING_SEGMENT_SECONDS or RECORDING_SEGMENT_MB):
+            return
+        self.log(f"Segmento {segment['index'] + 1} finalizado ({segment['start_s']:.0f}s-{segment['end_s']:.0f}s).")
+        if self.analysis_mode == "video" and self.ai_service and self.ai_service.model:
+            self.ai_service.prefetch_upload(segment["path"])
+
+    def _on_idle_pause(self):
+        self.log(f"Sem atividade há {IDLE_TIMEOUT_SECONDS}s. Gravação pausada.")
+        self.update_status("Pausado por inatividade")
+
+    def _on_idle_resume(self):
+        self.log("Atividade detectada. Gravação retomada.")
+        self.update_status("Gravando...")
+
+    def set_preview_enabled(self, enabled):
+        self.preview_enabled = enabled
+        if self.recorder and self.is_recording:
+            self.recorder.set_preview_enabled(enabled)
+
+    def _on_recording_error(self, error):
+        """An encoder worker failed and the capture stopped; runs on that worker's thread."""
+        self.log(f"ERRO na gravação: {error}")
+        self.update_status("Gravação interrompida por erro no codificador.")
+        if self.on_error:
+            self.on_error(f"A gravação parou: {error}\nClique em Parar e Analisar para usar o que já foi gravado.")
+
+    def _on_preview_closed(self):
+        """The user pressed 'q' in the preview window: turn the preview off everywhere."""
+        self.set_preview_enabled(False)
+        if self.on_preview_change:
+            self.on_preview_change(False)
+
     def _start_timer_thread(self):
         def _timer_loop():
             while self.is_recording:
@@ -104,6 +250,8 @@ class MainController:
                 time_str = f"{hours:02}:{minutes:02}:{seconds:02}"
                 if self.on_timer_update:
                     self.on_timer_update(time_str)
+                if self.on_recording_stats and self.recorder:
+                    self.on_recording_stats(self.recorder.get_stats())
                 time.sleep(1)
         threading.Thread(target=_timer_loop, daemon=True).start()
 
@@ -113,42 +261,343 @@ class MainController:
             self.on_stage_change("analyzing")
         
         self.log("Parando gravação...")
+        pause_logs = []
+        if self.idle:
+            self.idle.stop()
+            pause_logs = self.idle.get_timeline_logs()
+            self.idle = None
         self.recorder.stop_recording()
-        action_logs = self.logger.stop_logging()
+        self._log_recording_stats(self.recorder.get_stats())
+        if self.recorder.frames_dropped:
+            self.log(f"Aviso: {self.recorder.frames_dropped} quadros descartados (codificação lenta).")
+        if self.recorder.frames_skipped:
+            self.log(f"{self.recorder.frames_skipped} quadros sem alteração omitidos do vídeo.")
+        action_events = self.logger.stop_logging()
         window_logs = self.miner.stop_monitoring()
+
+        session = {
+            "events": action_events,
+            "logs": window_logs + pause_logs,
+            "video_paths": self.recorder.video_paths,
+            "timestamps_file": self.recorder.timestamps_file,
+            "variable_frame_rate": self.recorder.skip_unchanged,
+            "keyframes": self.recorder.keyframes,
+            "capture_region": self.recorder.capture_region,
+            "video_start": self.recorder.start_monotonic,
+            # Built while recording, so the structural summary needs no extra pass over the logs
+            "process_summary": describe_graph(self.miner.graph, self.miner.activity_label,
+                                              PROCESS_SUMMARY_ACTIVITIES, PROCESS_SUMMARY_TRANSITIONS),
+            "process_stats": {
+                "activities": self.miner.graph.activity_stats(self.miner.activity_label),
+                "transitions": self.miner.graph.top_transitions(PROCESS_SUMMARY_TRANSITIONS, self.miner.activity_label),
+            },
+            "window_labels": {title_id: self.miner.titles.label(title_id) for title_id in range(len(self.miner.titles))},
+        }
+        if self.journal:
+            self.journal.close(frames_written=self.recorder.frames_written, video_paths=self.recorder.video_paths)
+            # Only a tail was kept in memory; the analysis reads the whole session from disk
+            session["journal_path"] = self.journal.path
+            self.journal = None
         
         self.log("Vídeo salvo. Iniciando análise...")
         self.update_status("Processando vídeo...")
         
-        threading.Thread(target=self._run_analysis, args=(action_logs, window_logs), daemon=True).start()
+        threading.Thread(target=self._run_analysis, args=(session,), daemon=True).start()
+
+    def analyze_recovered_session(self, language=None):
+        """
+        Analyzes the newest session that crashed, rebuilt from its journal and the
+        video chunks that can still be read.
+        """
+        if not self.recoverable_sessions:
+            return
+        path = self.recoverable_sessions[0]
+        if self.on_stage_change:
+            self.on_stage_change("analyzing")
+        # Replaying a long journal takes a while: keep it off the UI thread
+        threading.Thread(target=self._run_recovered_analysis, args=(path, language), daemon=True).start()
+
+    def _run_recovered_analysis(self, path, language):
+        if not self._check_ai_ready():
+            return
+        self.log(f"Recuperando sessão interrompida: {os.path.basename(path)}")
+        try:
+            recovered = JournalService.recover(path, playable=is_playable)
+        except Exception as e:
+            self.log(f"ERRO ao recuperar sessão: {e}")
+            if self.on_error:
+                self.on_error(str(e))
+            if self.on_stage_change:
+                self.on_stage_change("start")
+            return
+        meta = recovered["meta"]
+        self.current_language = language or meta.get("language", self.current_language)
+        self.analysis_mode = meta.get("analysis_mode", ANALYSIS_MODE)
+        self.log(f"{len(recovered['events'])} eventos e {len(recovered['video_paths'])} arquivo(s) de vídeo recuperados.")
+
+        session = {
+            "events": recovered["events"],
+            "logs": recovered["logs"],
+            "video_paths": recovered["video_paths"],
+            "timestamps_file": meta.get("timestamps_file"),
+            "variable_frame_rate": meta.get("variable_frame_rate", False),
+            "keyframes": None,
+            "capture_region": None,  # Not journaled, so no heatmap for recovered sessions
+            "video_start": None,
+            "process_summary": None,  # The window graph is only kept in memory
+            "process_stats": None,
+            "window_labels": {title_id: label for title_id, label, _ in recovered["activities"]},
+        }
+        self.update_status("Processando sessão recuperada...")
+        if self._run_analysis(session):
+            # Only an analyzed session is closed; after a failure it is offered again
+            JournalService.mark_recovered(path)
+            if path in self.recoverable_sessions:
+                self.recoverable_sessions.remove(path)
+
+    def analyze_variants(self):
+        """
+        Compares every recorded session in DATA_DIR (from their journals) and writes
+        a variant report: happy path, variant frequencies, clusters and outliers.
+        Runs locally, without the AI.
+        """
+        self.last_flowchart = None
+        if self.on_stage_change:
+            self.on_stage_change("analyzing")
+        self.update_status("Comparando sessões...")
+        threading.Thread(target=self._run_variant_analysis, daemon=True).start()
+
+    def _run_variant_analysis(self):
+        try:
+            service = VariantService(max_centers=VARIANT_MAX_CENTERS, similarity=VARIANT_SIMILARITY,
+                                     workers=VARIANT_WORKERS)
+            traces = service.load_traces(JournalService.find_all(DATA_DIR))
+            if len(traces) < 2:
+                raise RuntimeError("São necessárias pelo menos duas sessões gravadas para comparar variantes.")
+            self.log(f"Comparando {len(traces)} sessões...")
+            result = service.analyze(traces)
+            self.log(f"{len(result['variants'])} variantes, {len(result['outliers'])} atípicas.")
+
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            report_name = f"Variantes_Processo_{timestamp}.html"
+            self.last_report_path = self.report_service.generate_report(describe_variants(result),
+                                                                        report_filename=report_name)
+            self.log(f"Relatório pronto: {report_name}")
+            self.update_status("Relatório gerado com sucesso.")
+            if self.on_stage_change:
+                self.on_stage_change("results")
+        except Exception as e:
+            self.log(f"ERRO na comparação de sessões: {e}")
+            if self.on_error:
+                self.on_error(str(e))
+            if self.on_stage_change:
+                self.on_stage_change("start")
+
+    def export_event_log(self, path):
+        """Exports every recorded session in DATA_DIR as one XES or CSV event log (by extension)."""
+        def _export():
+            try:
+                journals = JournalService.find_all(DATA_DIR)
+                if not journals:
+                    raise RuntimeError("Nenhuma sessão gravada para exportar.")
+                service = EventLogService(typing_gap=TYPING_BURST_GAP_SECONDS, scroll_gap=INPUT_SCROLL_GAP_SECONDS)
+                count = service.export(journals, path)
+                self.log(f"{count} eventos de {len(journals)} sessões exportados para {os.path.basename(path)}.")
+                self.update_status("Log de eventos exportado.")
+            except Exception as e:
+                self.log(f"ERRO ao exportar log de eventos: {e}")
+                if self.on_error:
+                    self.on_error(str(e))
+        self.update_status("Exportando log de eventos...")
+        threading.Thread(target=_export, daemon=True).start()
+
+    def import_event_log(self, path):
+        """
+        Reads an external XES or CSV event log and writes a local report for it
+        (activity statistics, transitions and, with several cases, variants).
+        """
+        self.last_flowchart = None
+        if self.on_stage_change:
+            self.on_stage_change("analyzing")
+        self.update_status("Importando log de eventos...")
+        threading.Thread(target=self._run_event_log_import, args=(path,), daemon=True).start()
+
+    def _run_event_log_import(self, path):
+        try:
+            imported = EventLogService().import_log(path)
+            titles, graph, traces = imported["titles"], imported["graph"], imported["traces"]
+            if not imported["events"]:
+                raise RuntimeError("O log de eventos está vazio.")
+            self.log(f"{imported['events']} eventos, {len(traces)} casos e {len(titles)} atividades importados.")
+
+            report_text = f"# Log de Eventos: {os.path.basename(path)}\n\n"
+            if len(traces) > 1:
+                service = VariantService(max_centers=VARIANT_MAX_CENTERS, similarity=VARIANT_SIMILARITY,
+                                         workers=VARIANT_WORKERS)
+                result = service.analyze({case: [titles.label(i) for i in trace] for case, trace in traces.items()})
+                report_text += describe_variants(result)
 
-    def _run_analysis(self, action_logs, window_logs):
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            report_name = f"Log_Eventos_{timestamp}.html"
+            self.last_report_path = self.report_service.generate_report(
+                report_text, report_filename=report_name,
+                process_stats={
+                    "activities": graph.activity_stats(titles.label),
+                    "transitions": graph.top_transitions(PROCESS_SUMMARY_TRANSITIONS, titles.label),
+                }
+            )
+            self.log(f"Relatório pronto: {report_name}")
+            self.update_status("Relatório gerado com sucesso.")
+            if self.on_stage_change:
+                self.on_stage_change("results")
+        except Exception as e:
+            self.log(f"ERRO ao importar log de eventos: {e}")
+            if self.on_error:
+                self.on_error(str(e))
+            if self.on_stage_change:
+                self.on_stage_change("start")
+
+    def can_save_reference(self):
+        """Whether the last analysis has a flowchart that can become a reference."""
+        return bool(self.last_flowchart and self.last_window_labels)
+
+    def save_reference(self, name):
+        """
+        Saves the flowchart of the last analysis as a reference model.
+
+        Returns:
+            str: Path of the reference, or None if it could not be saved.
+        """
+        try:
+            service = ConformanceService(REFERENCES_DIR)
+            path = service.save_reference(name, self.last_flowchart, self.last_window_labels)
+            self.log(f"Referência salva: {os.path.basename(path)}")
+            return path
+        except Exception as e:
+            self.log(f"ERRO ao salvar referência: {e}")
+            if self.on_error:
+                self.on_error(str(e))
+            return None
+
+    def check_conformance(self, reference_path):
+        """Replays every recorded session in DATA_DIR against a reference and writes a conformance report."""
+        self.last_flowchart = None
+        if self.on_stage_change:
+            self.on_stage_change("analyzing")
+        self.update_status("Verificando conformidade...")
+        threading.Thread(target=self._run_conformance_check, args=(reference_path,), daemon=True).start()
+
+    def _run_conformance_check(self, reference_path):
+        try:
+            service = ConformanceService(REFERENCES_DIR, workers=CONFORMANCE_WORKERS)
+            reference = service.load_reference(reference_path)
+            results = service.check(reference, JournalService.find_all(DATA_DIR))
+            self.log(f"{len(results)} sessões comparadas com a referência \"{reference['name']}\".")
+
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            report_name = f"Conformidade_Processo_{timestamp}.html"
+            self.last_report_path = self.report_service.generate_report(describe_conformance(reference, results),
+                                                                        report_filename=report_name)
+            self.log(f"Relatório pronto: {report_name}")
+            self.update_status("Relatório gerado com sucesso.")
+            if self.on_stage_change:
+                self.on_stage_change("results")
+        except Exception as e:
+            self.log(f"ERRO na verificação de conformidade: {e}")
+            if self.on_error:
+                self.on_error(str(e))
+            if self.on_stage_change:
+                self.on_stage_change("start")
+
+    def _log_recording_stats(self, stats):
+        latency = stats["latency"]
+        self.log(f"Gravação: {stats['achieved_fps']:.1f}/{stats['target_fps']:g} fps, "
+                 f"{stats['missed_deadlines']} quadros atrasados. "
+                 f"Latência p95 (ms) captura {latency['capture']['p95_ms']}, "
+                 f"conversão {latency['convert']['p95_ms']}, codificação {latency['encode']['p95_ms']}.")
+
+    def _check_ai_ready(self):
+        """Reports a missing AI service and goes back to the start; returns whether the analysis can run."""
         if not self.ai_service or not self.ai_service.model:
             self.log("ERRO: Agente de IA não inicializado ou sem API Key.")
             if self.on_error:
                 self.on_error("Configure a API Key antes de continuar.")
             if self.on_stage_change:
                 self.on_stage_change("start")
-            return
+            return False
+        return True
+
+    def _run_analysis(self, session):
+        """
+        Analyzes a session with the AI and writes the report.
 
+        Returns:
+            bool: True once the report is generated.
+        """
+        if not self._check_ai_ready():
+            return False
+
+        self.last_flowchart = None
         try:
-            all_logs = sorted(action_logs + window_logs)
+            action_events, window_logs = session["events"], session["logs"]
+            if session.get("journal_path"):
+                journaled = JournalService.load(session["journal_path"])
+                action_events, window_logs = journaled["events"], journaled["logs"]
+            if not session["video_paths"]:
+                raise RuntimeError("Nenhum vídeo utilizável encontrado para a sessão.")
+
+            # Repeated clicks on the same spot are summarized instead of listed one by one
+            clicks = action_events.clicks()
+            hotspots = ClickHotspotAnalyzer(HOTSPOT_RADIUS_PX, HOTSPOT_MIN_CLICKS).analyze(clicks)[:HOTSPOT_MAX_LINES]
+            hotspot_lines = [describe_hotspot(hotspot, action_events.clock) for hotspot in hotspots]
+            summarized = {timestamp for hotspot in hotspots for timestamp in hotspot.timestamps}
+            if hotspots:
+                self.log(f"{len(hotspots)} pontos de clique repetido resumidos ({len(summarized)} cliques).")
+
+            # Input events are only rendered to text here, right before building the prompt
+            all_logs = sorted(action_events.render(
+                typing_gap=TYPING_BURST_GAP_SECONDS, scroll_gap=INPUT_SCROLL_GAP_SECONDS,
+                exclude_clicks=summarized
+            ) + window_logs)
+
+            stills = None
+            if self.analysis_mode == "stills":
+                keyframes = session["keyframes"] or self._create_keyframe_service(session["video_paths"][0])
+                stills = keyframes.stills
+                if not stills:
+                    self.log("Extraindo imagens-chave do vídeo...")
+                    stills = keyframes.extract_from_video(session["video_paths"], session["timestamps_file"])
+                self.log(f"{len(stills)} imagens-chave extraídas.")
             
             analysis_result = self.ai_service.analyze_process(
-                video_path=self.current_video_path,
+                video_path=session["video_paths"],
                 logs=all_logs,
-                language=self.current_language
+                language=self.current_language,
+                variable_frame_rate=session["variable_frame_rate"],
+                mode=self.analysis_mode,
+                stills=stills,
+                max_stills=KEYFRAME_MAX_STILLS,
+                summary=(session.get("process_summary") or []) + hotspot_lines
             )
             
+            # Kept so the flowchart can be saved as a conformance reference
+            self.last_flowchart = ReportService.extract_flowchart(analysis_result)
+            self.last_window_labels = session.get("window_labels") or {}
+
             self.log("Gerando HTML...")
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             report_name = f"Relatorio_Processo_{timestamp}.html"
-            self.last_report_path = self.report_service.generate_report(analysis_result, report_filename=report_name)
+            self.last_report_path = self.report_service.generate_report(
+                analysis_result, report_filename=report_name,
+                heatmap_png=self._render_click_heatmap(session, clicks, hotspots), hotspot_lines=hotspot_lines,
+                process_stats=session.get("process_stats")
+            )
             
             self.log(f"Relatório pronto: {report_name}")
             self.update_status("Relatório gerado com sucesso.")
             if self.on_stage_change:
                 self.on_stage_change("results")
+            return True
             
         except Exception as e:
             self.log(f"ERRO na análise: {e}")
@@ -156,6 +605,22 @@ class MainController:
                 self.on_error(str(e))
             if self.on_stage_change:
                 self.on_stage_change("start")
+            return False
+
+    def _render_click_heatmap(self, session, clicks, hotspots):
+        """Click heatmap over the frame recorded at the top hotspot's median click (None if unavailable)."""
+        if not hotspots or not session.get("capture_region") or session.get("video_start") is None:
+            return None
+        try:
+            top = hotspots[0]
+            moment = top.timestamps[len(top.timestamps) // 2] / 1e9 - session["video_start"]
+            frame = read_frame_at(session["video_paths"], session["timestamps_file"], moment)
+            if frame is None:
+                return None
+            return render_heatmap(frame, clicks, session["capture_region"], hotspots)
+        except Exception as e:
+            self.log(f"Aviso: mapa de cliques não gerado ({e}).")
+            return None
 
     def reset(self):
         self.is_recording = False
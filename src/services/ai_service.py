@@ -1,15 +1,27 @@
 import os
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from config.secrets_manager import SecretsManager
+from src.utils.upload_cache import account_fingerprint
 
 class AIService:
     """
     Interacts with Google Gemini to analyze the recorded video and logs.
     """
 
-    def __init__(self):
+    def __init__(self, upload_cache=None):
+        """
+        Args:
+            upload_cache (UploadCache): Uploads reused across runs by content hash (None: always upload).
+        """
         self.api_key = SecretsManager.get_api_key()
+        # Uploads run in the background (e.g. finished recording chunks) and are reused by path
+        self._upload_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini-upload")
+        self._uploads = {}
+        self._uploads_lock = threading.Lock()
+        self.upload_cache = upload_cache
         
         # Debug print for API Key
         if self.api_key:
@@ -56,18 +68,8 @@ class AIService:
         # If we get here, none of the models are suitable
         raise ValueError("No suitable models found for initialization.")
 
-    def analyze_process(self, video_path, logs, language="Português"):
-        """
-        Uploads the video and sends it along with logs to Gemini for analysis.
-
-        Args:
-            video_path (str): Path to the recorded MP4 file.
-            logs (list): List of log strings (actions and window contexts).
-            language (str): Language for the analysis report.
-
-        Returns:
-            str: The raw analysis text from Gemini.
-        """
+    def _ensure_model(self):
+        """Initializes the model if the API key was configured after startup."""
         if not self.model:
              # Try to re-init if key was added later
              self.api_key = SecretsManager.get_api_key()
@@ -77,15 +79,83 @@ class AIService:
              else:
                  raise ValueError("API Key not configured.")
 
-        print(f"Uploading video {video_path} to Gemini...")
-        
+    def prefetch_upload(self, video_path):
+        """
+        Starts uploading a video in the background, if it is not already uploading.
+
+        Args:
+            video_path (str): Path to an MP4 file (e.g. a finished recording chunk).
+
+        Returns:
+            concurrent.futures.Future: Resolves to the processed Gemini file.
+        """
+        with self._uploads_lock:
+            future = self._uploads.get(video_path)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._upload_executor.submit(self._upload_and_wait, video_path)
+                self._uploads[video_path] = future
+            return future
+
+    def upload_video(self, video_path):
+        """Uploads a video (or reuses a background upload) and waits until Gemini has processed it."""
+        return self.prefetch_upload(video_path).result()
+
+    def _upload_and_wait(self, video_path):
+        """
+        Uploads a video and polls until Gemini has finished processing it.
+
+        With an upload cache, a file with the same content uploaded earlier (and
+        not yet expired on Gemini) is reused instead, skipping both the upload
+        and the processing wait.
+        """
+        self._ensure_model()
+
         if not os.path.exists(video_path):
              raise FileNotFoundError(f"Video file not found at: {video_path}")
 
+        digest = None
+        account = account_fingerprint(self.api_key)
+        if self.upload_cache is not None:
+            digest = self.upload_cache.digest(video_path)
+            video_file = self._reuse_upload(digest, account)
+            if video_file is not None:
+                return video_file
+
+        print(f"Uploading video {video_path} to Gemini...")
         video_file = genai.upload_file(path=video_path)
-        
-        # Wait for processing
         print(f"Video uploaded. State: {video_file.state.name}")
+        video_file = self._wait_until_processed(video_file)
+
+        if digest is not None:
+            self.upload_cache.put(digest, video_file, size=os.path.getsize(video_path), account=account)
+        return video_file
+
+    def _reuse_upload(self, digest, account):
+        """
+        Gemini file of a cached upload, if it still exists and is usable.
+
+        Returns:
+            The processed Gemini file, or None (the entry is dropped) when it is
+            unknown, expired, failed or no longer on the server.
+        """
+        entry = self.upload_cache.get(digest, account)
+        if entry is None:
+            return None
+        try:
+            video_file = genai.get_file(entry["name"])
+            if video_file.state.name == "FAILED":
+                raise ValueError("Video processing failed.")
+            video_file = self._wait_until_processed(video_file)
+        except Exception as e:
+            print(f"Cached upload {entry['name']} not reusable ({e}); uploading again.")
+            self.upload_cache.remove(digest)
+            return None
+        print(f"Reusing uploaded video {video_file.name} (same content already on Gemini).")
+        return video_file
+
+    @staticmethod
+    def _wait_until_processed(video_file):
+        """Polls a Gemini file until it leaves the PROCESSING state."""
         while video_file.state.name == "PROCESSING":
             print("Waiting for video processing...")
             time.sleep(2)
@@ -94,19 +164,78 @@ class AIService:
         if video_file.state.name == "FAILED":
             raise ValueError("Video processing failed.")
 
-        print("Video processed. Generating analysis...")
+        return video_file
+
+    def analyze_process(self, video_path, logs, language="Português", variable_frame_rate=False,
+                        mode="video", stills=None, max_stills=40, summary=None):
+        """
+        Uploads the video and sends it along with logs to Gemini for analysis.
+
+        In "stills" mode the video is not uploaded at all: the keyframes are sent
+        inline with the prompt, which skips the upload and the PROCESSING wait.
+
+        Args:
+            video_path (str | list): Path to the recorded MP4 file, or the ordered list of
+                recording chunks. Chunks already uploaded with `prefetch_upload` are reused.
+            logs (list): List of log strings (actions and window contexts).
+            language (str): Language for the analysis report.
+            variable_frame_rate (bool): Whether unchanged screens were dropped from the video.
+            mode (str): "video" or "stills".
+            stills (list): Keyframes ({"path", "timestamp_s"}) from KeyframeService, for "stills" mode.
+            max_stills (int): Upper bound of images sent; extra stills are evenly subsampled.
+            summary (list): Lines computed locally from the whole session (window activity
+                statistics, click hotspots); hotspot clicks are left out of `logs`.
+
+        Returns:
+            str: The raw analysis text from Gemini.
+        """
+        self._ensure_model()
+
+        if mode == "stills":
+            if not stills:
+                raise ValueError("No keyframes available for stills analysis.")
+            media_parts = self._still_parts(stills, max_stills)
+            media_note = (f"Attached are {len(media_parts) // 2} screenshots of the distinct screens the user "
+                          f"visited, in chronological order, each preceded by its time since the start of the recording.")
+            print(f"Sending {len(media_parts) // 2} keyframes. Generating analysis...")
+        else:
+            video_paths = list(video_path) if isinstance(video_path, (list, tuple)) else [video_path]
+            media_parts = [self.upload_video(path) for path in video_paths]
+
+            print("Video processed. Generating analysis...")
+
+            media_note = "Attached is the video recording"
+            if len(media_parts) > 1:
+                media_note += f", split into {len(media_parts)} consecutive parts in chronological order"
+            media_note += "."
+            if variable_frame_rate:
+                media_note += (" Unchanged screens were removed from the video to save space, so its playback "
+                               "time is shorter than the real session. Use the log timestamps for real timing.")
 
         logs_text = "\n".join(logs)
+        summary_text = ""
+        if summary:
+            summary_lines = "\n".join(summary)
+            summary_text = f"""
+        The following summary was computed locally from the full session: time spent per window
+        (activity), the most frequent window transitions and click hotspots. Prefer these numbers for timings and frequencies.
+        Clicks that belong to a hotspot are not repeated in the logs:
+
+        --- SUMMARY START ---
+        {summary_lines}
+        --- SUMMARY END ---
+"""
         prompt = f"""
         You are an expert Process Analyst and Automation Engineer.
         I have recorded a user's screen performing a business process.
-        Attached is the video recording.
-        Below are the logs of their actions and active windows during the recording:
+        {media_note}
+        Below are the logs of their actions and active windows during the recording. A window's full title
+        is given the first time it appears ("Active Window #3: ..."); later lines refer back to it by number.
 
         --- LOGS START ---
         {logs_text}
         --- LOGS END ---
-
+{summary_text}
         Please analyze this process and provide:
         1. A detailed step-by-step description of the workflow observed.
         2. Identification of bottlenecks, inefficiencies, or repetitive tasks.
@@ -118,10 +247,12 @@ class AIService:
              - "label": A concise text description of the step (max 10 words).
              - "type": "process" (for actions) or "decision" (for questions/branches).
              - "next": The ID of the next step (or null if end).
+             - "window": The number N of the "Active Window #N" the step happens in, taken from the
+               logs (or null if the step has no matching window).
            - Example format:
              [
-               {"id": "s1", "label": "Start Process", "type": "process", "next": "s2"},
-               {"id": "s2", "label": "Is data valid?", "type": "decision", "next": "s3"},
+               {{"id": "s1", "label": "Start Process", "type": "process", "next": "s2", "window": 0}},
+               {{"id": "s2", "label": "Is data valid?", "type": "decision", "next": "s3", "window": 2}},
                ...
              ]
            - DO NOT include any Markdown formatting (like ```json) around the JSON. Just the raw array.
@@ -141,6 +272,23 @@ class AIService:
         ... text ...
         """
 
-        response = self.model.generate_content([video_file, prompt])
+        response = self.model.generate_content([*media_parts, prompt])
         
         return response.text
+
+    @staticmethod
+    def _still_parts(stills, max_stills):
+        """Builds interleaved [timestamp text, inline image] parts, subsampling to `max_stills`."""
+        if len(stills) > max_stills:
+            step = len(stills) / max_stills
+            stills = [stills[int(i * step)] for i in range(max_stills)]
+
+        parts = []
+        for still in stills:
+            seconds = int(still["timestamp_s"])
+            mime_type = "image/png" if still["path"].lower().endswith(".png") else "image/jpeg"
+            with open(still["path"], "rb") as f:
+                data = f.read()
+            parts.append(f"Screen at {seconds // 3600:02}:{seconds % 3600 // 60:02}:{seconds % 60:02}")
+            parts.append({"mime_type": mime_type, "data": data})
+        return parts
@@ -0,0 +1,157 @@
+import html
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from src.services.journal_service import JournalService, JOURNAL_SUFFIX
+from src.utils.conformance import ReferenceModel, align
+
+
+class ConformanceService:
+    """
+    Checks recordings against a reference flowchart.
+
+    A reference is the FLOWCHART_JSON of an analyzed session, saved with the
+    activity (normalized window title) of each step, resolved from the
+    "window" number the model gave it. Later sessions are replayed against
+    it by alignment (see `align`), one journal per task in a process pool, so
+    drift can be followed without a new AI analysis.
+    """
+
+    def __init__(self, references_dir, workers=None):
+        """
+        Args:
+            references_dir (str): Folder of the saved references (JSON).
+            workers (int): Processes used by `check` (None: one per CPU).
+        """
+        self.references_dir = references_dir
+        self.workers = workers
+
+    def save_reference(self, name, steps, window_labels):
+        """
+        Saves a flowchart as a reference model.
+
+        Args:
+            name (str): Reference name (also the file name).
+            steps (list): FLOWCHART_JSON steps of the analysis.
+            window_labels (dict): Window number of the session logs -> normalized title.
+
+        Returns:
+            str: Path of the saved reference.
+        """
+        reference_steps = []
+        for step in steps:
+            window = step.get("window")
+            if isinstance(window, str):
+                window = int(window.lstrip("#")) if window.lstrip("#").isdigit() else None
+            reference_steps.append({
+                "id": step.get("id"),
+                "label": step.get("label", ""),
+                "type": step.get("type", "process"),
+                "next": step.get("next"),
+                "activity": window_labels.get(window) if window is not None else None,
+            })
+        if not any(step["activity"] for step in reference_steps):
+            raise ValueError("Nenhuma etapa do fluxograma está associada a uma janela da sessão.")
+
+        filename = re.sub(r"[^\w\-]+", "_", name).strip("_") or "referencia"
+        path = os.path.join(self.references_dir, filename + ".json")
+        reference = {"name": name, "created": datetime.now().isoformat(timespec="seconds"), "steps": reference_steps}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(reference, f, ensure_ascii=False, indent=2)
+        return path
+
+    @staticmethod
+    def load_reference(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def check(self, reference, journal_paths):
+        """
+        Replays sessions against a reference.
+
+        Args:
+            reference (dict): A saved reference (see `load_reference`).
+            journal_paths (list): Session journals to check.
+
+        Returns:
+            list: Per-session dicts (session, recorded, events, fitness, skipped,
+            extra), oldest first; sessions without window activity are left out.
+        """
+        tasks = [(reference["steps"], path) for path in journal_paths]
+        if len(tasks) <= 1:
+            results = [check_journal(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(check_journal, tasks, chunksize=4))
+        results = [result for result in results if result is not None]
+        results.sort(key=lambda result: result["recorded"])
+        return results
+
+
+def check_journal(task):
+    """
+    Aligns one session journal with a reference; module-level for the process pool.
+
+    Args:
+        task (tuple): (reference steps, journal path).
+    """
+    steps, path = task
+    trace = []
+    for label in JournalService.read_activities(path):
+        if label and (not trace or trace[-1] != label):
+            trace.append(label)
+    if not trace:
+        return None
+    result = align(trace, ReferenceModel(steps))
+    return {
+        "session": os.path.basename(path)[:-len(JOURNAL_SUFFIX)],
+        "recorded": os.path.getmtime(path),
+        "events": len(trace),
+        "fitness": result["fitness"],
+        "skipped": result["skipped"],
+        "extra": result["extra"],
+    }
+
+
+def describe_conformance(reference, results, max_items=10):
+    """
+    Markdown summary of a conformance check, rendered by ReportService like an AI analysis.
+
+    Args:
+        reference (dict): The reference that was checked against.
+        results (list): Output of `ConformanceService.check`.
+        max_items (int): Skipped steps and extra activities listed.
+    """
+    lines = [f"# Conformidade com a Referência: {html.escape(reference['name'])}", ""]
+    if not results:
+        return "\n".join(lines + ["Nenhuma sessão com atividade de janelas para verificar."])
+
+    fitness = [result["fitness"] for result in results]
+    perfect = sum(1 for value in fitness if value >= 0.999)
+    lines += [f"{len(results)} sessões verificadas. Aderência média {sum(fitness) / len(fitness):.0%}, "
+              f"mínima {min(fitness):.0%}; {perfect} sessões ({perfect / len(results):.0%}) seguiram o modelo sem desvios.",
+              ""]
+
+    skipped = Counter(label for result in results for label in set(result["skipped"]))
+    if skipped:
+        lines += ["## Etapas mais puladas", "", "| Etapa | Sessões |", "|---|---|"]
+        lines += [f"| {html.escape(label)} | {count} |" for label, count in skipped.most_common(max_items)]
+        lines.append("")
+
+    extra = Counter(label for result in results for label in set(result["extra"]))
+    if extra:
+        lines += ["## Atividades fora do modelo", "", "| Atividade | Sessões |", "|---|---|"]
+        lines += [f"| {html.escape(label).replace('|', '/')} | {count} |" for label, count in extra.most_common(max_items)]
+        lines.append("")
+
+    lines += ["## Aderência por sessão", "", "| Sessão | Data | Aderência | Etapas puladas | Atividades extras |",
+              "|---|---|---|---|---|"]
+    for result in results:
+        recorded = datetime.fromtimestamp(result["recorded"]).strftime("%d/%m/%Y %H:%M")
+        lines.append(f"| {html.escape(result['session'])} | {recorded} | {result['fitness']:.0%} | "
+                     f"{len(result['skipped'])} | {len(result['extra'])} |")
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,281 @@
+import csv
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime, timezone
+from xml.sax.saxutils import quoteattr
+from src.services.journal_service import JournalService, JOURNAL_SUFFIX
+from src.utils.input_events import CLICK, KEY, SCROLL, DRAG
+from src.utils.process_graph import DirectlyFollowsGraph
+from src.utils.window_titles import TitleDictionary
+
+FORMAT_XES = "xes"
+FORMAT_CSV = "csv"
+
+CSV_COLUMNS = ("case_id", "activity", "timestamp", "source", "window")
+
+# Column names recognized on import, in order of preference
+_CASE_COLUMNS = ("case:concept:name", "case_id", "case", "caseid", "case id")
+_ACTIVITY_COLUMNS = ("concept:name", "activity", "activity_name", "event", "task")
+_TIMESTAMP_COLUMNS = ("time:timestamp", "timestamp", "time", "start_timestamp", "complete_timestamp")
+
+
+class EventLogService:
+    """
+    Exports session journals as standard event logs (XES or CSV) and imports
+    external ones into the project's analysis structures.
+
+    Both directions stream: export writes one event at a time while reading the
+    journals line by line, and import folds each event into a TitleDictionary,
+    a DirectlyFollowsGraph and one compact id array per case. Import memory
+    scales with the decoded activities (4 bytes per event in the case arrays,
+    plus the distinct labels), not with the size of the XML or CSV file.
+
+    Exported events use case id = session, activity = normalized window title
+    (window switches) or action ("Click (left)", "Typing", "Scroll", "Drag"),
+    and the wall-clock time. Key presses and scroll steps are exported once per
+    typing / scroll session; mouse paths are left out.
+    """
+
+    def __init__(self, include_actions=True, typing_gap=2.0, scroll_gap=1.0):
+        """
+        Args:
+            include_actions (bool): Export input actions as well as window switches.
+            typing_gap (float): Pause, in seconds, that starts a new "Typing" event.
+            scroll_gap (float): Pause, in seconds, that starts a new "Scroll" event.
+        """
+        self.include_actions = include_actions
+        self.typing_gap_ns = int(typing_gap * 1e9)
+        self.scroll_gap_ns = int(scroll_gap * 1e9)
+
+    @staticmethod
+    def detect_format(path):
+        """FORMAT_XES or FORMAT_CSV, from the file extension."""
+        return FORMAT_XES if path.lower().endswith(".xes") else FORMAT_CSV
+
+    # --- Export ---
+
+    def iter_session_events(self, journal_path):
+        """
+        Streams the events of one session journal.
+
+        Yields:
+            tuple: (case_id, activity, timestamp, source, window), with `timestamp` in
+            seconds since the epoch and `window` the active window of an action.
+        """
+        case = os.path.basename(journal_path)[:-len(JOURNAL_SUFFIX)]
+        start_ns, start_wall = 0, 0.0
+        window = ""
+        last_key_ns = last_scroll_ns = None
+        for record in JournalService.read(journal_path):
+            kind = record[0]
+            if kind == "session":
+                start_ns, start_wall = record[1]["start_ns"], record[1]["start_wall"]
+            elif kind == "activity":
+                window = record[2]
+                if window:
+                    yield case, window, record[3], "window", window
+            elif kind == "input" and self.include_actions:
+                event_kind, timestamp_ns, button = record[1], record[2], record[5]
+                if event_kind == KEY:
+                    new_session = last_key_ns is None or timestamp_ns - last_key_ns > self.typing_gap_ns
+                    last_key_ns = timestamp_ns
+                    if not new_session:
+                        continue
+                    activity = "Typing"
+                elif event_kind == SCROLL:
+                    new_session = last_scroll_ns is None or timestamp_ns - last_scroll_ns > self.scroll_gap_ns
+                    last_scroll_ns = timestamp_ns
+                    if not new_session:
+                        continue
+                    activity = "Scroll"
+                elif event_kind == CLICK:
+                    activity = f"Click ({button or 'left'})"
+                elif event_kind == DRAG:
+                    activity = f"Drag ({button or 'left'})"
+                else:
+                    continue
+                yield case, activity, start_wall + (timestamp_ns - start_ns) / 1e9, "action", window
+
+    def export(self, journal_paths, path, fmt=None):
+        """
+        Writes the sessions of `journal_paths` to one event log.
+
+        Args:
+            journal_paths (list): Session journals; each becomes a case.
+            path (str): Output file (.xes or .csv).
+            fmt (str): FORMAT_XES or FORMAT_CSV; guessed from `path` when omitted.
+
+        Returns:
+            int: Events written.
+        """
+        fmt = fmt or self.detect_format(path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            if fmt == FORMAT_XES:
+                count = self._write_xes(f, journal_paths)
+            else:
+                count = self._write_csv(f, journal_paths)
+        os.replace(tmp_path, path)
+        return count
+
+    def _write_csv(self, f, journal_paths):
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        count = 0
+        for journal_path in journal_paths:
+            for case, activity, timestamp, source, window in self.iter_session_events(journal_path):
+                writer.writerow((case, activity, _iso(timestamp), source, window))
+                count += 1
+        return count
+
+    def _write_xes(self, f, journal_paths):
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<log xes.version="1.0" xes.features="nested-attributes" xmlns="http://www.xes-standard.org/">\n'
+                '  <extension name="Concept" prefix="concept" uri="http://www.xes-standard.org/concept.xesext"/>\n'
+                '  <extension name="Time" prefix="time" uri="http://www.xes-standard.org/time.xesext"/>\n'
+                '  <extension name="Lifecycle" prefix="lifecycle" uri="http://www.xes-standard.org/lifecycle.xesext"/>\n'
+                '  <global scope="trace"><string key="concept:name" value=""/></global>\n'
+                '  <global scope="event"><string key="concept:name" value=""/>'
+                '<date key="time:timestamp" value="1970-01-01T00:00:00.000+00:00"/></global>\n'
+                '  <classifier name="Activity" keys="concept:name"/>\n')
+        count = 0
+        for journal_path in journal_paths:
+            trace_open = False
+            for case, activity, timestamp, source, window in self.iter_session_events(journal_path):
+                if not trace_open:
+                    f.write(f'  <trace>\n    <string key="concept:name" value={quoteattr(case)}/>\n')
+                    trace_open = True
+                f.write(f'    <event><string key="concept:name" value={quoteattr(activity)}/>'
+                        f'<date key="time:timestamp" value="{_iso(timestamp)}"/>'
+                        f'<string key="lifecycle:transition" value="complete"/>'
+                        f'<string key="source" value="{source}"/>'
+                        f'<string key="window" value={quoteattr(window)}/></event>\n')
+                count += 1
+            if trace_open:
+                f.write('  </trace>\n')
+        f.write('</log>\n')
+        return count
+
+    # --- Import ---
+
+    def import_log(self, path, fmt=None):
+        """
+        Reads an event log into the project's structures.
+
+        Args:
+            path (str): XES or CSV file.
+            fmt (str): FORMAT_XES or FORMAT_CSV; guessed from `path` when omitted.
+                The events of each case are expected in time order.
+
+        Returns:
+            dict: "titles" (TitleDictionary of the activities), "graph"
+            (DirectlyFollowsGraph of title ids), "traces" (case -> array of title ids)
+            and "events" (count).
+        """
+        fmt = fmt or self.detect_format(path)
+        titles = TitleDictionary()
+        graph = DirectlyFollowsGraph()
+        traces = {}
+        events = 0
+        last_case = None
+        for case, activity, timestamp in (self._iter_xes(path) if fmt == FORMAT_XES else self._iter_csv(path)):
+            if case != last_case and fmt == FORMAT_XES and last_case is not None:
+                # XES traces are contiguous: release the finished case's state right away
+                graph.end_case(last_case)
+            last_case = case
+            title_id = titles.intern(activity)
+            graph.add(title_id, timestamp, case)
+            trace = traces.get(case)
+            if trace is None:
+                trace = traces[case] = array("i")
+            trace.append(title_id)
+            events += 1
+        return {"titles": titles, "graph": graph, "traces": traces, "events": events}
+
+    @staticmethod
+    def _iter_xes(path):
+        """Yields (case, activity, timestamp) from an XES file with iterparse, freeing each event once read."""
+        root, trace, case, in_event = None, None, None, False
+        for event, element in ET.iterparse(path, events=("start", "end")):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                if root is None:
+                    root = element
+                elif tag == "trace":
+                    trace, case = element, None
+                elif tag == "event":
+                    in_event = True
+                continue
+            if tag == "string" and not in_event and element.get("key") == "concept:name":
+                case = element.get("value")
+            elif tag == "event":
+                in_event = False
+                activity, timestamp = None, None
+                for attribute in element:
+                    key = attribute.get("key")
+                    if key == "concept:name":
+                        activity = attribute.get("value")
+                    elif key == "time:timestamp":
+                        timestamp = _parse_time(attribute.get("value"))
+                if activity is not None:
+                    yield case, activity, timestamp or 0.0
+                # Drop the event from its trace, so a very long trace does not pile up in the tree
+                element.clear()
+                if trace is not None:
+                    # Earlier events are already gone, so this finds it among the first children
+                    trace.remove(element)
+            elif tag == "trace":
+                # Drop the finished trace from the tree so memory stays flat
+                trace = None
+                root.clear()
+
+    @staticmethod
+    def _iter_csv(path):
+        """Yields (case, activity, timestamp) from a CSV file, detecting the column names."""
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.reader(f, dialect)
+            header = [name.strip().lower() for name in next(reader, [])]
+            case_index = _find_column(header, _CASE_COLUMNS)
+            activity_index = _find_column(header, _ACTIVITY_COLUMNS)
+            time_index = _find_column(header, _TIMESTAMP_COLUMNS)
+            if case_index is None or activity_index is None:
+                raise ValueError(f"CSV sem colunas de caso e atividade reconhecidas: {header}")
+            for row in reader:
+                if len(row) <= max(case_index, activity_index):
+                    continue
+                timestamp = _parse_time(row[time_index]) if time_index is not None and time_index < len(row) else None
+                yield row[case_index], row[activity_index], timestamp or 0.0
+
+
+def _find_column(header, candidates):
+    for name in candidates:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def _iso(timestamp):
+    """Seconds since the epoch as an ISO 8601 local time with offset (XES date format)."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).astimezone().isoformat(timespec="milliseconds")
+
+
+def _parse_time(value):
+    """ISO 8601 date or epoch seconds -> seconds since the epoch (None if unreadable)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
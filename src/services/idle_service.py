@@ -0,0 +1,134 @@
+import threading
+import time
+from datetime import datetime
+
+
+class IdleService:
+    """
+    Pauses the recording while the user is away.
+
+    The user counts as idle when neither the mouse/keyboard listeners of the
+    LoggerService nor the recorder's frame-change detector saw any activity for
+    `timeout` seconds. Capture and window polling are then paused, and resumed on
+    the next input event. Every pause is kept as an interval for the timeline.
+    """
+
+    def __init__(self, logger, recorder, miner=None, timeout=120.0, on_pause=None, on_resume=None, journal=None):
+        """
+        Args:
+            logger (LoggerService): Source of input activity (`last_activity`, `activity_listeners`).
+            recorder (RecorderService): Recording to pause; its `last_screen_change` also counts as activity.
+            miner (MinerService): Window polling to pause, optional.
+            timeout (float): Seconds without activity before pausing.
+            on_pause (callable): Called when the recording is paused.
+            on_resume (callable): Called when the recording is resumed.
+            journal (JournalService): Also append the pause / resume lines to this session journal.
+        """
+        self.logger = logger
+        self.recorder = recorder
+        self.miner = miner
+        self.timeout = timeout
+        self.on_pause = on_pause
+        self.on_resume = on_resume
+        self.journal = journal
+        self.paused = False
+        # dicts with "start" and "end" datetimes ("end" is None while paused) and "resumed"
+        # (False when the session was stopped during the pause)
+        self.pauses = []
+        self.thread = None
+        self._activity = threading.Event()
+        self._stop_event = threading.Event()
+        self._started_at = None
+
+    def start(self):
+        """Starts watching for inactivity."""
+        if self.thread is None:
+            self.paused = False
+            self.pauses = []
+            self._started_at = time.monotonic()
+            self._activity.clear()
+            self._stop_event.clear()
+            self.logger.activity_listeners.append(self._activity.set)
+            self.thread = threading.Thread(target=self._run, name="idle-monitor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """
+        Stops watching. A pause still open ends here without resuming: the session
+        is being stopped, so the resume callback and the resume log line are skipped.
+        """
+        if self.thread:
+            self._stop_event.set()
+            self._activity.set()
+            self.thread.join()
+            self.thread = None
+            self.logger.activity_listeners.remove(self._activity.set)
+            if self.paused:
+                self.paused = False
+                if self.pauses and self.pauses[-1]["end"] is None:
+                    self.pauses[-1]["end"] = datetime.now()
+
+    def get_timeline_logs(self):
+        """Returns the pauses as log lines, in the same "[HH:MM:SS] ..." format as the other logs."""
+        logs = []
+        for pause in self.pauses:
+            logs.append(self._pause_line(pause["start"]))
+            if pause["resumed"]:
+                logs.append(self._resume_line(pause["end"]))
+        return logs
+
+    @staticmethod
+    def _pause_line(moment):
+        return f"[{moment.strftime('%H:%M:%S')}] Recording paused (user idle)"
+
+    @staticmethod
+    def _resume_line(moment):
+        return f"[{moment.strftime('%H:%M:%S')}] Recording resumed (user active)"
+
+    def idle_seconds(self):
+        """Seconds since the last input event or screen change."""
+        candidates = [self._started_at, self.logger.last_activity, self.recorder.last_screen_change]
+        return time.monotonic() - max(t for t in candidates if t is not None)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.paused:
+                # Only input can end a pause: the screen is not captured meanwhile
+                self._activity.wait()
+                self._activity.clear()
+                if not self._stop_event.is_set():
+                    self._resume()
+                continue
+
+            idle = self.idle_seconds()
+            if idle >= self.timeout:
+                self._pause()
+                continue
+
+            # Sleep until the timeout could expire; input events only reset the clock
+            self._stop_event.wait(min(self.timeout - idle, 1.0))
+            self._activity.clear()
+
+    def _pause(self):
+        self.paused = True
+        self.recorder.pause()
+        if self.miner:
+            self.miner.pause()
+        self.pauses.append({"start": datetime.now(), "end": None, "resumed": False})
+        if self.journal:
+            self.journal.write_log("idle", self._pause_line(self.pauses[-1]["start"]))
+        if self.on_pause:
+            self.on_pause()
+
+    def _resume(self):
+        self.paused = False
+        self.recorder.resume()
+        if self.miner:
+            self.miner.resume()
+        if self.pauses and self.pauses[-1]["end"] is None:
+            self.pauses[-1]["end"] = datetime.now()
+            self.pauses[-1]["resumed"] = True
+            if self.journal:
+                self.journal.write_log("idle", self._resume_line(self.pauses[-1]["end"]))
+        if self.on_resume:
+            self.on_resume()
@@ -0,0 +1,256 @@
+import glob
+import json
+import os
+import threading
+import time
+from src.utils.input_events import InputEventLog
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+class JournalService:
+    """
+    Append-only, on-disk journal of a recording session.
+
+    Every input event, window change and pause goes to `<video>.journal.jsonl`
+    next to the MP4, one JSON array per line, so the services only need to keep
+    a bounded tail in memory. A background thread flushes and fsyncs the file
+    every `fsync_interval` seconds, which bounds what a crash can lose.
+
+    Record types (first element of each line):
+        ["session", meta]                                 first line
+        ["input", kind, timestamp_ns, x, y, button, dx, dy]
+        ["log", source, line]                             window / pause lines, already rendered
+        ["activity", title_id, label, timestamp]          window switch (normalized title, time.time())
+        ["segment", segment]                              finished video chunk
+        ["end", summary]                                  last line of a clean stop
+
+    A journal without an "end" record belongs to a session that crashed;
+    `find_unfinished()` and `recover()` rebuild it on the next start.
+    """
+
+    def __init__(self, path, fsync_interval=2.0):
+        """
+        Args:
+            path (str): Journal file, normally `journal_path(video_file)`.
+            fsync_interval (float): Seconds between flushes to disk.
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def journal_path(video_file):
+        """Journal file that belongs to `video_file`."""
+        return os.path.splitext(video_file)[0] + JOURNAL_SUFFIX
+
+    def open(self, video_file, start_ns, start_wall, **meta):
+        """
+        Creates the journal and writes its "session" header.
+
+        Args:
+            video_file (str): The recording the journal belongs to.
+            start_ns (int): time.monotonic_ns() anchor of the input timestamps.
+            start_wall (float): time.time() at `start_ns`.
+            **meta: Extra session settings to keep (e.g. language, analysis mode).
+        """
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.records = 0
+        header = {"video": video_file, "start_ns": start_ns, "start_wall": start_wall}
+        header.update(meta)
+        self._write(["session", header])
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sync_loop, name="journal-fsync", daemon=True)
+        self._thread.start()
+
+    def write_input(self, kind, timestamp_ns, x, y, button, dx, dy):
+        self._write(["input", kind, timestamp_ns, x, y, button, dx, dy])
+
+    def write_log(self, source, line):
+        self._write(["log", source, line])
+
+    def write_activity(self, title_id, label, timestamp):
+        self._write(["activity", title_id, label, timestamp])
+
+    def write_segment(self, segment):
+        self._write(["segment", segment])
+
+    def close(self, **summary):
+        """Writes the "end" record and closes the file; the session is then complete."""
+        if self._file is None:
+            return
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._write(["end", summary])
+        with self._lock:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.write("\n")
+            self.records += 1
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _sync_loop(self):
+        while not self._stop_event.wait(self.fsync_interval):
+            with self._lock:
+                if self._file is not None:
+                    self._sync()
+
+    @staticmethod
+    def read(path):
+        """
+        Streams the records of a journal.
+
+        Lines cut short by a crash are skipped instead of raising.
+        """
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    @staticmethod
+    def load(path, max_events=None):
+        """
+        Rebuilds a session from its journal, reading it line by line.
+
+        Args:
+            path (str): Journal file.
+            max_events (int): Optional cap on the input events kept (oldest dropped).
+
+        Returns:
+            dict: "meta" (session header), "events" (InputEventLog), "logs" (window
+            and pause lines), "activities" ((title_id, label, timestamp) window switches),
+            "segments" (finished chunks) and "complete" (False when the session never
+            reached its "end" record).
+        """
+        session = {"meta": {}, "events": InputEventLog(max_events=max_events), "logs": [], "activities": [],
+                   "segments": [], "complete": False}
+        for record in JournalService.read(path):
+            kind = record[0]
+            if kind == "input":
+                session["events"].add(*record[1:])
+            elif kind == "log":
+                session["logs"].append(record[2])
+            elif kind == "activity":
+                session["activities"].append(tuple(record[1:]))
+            elif kind == "segment":
+                session["segments"].append(record[1])
+            elif kind == "session":
+                meta = record[1]
+                session["meta"] = meta
+                session["events"] = InputEventLog(start_ns=meta["start_ns"], start_wall=meta["start_wall"],
+                                                  max_events=max_events)
+            elif kind == "end":
+                session["complete"] = True
+        return session
+
+    @staticmethod
+    def read_activities(path):
+        """
+        Window labels of a journal, in order, without parsing the other records.
+
+        Input events make up most of a journal, so lines are filtered by prefix
+        before decoding; this keeps batch loads of many sessions cheap.
+        """
+        labels = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.startswith('["activity"'):
+                    continue
+                try:
+                    labels.append(json.loads(line)[2])
+                except (ValueError, IndexError):
+                    continue
+        return labels
+
+    @staticmethod
+    def find_all(directory):
+        """Every session journal in `directory`, oldest first."""
+        return sorted(glob.glob(os.path.join(directory, "*" + JOURNAL_SUFFIX)), key=os.path.getmtime)
+
+    @staticmethod
+    def find_unfinished(directory):
+        """Returns the journals in `directory` whose session never ended, newest first."""
+        unfinished = []
+        for path in glob.glob(os.path.join(directory, "*" + JOURNAL_SUFFIX)):
+            last = JournalService._last_record(path)
+            if last is not None and last[0] != "end":
+                unfinished.append(path)
+        return sorted(unfinished, key=os.path.getmtime, reverse=True)
+
+    @staticmethod
+    def _last_record(path, chunk_size=4096):
+        """Last complete record of a journal, reading only the end of the file."""
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - chunk_size))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def recover(path, playable=None):
+        """
+        Rebuilds a crashed session. The journal is left as is; once the session has
+        been analyzed, `mark_recovered` keeps it from being offered again.
+
+        The video chunks finished before the crash are listed in the journal; the
+        chunk being written (or the single, unsegmented video) is only kept if
+        `playable(path)` says it can still be read.
+
+        Args:
+            path (str): Journal of the crashed session.
+            playable (callable): Returns True if a video file can be decoded.
+
+        Returns:
+            dict: The session (see `load()`) plus "video_paths".
+        """
+        session = JournalService.load(path)
+        video_paths = [segment["path"] for segment in session["segments"] if os.path.exists(segment["path"])]
+
+        video = session["meta"].get("video")
+        candidates = []
+        if video:
+            base = os.path.splitext(video)[0]
+            candidates = [video, f"{base}_part{len(session['segments']):03d}.mp4"]
+        for candidate in candidates:
+            if candidate not in video_paths and os.path.exists(candidate) and (playable is None or playable(candidate)):
+                video_paths.append(candidate)
+        session["video_paths"] = video_paths
+        return session
+
+    @staticmethod
+    def mark_recovered(path):
+        """Appends the "end" record to a crashed session's journal, so it is no longer unfinished."""
+        end = json.dumps(["end", {"recovered": True, "recovered_at": time.time()}]) + "\n"
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            prefix = b""
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate the line cut short by the crash
+                    prefix = b"\n"
+            f.write(prefix + end.encode("utf-8"))
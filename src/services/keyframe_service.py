@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import cv2
+import numpy as np
+
+
+class KeyframeService:
+    """
+    Extracts the distinct screens of a recording as a compact set of still images.
+
+    A frame becomes a keyframe when it differs from the previous keyframe by its
+    difference hash (layout changes, such as a new form on the same white
+    background) or by its color histogram (such as a switch to another app).
+    Works live, fed frame by frame during the recording, or afterwards on the MP4.
+    """
+
+    def __init__(self, output_dir, hash_threshold=0.12, hist_threshold=0.25, min_interval=1.0,
+                 max_size=(1280, 720), image_format="jpg", jpeg_quality=80):
+        """
+        Args:
+            output_dir (str): Folder where the stills and `index.json` are written.
+            hash_threshold (float): Fraction of differing hash bits that marks a new screen.
+            hist_threshold (float): Bhattacharyya histogram distance that marks a new screen.
+            min_interval (float): Minimum seconds between two keyframes.
+            max_size (tuple): (width, height) box the stills are downscaled into.
+            image_format (str): "jpg" or "png".
+            jpeg_quality (int): JPEG quality (0-100).
+        """
+        self.output_dir = output_dir
+        self.hash_threshold = hash_threshold
+        self.hist_threshold = hist_threshold
+        self.min_interval = min_interval
+        self.max_size = max_size
+        self.image_format = image_format
+        self.jpeg_quality = jpeg_quality
+        self.index_file = os.path.join(output_dir, "index.json")
+        self.stills = []
+        self._last_hash = None
+        self._last_hist = None
+        self._last_time = None
+
+    def reset(self):
+        """Forgets the extracted stills (files already written are kept)."""
+        self.stills = []
+        self._last_hash = None
+        self._last_hist = None
+        self._last_time = None
+
+    def feed(self, frame, timestamp):
+        """
+        Checks one BGR frame and saves it if it shows a new screen. Must be called in capture order.
+
+        Args:
+            frame (np.ndarray): BGR frame.
+            timestamp (float): Seconds since the start of the recording.
+
+        Returns:
+            bool: True if the frame was saved as a keyframe.
+        """
+        if self._last_time is not None and timestamp - self._last_time < self.min_interval:
+            return False
+
+        frame_hash, frame_hist = self._signature(frame)
+        if self._last_hash is not None:
+            hash_distance = np.count_nonzero(frame_hash != self._last_hash) / frame_hash.size
+            hist_distance = cv2.compareHist(frame_hist, self._last_hist, cv2.HISTCMP_BHATTACHARYYA)
+            if hash_distance < self.hash_threshold and hist_distance < self.hist_threshold:
+                return False
+
+        self._save(frame, timestamp)
+        self._last_hash = frame_hash
+        self._last_hist = frame_hist
+        self._last_time = timestamp
+        return True
+
+    def extract_from_video(self, video_paths, timestamps_file=None):
+        """
+        Extracts keyframes from a finished recording.
+
+        Args:
+            video_paths (str | list): MP4 file, or the ordered list of recording chunks.
+            timestamps_file (str): Optional `<video>.timestamps.csv` with the real time of each
+                frame (needed when unchanged frames were skipped); otherwise frame / fps is used.
+
+        Returns:
+            list: The stills, as dicts with "path" and "timestamp_s".
+        """
+        if isinstance(video_paths, str):
+            video_paths = [video_paths]
+        real_times = self._load_timestamps(timestamps_file)
+
+        self.reset()
+        frame_index = 0
+        for path in video_paths:
+            capture = cv2.VideoCapture(path)
+            fps = capture.get(cv2.CAP_PROP_FPS) or 10.0
+            try:
+                while True:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    if frame_index < len(real_times):
+                        timestamp = real_times[frame_index]
+                    else:
+                        timestamp = frame_index / fps
+                    self.feed(frame, timestamp)
+                    frame_index += 1
+            finally:
+                capture.release()
+
+        self.finish()
+        return self.stills
+
+    def finish(self):
+        """Writes `index.json` listing every still with its timestamp."""
+        if not self.stills:
+            return
+        with open(self.index_file, "w", encoding="utf-8") as f:
+            json.dump(self.stills, f, indent=2)
+
+    def _signature(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        # Difference hash: 2 x 16x16 bits comparing horizontally and vertically adjacent cells
+        small = cv2.resize(gray, (17, 17), interpolation=cv2.INTER_AREA).astype(np.int16)
+        frame_hash = np.concatenate([
+            (small[:16, 1:] > small[:16, :-1]).ravel(),
+            (small[1:, :16] > small[:-1, :16]).ravel(),
+        ])
+
+        thumb = cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(thumb, cv2.COLOR_BGR2HSV) if thumb.ndim == 3 else thumb
+        channels = [0, 1] if thumb.ndim == 3 else [0]
+        bins = [16, 8] if thumb.ndim == 3 else [32]
+        ranges = [0, 180, 0, 256] if thumb.ndim == 3 else [0, 256]
+        hist = cv2.calcHist([hsv], channels, None, bins, ranges)
+        cv2.normalize(hist, hist)
+        return frame_hash, hist
+
+    def _save(self, frame, timestamp):
+        os.makedirs(self.output_dir, exist_ok=True)
+        height, width = frame.shape[:2]
+        if self.max_size:
+            scale = min(self.max_size[0] / width, self.max_size[1] / height, 1.0)
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+        filename = f"keyframe_{len(self.stills):04d}.{self.image_format}"
+        path = os.path.join(self.output_dir, filename)
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality] if self.image_format == "jpg" else []
+        cv2.imwrite(path, frame, params)
+        self.stills.append({"path": path, "timestamp_s": round(timestamp, 3)})
+
+    @staticmethod
+    def _load_timestamps(timestamps_file):
+        if not timestamps_file or not os.path.exists(timestamps_file):
+            return []
+        with open(timestamps_file, newline="", encoding="utf-8") as f:
+            return [float(row["timestamp_s"]) for row in csv.DictReader(f)]
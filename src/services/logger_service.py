@@ -1,65 +1,192 @@
 from pynput import mouse, keyboard
+import queue
 import time
 import threading
-from datetime import datetime
+from src.utils.input_events import InputEventLog, CLICK, KEY, MOVE_START, MOVE, SCROLL, DRAG
+from src.utils.gestures import MovePathBuilder
+
+_RELEASE = "release"  # Raw queue kind; becomes a DRAG event when the pointer moved
+_STOP = None  # Queue sentinel that ends the consumer thread
 
 class LoggerService:
     """
     Logs user input events (mouse clicks and keyboard activity) without recording specific keystrokes.
+
+    Events are kept as compact typed records with monotonic nanosecond timestamps
+    (see InputEventLog); text is only rendered when the prompt is built.
+
+    The pynput callbacks run on the OS hook threads, so they only stamp the event
+    and push a raw tuple into a SimpleQueue. A consumer thread normalizes and
+    stores them, and `stop_logging()` drains the queue before returning.
+
+    With `track_mouse`, pointer movement, scrolling and drags are logged too.
+    Moves arrive hundreds of times per second, so the move callback drops every
+    position closer than `move_min_distance` pixels or `move_min_interval`
+    seconds to the last one kept; the consumer then groups the rest into paths
+    simplified with Douglas-Peucker (see MovePathBuilder).
     """
 
-    def __init__(self):
-        self.logs = []
+    def __init__(self, track_mouse=False, move_min_distance=8, move_min_interval=0.05, path_gap=0.5,
+                 path_epsilon=6.0, drag_min_distance=12):
+        """
+        Args:
+            track_mouse (bool): Also log mouse movement, scrolling and drags.
+            move_min_distance (int): Pixels (Manhattan) the pointer must move before a position is kept.
+            move_min_interval (float): Minimum seconds between two kept positions.
+            path_gap (float): Pointer rest, in seconds, that ends a mouse path.
+            path_epsilon (float): Douglas-Peucker tolerance, in pixels, for mouse paths.
+            drag_min_distance (int): Pixels between press and release that make a drag.
+        """
+        self.track_mouse = track_mouse
+        self.move_min_distance = move_min_distance
+        self.move_min_interval_ns = int(move_min_interval * 1e9)
+        self.path_gap = path_gap
+        self.path_epsilon = path_epsilon
+        self.drag_min_distance = drag_min_distance
+        self.events = InputEventLog()
         self.logging = False
         self.mouse_listener = None
         self.keyboard_listener = None
         self.start_time = None
+        self.last_activity = None  # time.monotonic() of the last input event
+        self.activity_listeners = []  # Callables run on the consumer thread for every event (keep them cheap)
+        self.journal = None
+        self._queue = queue.SimpleQueue()
+        self._consumer = None
+        self._last_move = (0, 0, 0)  # x, y, timestamp_ns of the last queued position
+        self._paths = None
+        self._presses = {}
 
-    def start_logging(self):
-        """Starts logging mouse and keyboard events."""
+    def start_logging(self, listeners=True, journal=None, max_events=None):
+        """
+        Starts logging mouse and keyboard events.
+
+        Args:
+            listeners (bool): Hook the real mouse and keyboard. With False, events are only
+                recorded when the callbacks are called directly (e.g. by a benchmark).
+            journal (JournalService): Also append every stored event to this session journal.
+            max_events (int): Keep only about this many recent events in memory (use with a journal).
+        """
         if not self.logging:
             self.logging = True
-            self.logs = []
+            self.journal = journal
+            self.events = InputEventLog(max_events=max_events)
             self.start_time = time.time()
-            
-            # Setup listeners
-            self.mouse_listener = mouse.Listener(on_click=self._on_click)
-            self.keyboard_listener = keyboard.Listener(on_press=self._on_press)
-            
-            self.mouse_listener.start()
-            self.keyboard_listener.start()
+            self.last_activity = time.monotonic()
+            self._queue = queue.SimpleQueue()
+            self._last_move = (0, 0, 0)
+            self._paths = MovePathBuilder(self.path_gap, self.path_epsilon)
+            self._presses = {}
+            self._consumer = threading.Thread(target=self._consume, name="input-events", daemon=True)
+            self._consumer.start()
+
+            if listeners:
+                # Setup listeners
+                if self.track_mouse:
+                    self.mouse_listener = mouse.Listener(on_click=self._on_click, on_move=self._on_move,
+                                                         on_scroll=self._on_scroll)
+                else:
+                    self.mouse_listener = mouse.Listener(on_click=self._on_click)
+                self.keyboard_listener = keyboard.Listener(on_press=self._on_press)
+
+                self.mouse_listener.start()
+                self.keyboard_listener.start()
             print("Action logging started...")
 
     def stop_logging(self):
-        """Stops logging events and returns the log list."""
+        """Stops logging events, stores every queued event and returns the InputEventLog."""
         if self.logging:
             self.logging = False
-            if self.mouse_listener:
-                self.mouse_listener.stop()
-            if self.keyboard_listener:
-                self.keyboard_listener.stop()
+            # Join the listeners before queuing the sentinel: a callback that already
+            # passed the `self.logging` check may still be putting its event
+            for listener in (self.mouse_listener, self.keyboard_listener):
+                if listener:
+                    listener.stop()
+            for listener in (self.mouse_listener, self.keyboard_listener):
+                if listener:
+                    listener.join()
+            self.mouse_listener = None
+            self.keyboard_listener = None
+            self._queue.put(_STOP)
+            self._consumer.join()
+            self._consumer = None
             print("Action logging stopped.")
-            return self.logs
-        return []
+            return self.events
+        return InputEventLog()
 
     def get_logs(self):
-        """Returns the current logs."""
-        return self.logs
+        """Returns the current events rendered as text log lines (mouse paths still in progress are not included)."""
+        return self.events.render()
 
     def _on_click(self, x, y, button, pressed):
-        """Callback for mouse clicks."""
-        if pressed and self.logging:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] Mouse Click at ({x}, {y})"
-            self.logs.append(log_entry)
+        """Callback for mouse clicks (releases only matter for drags)."""
+        if self.logging and (pressed or self.track_mouse):
+            self._queue.put((CLICK if pressed else _RELEASE, time.monotonic_ns(), x, y, button))
+
+    def _on_move(self, x, y):
+        """Callback for pointer movement; keeps only positions past both decimation thresholds."""
+        if not self.logging:
+            return
+        now_ns = time.monotonic_ns()
+        last_x, last_y, last_ns = self._last_move
+        if now_ns - last_ns < self.move_min_interval_ns or abs(x - last_x) + abs(y - last_y) < self.move_min_distance:
+            return
+        self._last_move = (x, y, now_ns)
+        self._queue.put((MOVE, now_ns, x, y, None))
+
+    def _on_scroll(self, x, y, dx, dy):
+        """Callback for the mouse wheel."""
+        if self.logging:
+            self._queue.put((SCROLL, time.monotonic_ns(), x, y, (dx, dy)))
 
     def _on_press(self, key):
         """Callback for key presses. Does not record the key itself."""
         if self.logging:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] Keyboard Activity Detected"
-            # Avoid spamming logs with every single key press if typing fast
-            # We could add a small debounce here if needed, but for now we log all.
-            # To reduce noise, we might only log unique events per second in a real app.
-            if not self.logs or self.logs[-1] != log_entry:
-                 self.logs.append(log_entry)
+            self._queue.put((KEY, time.monotonic_ns(), None, None, None))
+
+    def _consume(self):
+        """Moves raw events from the queue into the event log."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            kind, timestamp_ns, x, y, extra = item
+            if kind == MOVE:
+                self._store_path(self._paths.add(timestamp_ns, x, y))
+                self._mark_activity(timestamp_ns)
+                continue
+
+            # Any other event ends the current mouse path, so the log stays in time order
+            self._store_path(self._paths.flush())
+            if kind == SCROLL:
+                self._store(SCROLL, timestamp_ns, x, y, dx=int(extra[0]), dy=int(extra[1]))
+            elif kind == CLICK:
+                button = getattr(extra, "name", None)
+                self._presses[button] = (x, y)
+                self._store(CLICK, timestamp_ns, x, y, button)
+            elif kind == _RELEASE:
+                button = getattr(extra, "name", None)
+                press = self._presses.pop(button, None)
+                if press and abs(x - press[0]) + abs(y - press[1]) >= self.drag_min_distance:
+                    self._store(DRAG, timestamp_ns, x, y, button)
+            else:
+                self._store(kind, timestamp_ns)
+            self._mark_activity(timestamp_ns)
+        self._store_path(self._paths.flush())
+
+    def _store_path(self, path):
+        if not path:
+            return
+        self._store(MOVE_START, *path[0])
+        for timestamp_ns, x, y in path[1:]:
+            self._store(MOVE, timestamp_ns, x, y)
+
+    def _store(self, kind, timestamp_ns, x=None, y=None, button=None, dx=0, dy=0):
+        self.events.add(kind, timestamp_ns, x, y, button, dx, dy)
+        if self.journal:
+            self.journal.write_input(kind, timestamp_ns, x, y, button, dx, dy)
+
+    def _mark_activity(self, now_ns):
+        self.last_activity = now_ns / 1e9
+        for listener in self.activity_listeners:
+            listener()
@@ -1,30 +1,72 @@
 import pygetwindow as gw
 import time
 import threading
+from collections import deque
 from datetime import datetime
+from src.utils.window_titles import TitleDictionary
+from src.utils.process_graph import DirectlyFollowsGraph
 
 class MinerService:
     """
     Monitors the active window to identify the context of the user's work.
+
+    Window activity is kept as intervals (title id, start, end): a log line is
+    only emitted when the active window changes. Titles are interned in a
+    TitleDictionary, so intervals hold a small id instead of a string copy, and
+    titles differing only in volatile parts (unread counters, times, paths)
+    count as the same window. Each switch also updates a DirectlyFollowsGraph of
+    the title ids, so activity and transition statistics are ready as soon as
+    the recording stops. Polling adapts to the user: every
+    `fast_interval` seconds while input events keep arriving (see
+    `notify_activity()`), every `idle_interval` seconds otherwise, and an input
+    event after a quiet spell triggers a poll right away, since clicks and
+    shortcuts are what usually switch windows.
     """
 
-    def __init__(self, interval=1.0):
+    def __init__(self, fast_interval=0.25, idle_interval=2.0, active_seconds=3.0):
         """
         Args:
-            interval (float): How often to check the active window (in seconds).
+            fast_interval (float): Seconds between checks while the user is active.
+            idle_interval (float): Seconds between checks when there was no input for `active_seconds`.
+            active_seconds (float): How long after an input event the user counts as active.
         """
-        self.interval = interval
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.active_seconds = active_seconds
         self.monitoring = False
-        self.logs = []
+        self.titles = TitleDictionary()
+        self.graph = DirectlyFollowsGraph()
+        self.intervals = []  # dicts with "title_id", "start" and "end" datetimes ("end" is None while active)
+        self.polls = 0
         self.thread = None
+        self.journal = None
+        self.active_window_rect = None
+        self.paused = False
+        self._paused_at = None
+        self._last_activity = 0.0
+        self._described = set()  # Title ids already written in full to the journal
         self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def start_monitoring(self, journal=None, max_logs=None):
+        """
+        Starts monitoring the active window in a separate thread.
 
-    def start_monitoring(self):
-        """Starts monitoring the active window in a separate thread."""
+        Args:
+            journal (JournalService): Also append every log line to this session journal.
+            max_logs (int): Keep only the newest intervals in memory (use with a journal).
+        """
         if not self.monitoring:
             self.monitoring = True
-            self.logs = []
+            self.journal = journal
+            self.titles = TitleDictionary()
+            self.graph = DirectlyFollowsGraph()
+            self._described = set()
+            self.intervals = deque(maxlen=max_logs) if max_logs else []
+            self.polls = 0
+            self.paused = False
             self._stop_event.clear()
+            self._wake.clear()
             self.thread = threading.Thread(target=self._monitor)
             self.thread.start()
             print("Process monitoring started...")
@@ -34,37 +76,127 @@ class MinerService:
         if self.monitoring:
             self.monitoring = False
             self._stop_event.set()
+            self._wake.set()
             if self.thread:
                 self.thread.join()
-            print("Process monitoring stopped.")
-            return self.logs
+            self._close_interval(datetime.now())
+            print(f"Process monitoring stopped ({len(self.intervals)} window intervals, {self.polls} checks).")
+            return self.get_logs()
         return []
 
     def get_logs(self):
-        return self.logs
+        """Renders the intervals kept in memory as "[HH:MM:SS] Active Window ..." lines."""
+        described = set()
+        return [self._window_line(interval, described) for interval in list(self.intervals)]
+
+    def get_intervals(self):
+        """Window intervals so far, oldest first (the current one has "end" None)."""
+        return list(self.intervals)
+
+    def activity_label(self, title_id):
+        """Display name of an activity of `graph` (its window title)."""
+        return f"#{title_id} {self.titles.label(title_id) or 'None'}"
+
+    def notify_activity(self):
+        """Input event callback (LoggerService.activity_listeners); switches to fast polling."""
+        self._last_activity = time.monotonic()
+        self._wake.set()
+
+    def pause(self):
+        """Suspends window polling (e.g. while the user is idle)."""
+        self._paused_at = datetime.now()
+        self.paused = True
+        self._wake.set()
+
+    def resume(self):
+        self.paused = False
+        self._wake.set()
+
+    def get_active_window_rect(self):
+        """
+        Returns the bounds of the active window as (left, top, width, height) in
+        virtual-screen coordinates, or None if there is no usable active window.
+        """
+        return self.active_window_rect
 
     def _monitor(self):
         """Internal method to loop and check active window."""
-        last_window_title = ""
         while not self._stop_event.is_set():
-            try:
-                window = gw.getActiveWindow()
-                if window:
-                    title = window.title
-                    # Only log if the window changed or periodically?
-                    # The requirement says "a cada segundo", so we log every second.
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    log_entry = f"[{timestamp}] Active Window: {title}"
-                    
-                    # Optional: Deduplicate consecutive identical logs to save space
-                    # if title != last_window_title:
-                    self.logs.append(log_entry)
-                    last_window_title = title
-                else:
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    self.logs.append(f"[{timestamp}] Active Window: None")
-
-            except Exception as e:
-                print(f"Error getting active window: {e}")
-            
-            time.sleep(self.interval)
+            if self.paused:
+                # The pause ends the current interval; the window is logged again on resume
+                self._close_interval(self._paused_at or datetime.now())
+                self._wake.clear()
+                if self.paused:
+                    self._wake.wait()
+                continue
+
+            last_poll = time.monotonic()
+            self._poll()
+            self._wake.clear()
+
+            if last_poll - self._last_activity < self.active_seconds:
+                # Input keeps arriving: poll on a short, fixed period
+                self._stop_event.wait(self.fast_interval)
+            elif self._wake.wait(self.idle_interval) and not self._stop_event.is_set():
+                # First input after a quiet spell: check soon, but not more often than fast_interval
+                self._stop_event.wait(max(0.0, last_poll + self.fast_interval - time.monotonic()))
+
+    def _poll(self):
+        """Checks the active window once and logs it if it changed."""
+        self.polls += 1
+        try:
+            window = gw.getActiveWindow()
+            if window:
+                title_id = self.titles.intern(window.title)
+                self.active_window_rect = self._window_rect(window)
+            else:
+                title_id = self.titles.intern(None)
+                self.active_window_rect = None
+        except Exception as e:
+            print(f"Error getting active window: {e}")
+            return
+
+        current = self.intervals[-1] if self.intervals and self.intervals[-1]["end"] is None else None
+        if current is not None and current["title_id"] == title_id:
+            return
+        now = datetime.now()
+        self._close_interval(now)
+        interval = {"title_id": title_id, "start": now, "end": None}
+        self.intervals.append(interval)
+        self.graph.add(title_id, now.timestamp())
+        if self.journal:
+            self.journal.write_log("window", self._window_line(interval, self._described))
+            self.journal.write_activity(title_id, self.titles.label(title_id), now.timestamp())
+
+    def _close_interval(self, moment):
+        if self.intervals and self.intervals[-1]["end"] is None:
+            self.intervals[-1]["end"] = moment
+            self.graph.pause(moment.timestamp())
+
+    def _window_line(self, interval, described):
+        """
+        Log line of an interval. The full title is only written the first time an
+        id appears in `described`; later lines refer to it as "#id (application)".
+        """
+        title_id = interval["title_id"]
+        label = self.titles.label(title_id)
+        timestamp = interval["start"].strftime("%H:%M:%S")
+        if not label:
+            return f"[{timestamp}] Active Window: None"
+        if title_id in described:
+            return f"[{timestamp}] Active Window #{title_id} ({self.titles.application(title_id)})"
+        described.add(title_id)
+        return f"[{timestamp}] Active Window #{title_id}: {label}"
+
+    @staticmethod
+    def _window_rect(window):
+        """Bounds of a pygetwindow window, or None when it is minimized or degenerate."""
+        try:
+            if getattr(window, "isMinimized", False):
+                return None
+            left, top, width, height = window.left, window.top, window.width, window.height
+        except Exception:
+            return None
+        if width <= 0 or height <= 0:
+            return None
+        return (left, top, width, height)
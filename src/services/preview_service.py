@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+import cv2
+import numpy as np
+
+PREVIEW_WINDOW_TITLE = "Gravando Processo (Pressione 'q' para minimizar)"
+
+
+def preview_supported():
+    """Returns False on headless sessions where an OpenCV window cannot be shown."""
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+class PreviewService:
+    """
+    Shows a low-rate preview of the recording, out of the capture loop.
+
+    The recorder only publishes frames to a LatestFrameSlot; this thread wakes up
+    a few times per second, picks the newest frame, resizes and displays it.
+    HighGUI windows belong to the thread that created them, so every OpenCV
+    window call happens here.
+    """
+
+    def __init__(self, slot, fps=2.0, scale=0.5, enabled=True, on_closed=None):
+        """
+        Args:
+            slot (LatestFrameSlot): Where the recorder publishes captured frames.
+            fps (float): Preview refresh rate.
+            scale (float): Resize factor applied to the previewed frame.
+            enabled (bool): Whether the preview window is shown initially.
+            on_closed (callable): Called when the user closes the preview with 'q'.
+        """
+        self.slot = slot
+        self.fps = fps
+        self.scale = scale
+        self.enabled = enabled and preview_supported()
+        self.on_closed = on_closed
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._window_open = False
+
+    def start(self):
+        """Starts the preview thread."""
+        if self.thread is None:
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="preview", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stops the preview thread and closes the window."""
+        if self.thread:
+            self._stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def set_enabled(self, enabled):
+        """Shows or hides the preview window while recording."""
+        self.enabled = enabled and preview_supported()
+
+    def _run(self):
+        """Internal loop: refresh the window with the newest frame at `fps`."""
+        interval = 1.0 / self.fps
+        last_version = 0
+        while not self._stop_event.wait(interval):
+            if not self.enabled:
+                self._close_window()
+                continue
+
+            version, frame = self.slot.latest()
+            if frame is None or version == last_version:
+                continue
+            last_version = version
+
+            try:
+                preview_frame = cv2.resize(np.asarray(frame), (0, 0), fx=self.scale, fy=self.scale,
+                                           interpolation=cv2.INTER_NEAREST)
+                cv2.imshow(PREVIEW_WINDOW_TITLE, preview_frame)
+                self._window_open = True
+
+                # Check for 'q' key to close the preview window (but continue recording)
+                # waitKey(1) is required for imshow to work
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.enabled = False
+                    # Let the owner update its own state (e.g. the preview switch)
+                    if self.on_closed:
+                        self.on_closed()
+            except cv2.error as e:
+                # OpenCV builds without GUI support (e.g. opencv-python-headless)
+                print(f"Preview disabled: {e}")
+                self.enabled = False
+
+        self._close_window()
+
+    def _close_window(self):
+        if self._window_open:
+            try:
+                cv2.destroyAllWindows()
+            except cv2.error:
+                pass
+            self._window_open = False
@@ -1,92 +1,387 @@
-import cv2
-import numpy as np
-import mss
+import os
 import threading
 import time
 from datetime import datetime
+from src.utils.frame_queue import FrameQueue, LatestFrameSlot, DROP_OLDEST
+from src.utils.frame_diff import FrameChangeDetector
+from src.utils.frame_scaling import compute_output_size, scale_frame, letterbox
+from src.utils.segment_writer import SegmentedVideoWriter
+from src.utils.frame_scheduler import FrameScheduler, SKIP
+from src.utils.recorder_stats import RecorderStats
+from src.utils.frame_convert import FrameConverter, bgra_view
+from src.utils.capture_sources import MssCaptureSource
+from src.services.preview_service import PreviewService
+
+# Capture modes
+CAPTURE_MONITOR = "monitor"
+CAPTURE_ACTIVE_WINDOW = "active_window"
 
 class RecorderService:
     """
     Records the screen activity to an MP4 video file.
-    Runs in a separate thread to avoid blocking the main application.
+
+    Capture and encoding run in separate threads: a producer thread grabs and
+    timestamps frames into a bounded FrameQueue, and one or more encoder workers
+    convert and write them, so a slow VideoWriter no longer throttles the capture.
+
+    With `skip_unchanged`, frames that barely differ from the last written one are
+    not encoded. The real capture time of every written frame goes to a sidecar
+    CSV (`<video>.timestamps.csv`), so the timing survives the variable frame rate.
+
+    `max_size` selects a recording profile: frames are downscaled once, right after
+    the grab, so conversion, encoding, disk and upload all work on the smaller frame.
+
+    The live preview is a separate low-rate consumer (PreviewService) that reads
+    the newest frame from a shared slot, so the capture loop never touches the GUI.
+
+    With `segment_seconds` / `segment_mb`, the video is split into numbered,
+    independently playable chunks (see SegmentedVideoWriter) and
+    `on_segment_complete` fires for each finished chunk, so uploads can start
+    while the user is still working.
+
+    An optional KeyframeService is fed every written frame, so the distinct
+    screens are available as stills as soon as the recording stops.
+
+    The capture loop is paced by a FrameScheduler on monotonic deadlines, and
+    `get_stats()` reports per-stage latency histograms and the achieved frame rate.
+
+    In CAPTURE_ACTIVE_WINDOW mode only the active window is grabbed (its bounds
+    come from `region_provider`, e.g. MinerService.get_active_window_rect), clipped
+    to the union of all monitors and letterboxed into a fixed output size.
+
+    `pause()` / `resume()` suspend the capture without closing the video (used by
+    IdleService); timestamps keep running, so the gap shows in the sidecar CSV.
+
+    Frames come from a capture source (MssCaptureSource by default); a
+    SyntheticCaptureSource runs the whole pipeline without a display.
     """
 
-    def __init__(self, output_file="output.mp4", fps=10.0):
+    def __init__(self, output_file="output.mp4", fps=10.0, queue_size=32,
+                 backpressure=DROP_OLDEST, encoder_workers=1, skip_unchanged=False,
+                 change_threshold=0.0002, max_skip_seconds=5.0, max_size=None,
+                 preview=True, preview_fps=2.0, segment_seconds=0, segment_mb=0,
+                 on_segment_complete=None, encoder_backend="auto", encoder_options=None,
+                 keyframes=None, late_frame_policy=SKIP, capture_mode=CAPTURE_MONITOR,
+                 region_provider=None, capture_source=None, on_preview_closed=None, on_error=None):
         """
         Initialize the ScreenRecorder.
 
         Args:
             output_file (str): Path to save the video file.
             fps (float): Frames per second for the recording.
+            queue_size (int): Capacity of the frame buffer between capture and encoding.
+            backpressure (str): What to do when the buffer is full ("drop_oldest" or "block").
+            encoder_workers (int): Number of threads converting and writing frames.
+            skip_unchanged (bool): Drop frames that did not change since the last written one.
+            change_threshold (float): Fraction of the downscaled frame that must change to keep a frame.
+            max_skip_seconds (float): Write at least one frame this often, even on a static screen.
+            max_size (tuple): (width, height) box the frames are downscaled into; None keeps the native size.
+            preview (bool): Show the preview window; can be toggled later with `set_preview_enabled`.
+            preview_fps (float): Refresh rate of the preview window.
+            segment_seconds (float): Rotate to a new chunk every N seconds (0 disables).
+            segment_mb (float): Rotate to a new chunk every M megabytes (0 disables).
+            on_segment_complete (callable): Called with the segment dict of every finished chunk.
+            encoder_backend (str): "auto" (ffmpeg when available), "opencv" or "ffmpeg".
+            encoder_options (dict): Backend options, e.g. {"crf": 28, "preset": "veryfast"}.
+            keyframes (KeyframeService): Extracts stills live from the written frames.
+            late_frame_policy (str): "skip" missed frame slots or "catch_up" on them.
+            capture_mode (str): CAPTURE_MONITOR (primary monitor) or CAPTURE_ACTIVE_WINDOW.
+            region_provider (callable): Returns the active window as (left, top, width, height) or None.
+            capture_source: Context manager with `monitor`, `screen` and `grab(region)`; defaults to mss.
+            on_preview_closed (callable): Called when the user closes the preview window with 'q'.
+            on_error (callable): Called with the exception when an encoder worker fails; the
+                capture then stops. Runs on the worker thread, so it must not stop the recording itself.
         """
         self.output_file = output_file
         self.fps = fps
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.encoder_workers = max(1, encoder_workers)
         self.recording = False
+        self.paused = False
         self.thread = None
         self.width = 1920
         self.height = 1080
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_skipped = 0
+        self.skip_unchanged = skip_unchanged
+        self.max_size = max_size
+        self.timestamps_file = os.path.splitext(output_file)[0] + ".timestamps.csv"
+        self.segment_seconds = segment_seconds
+        self.segment_mb = segment_mb
+        self.on_segment_complete = on_segment_complete
+        self.on_error = on_error
+        self.error = None  # First encoder failure of the recording
+        self.segments = []
+        self.encoder_backend = encoder_backend
+        self.encoder_options = encoder_options
+        self.keyframes = keyframes
+        self.late_frame_policy = late_frame_policy
+        self.capture_mode = capture_mode
+        self.region_provider = region_provider
+        self.capture_source = capture_source or MssCaptureSource()
+        self.stats = RecorderStats(fps)
+        self._change_detector = FrameChangeDetector(
+            threshold=change_threshold, max_skip_seconds=max_skip_seconds
+        ) if skip_unchanged else None
+        self._preview_slot = LatestFrameSlot()
+        self.preview = PreviewService(self._preview_slot, fps=preview_fps, enabled=preview,
+                                      on_closed=on_preview_closed)
+        self._start_timestamp = None
+        self.capture_region = None  # Screen area of the frames (monitor mode only; windows move)
         self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._queue = None
+        self._writer = None
+        self._workers = []
+        self._write_cond = threading.Condition()
+        self._next_write = 0
+
+    @property
+    def frames_dropped(self):
+        """Number of frames discarded by the back-pressure policy."""
+        return self._queue.dropped if self._queue is not None else 0
 
     def start_recording(self):
         """Starts the screen recording in a separate thread."""
         if not self.recording:
             self.recording = True
+            self.paused = False
             self._stop_event.clear()
+            self._resume_event.set()
+            self.frames_captured = 0
+            self.frames_written = 0
+            self.frames_skipped = 0
+            self.segments = []
+            self.error = None
+            self.stats = RecorderStats(self.fps)
+            self._next_write = 0
+            if self._change_detector:
+                self._change_detector.reset()
+            if self.keyframes:
+                self.keyframes.reset()
+            self._queue = FrameQueue(maxsize=self.queue_size, policy=self.backpressure)
             self.thread = threading.Thread(target=self._record)
             self.thread.start()
+            self.preview.start()
             print(f"Started recording to {self.output_file}...")
 
     def stop_recording(self):
-        """Stops the screen recording."""
+        """Stops the screen recording and waits for the encoders to drain the buffer."""
         if self.recording:
             self.recording = False
             self._stop_event.set()
             if self.thread:
                 self.thread.join()
-            print("Recording stopped.")
+            self.preview.stop()
+            self._preview_slot.clear()
+            print(f"Recording stopped. {self.frames_written} frames written, "
+                  f"{self.frames_skipped} unchanged skipped, {self.frames_dropped} dropped, "
+                  f"{self.stats.achieved_fps():.1f}/{self.fps:g} fps.")
+
+    def pause(self):
+        """Suspends the capture; the video stays open until `stop_recording`."""
+        if self.recording and not self.paused:
+            self.paused = True
+            self.stats.pause()
+            self._resume_event.clear()
+            print("Recording paused.")
+
+    def resume(self):
+        """Resumes a paused capture."""
+        if self.paused:
+            self.paused = False
+            self.stats.resume()
+            self._resume_event.set()
+            print("Recording resumed.")
+
+    @property
+    def last_screen_change(self):
+        """time.monotonic() of the last frame that differed from the previous one (needs `skip_unchanged`)."""
+        return self._change_detector.last_change_time if self._change_detector else None
+
+    @property
+    def start_monotonic(self):
+        """time.monotonic() of the first frame; video timestamps are relative to it."""
+        return self._start_timestamp
+
+    @property
+    def video_paths(self):
+        """Paths of the recorded video files (one, or every chunk when segmenting)."""
+        if self.segments:
+            return [segment["path"] for segment in self.segments]
+        return [self.output_file]
+
+    def get_stats(self):
+        """
+        Returns the recording telemetry: target and achieved fps, missed deadlines,
+        capture / convert / encode latency and frame interval histograms, and the
+        written / skipped / dropped frame counters.
+        """
+        stats = self.stats.snapshot()
+        stats.update({
+            "frames_captured": self.frames_captured,
+            "frames_written": self.frames_written,
+            "frames_skipped": self.frames_skipped,
+            "frames_dropped": self.frames_dropped,
+        })
+        return stats
+
+    def set_preview_enabled(self, enabled):
+        """Shows or hides the live preview without interrupting the recording."""
+        self.preview.set_enabled(enabled)
 
     def _record(self):
-        """Internal method to capture screen and write to video file."""
-        with mss.mss() as sct:
-            # Get the primary monitor dimensions
-            monitor = sct.monitors[1]
-            self.width = monitor["width"]
-            self.height = monitor["height"]
-
-            # Define the codec and create VideoWriter object
-            # mp4v is a good option for MP4 files
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(self.output_file, fourcc, self.fps, (self.width, self.height))
-
-            frame_duration = 1.0 / self.fps
-
-            while not self._stop_event.is_set():
-                start_time = time.time()
-
-                # Capture the screen
-                img = sct.grab(monitor)
-                
-                # Convert to numpy array and then to BGR (OpenCV format)
-                frame = np.array(img)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
-                # Write the frame
-                out.write(frame)
-
-                # Visual Feedback
-                # Resize for preview to avoid taking up too much screen
-                preview_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-                cv2.imshow("Gravando Processo (Pressione 'q' para minimizar)", preview_frame)
-                
-                # Check for 'q' key to close the preview window (but continue recording)
-                # waitKey(1) is required for imshow to work
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    cv2.destroyAllWindows()
-
-                # Control FPS
-                elapsed = time.time() - start_time
-                wait_time = max(0, frame_duration - elapsed)
-                time.sleep(wait_time)
-
-            out.release()
-            cv2.destroyAllWindows()
+        """Internal method to capture the screen and feed the encoder workers."""
+        with self.capture_source as source:
+            # Primary monitor, and the union of all monitors for window capture
+            monitor = source.monitor
+            screen = source.screen
+            self.width, self.height = compute_output_size(monitor["width"], monitor["height"], self.max_size)
+            needs_scaling = (self.width, self.height) != (monitor["width"], monitor["height"])
+            window_mode = self.capture_mode == CAPTURE_ACTIVE_WINDOW and self.region_provider is not None
+            self.capture_region = None if window_mode else dict(monitor)
+
+            self._writer = SegmentedVideoWriter(
+                self.output_file, self.fps, (self.width, self.height),
+                segment_seconds=self.segment_seconds, segment_mb=self.segment_mb,
+                on_segment_complete=self.on_segment_complete,
+                backend=self.encoder_backend, encoder_options=self.encoder_options
+            )
+            self.segments = self._writer.segments
+
+            self._workers = [
+                threading.Thread(target=self._encode_worker, name=f"encoder-{i}", daemon=True)
+                for i in range(self.encoder_workers)
+            ]
+            for worker in self._workers:
+                worker.start()
+
+            scheduler = FrameScheduler(self.fps, policy=self.late_frame_policy)
+            scheduler.start()
+            self.stats.start()
+            self._start_timestamp = time.monotonic()
+            missed = 0
+
+            try:
+                while not self._stop_event.is_set():
+                    if self.paused:
+                        self._wait_while_paused()
+                        scheduler.start()
+                        missed = 0
+                        continue
+                    start_time = time.monotonic()
+
+                    # Capture the screen and stamp it; conversion happens in the workers
+                    if window_mode:
+                        img = source.grab(self._window_region(screen, monitor))
+                        img = letterbox(bgra_view(img), (self.width, self.height))
+                    else:
+                        img = source.grab(monitor)
+                    if needs_scaling and not window_mode:
+                        # Downscale once here so the queue holds small frames
+                        img = scale_frame(bgra_view(img), (self.width, self.height))
+                    self.stats.record("capture", time.monotonic() - start_time)
+                    self.stats.frame_captured(start_time, missed)
+
+                    self._queue.put((start_time, img))
+                    if self.preview.enabled:
+                        self._preview_slot.publish(img)
+                    self.frames_captured += 1
+
+                    # Control FPS on absolute deadlines
+                    missed = scheduler.wait(self._stop_event)
+            finally:
+                self.stats.stop()
+                self._queue.close()
+                for worker in self._workers:
+                    worker.join()
+                end_timestamp = time.monotonic() - self._start_timestamp
+                self._writer.close(end_timestamp)
+                self._writer = None
+                if self.keyframes:
+                    self.keyframes.finish()
+
+    def _wait_while_paused(self, poll_interval=0.25):
+        """Blocks until `resume()` or `stop_recording()` is called."""
+        while not self._resume_event.wait(poll_interval):
+            if self._stop_event.is_set():
+                return
+
+    def _window_region(self, screen, fallback, min_size=64):
+        """Active window bounds clipped to the virtual screen, or `fallback` if unusable."""
+        try:
+            rect = self.region_provider()
+        except Exception:
+            rect = None
+        if not rect:
+            return fallback
+
+        left, top, width, height = rect
+        right = min(left + width, screen["left"] + screen["width"])
+        bottom = min(top + height, screen["top"] + screen["height"])
+        left = max(left, screen["left"])
+        top = max(top, screen["top"])
+        if right - left < min_size or bottom - top < min_size:
+            return fallback
+        return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+    def _encode_worker(self):
+        """Converts queued frames to BGR and writes them in capture order."""
+        # Each worker converts into its own reused buffer; it is free again once the frame is written
+        converter = FrameConverter()
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            ticket, (timestamp, img) = entry
+
+            frame = thumb = None
+            if self.error is None:
+                try:
+                    # Wrap the BGRA buffer without copying and convert to BGR (OpenCV format)
+                    convert_start = time.monotonic()
+                    frame = converter.convert(img)
+                    thumb = self._change_detector.thumbnail(frame) if self._change_detector else None
+                    self.stats.record("convert", time.monotonic() - convert_start)
+                except Exception as e:
+                    self._fail(e)
+
+            # Wait for our turn so parallel workers keep the frame order. After a failure the
+            # workers keep taking their turns and draining the queue, so neither the other
+            # workers nor a capture blocked on a full queue can hang
+            with self._write_cond:
+                while self._next_write != ticket:
+                    self._write_cond.wait()
+                try:
+                    if frame is not None and self.error is None:
+                        if thumb is None or self._change_detector.should_keep(thumb, timestamp):
+                            encode_start = time.monotonic()
+                            self._writer.write(frame, timestamp - self._start_timestamp)
+                            self.stats.record("encode", time.monotonic() - encode_start)
+                            self.frames_written += 1
+                            if self.keyframes:
+                                self.keyframes.feed(frame, timestamp - self._start_timestamp)
+                        else:
+                            self.frames_skipped += 1
+                except Exception as e:
+                    self._fail(e)
+                finally:
+                    self._next_write += 1
+                    self._write_cond.notify_all()
+
+    def _fail(self, error):
+        """Records the first encoder failure, stops the capture and reports it."""
+        with self._write_cond:
+            if self.error is not None:
+                return
+            self.error = error
+        print(f"Encoder error, stopping the capture: {error}")
+        self._stop_event.set()
+        if self.on_error:
+            try:
+                self.on_error(error)
+            except Exception as e:
+                print(f"Error in encoder error callback: {e}")
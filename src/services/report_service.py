@@ -1,8 +1,13 @@
 import os
 import re
+import base64
+import json
 import markdown
 import html
 from datetime import datetime
+from src.utils.process_graph import format_duration
+
+FLOWCHART_PATTERN = r'### FLOWCHART_JSON\s*(\[.*?\])'
 
 class ReportService:
     """
@@ -12,10 +17,19 @@ class ReportService:
     def __init__(self, output_dir="."):
         self.output_dir = output_dir
 
-    def generate_report(self, raw_text, report_filename=None):
+    def generate_report(self, raw_text, report_filename=None, heatmap_png=None, hotspot_lines=None,
+                        process_stats=None):
         """
         Converts the raw markdown analysis into a styled HTML report.
         Parses JSON flowchart steps and renders them as HTML.
+
+        Args:
+            raw_text (str): Markdown returned by the AI.
+            report_filename (str): Name of the HTML file; defaults to a timestamped one.
+            heatmap_png (bytes): Optional click heatmap, embedded in the report.
+            hotspot_lines (list): Optional descriptions of the click hotspots, listed under the heatmap.
+            process_stats (dict): Optional "activities" and "transitions" of the local
+                directly-follows graph, rendered as tables.
         """
         if not report_filename:
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -25,11 +39,10 @@ class ReportService:
         
         # 1. Extract JSON Flowchart
         flowchart_html = ""
-        json_match = re.search(r'### FLOWCHART_JSON\s*(\[.*?\])', raw_text, re.DOTALL)
+        json_match = re.search(FLOWCHART_PATTERN, raw_text, re.DOTALL)
         
         if json_match:
             try:
-                import json
                 json_str = json_match.group(1).strip()
                 steps = json.loads(json_str)
                 flowchart_html = self._generate_flowchart_html(steps)
@@ -51,6 +64,9 @@ class ReportService:
             else:
                 html_content += flowchart_html
 
+        html_content += self._generate_process_stats_html(process_stats)
+        html_content += self._generate_heatmap_html(heatmap_png, hotspot_lines)
+
         # CORREÇÃO PRINCIPAL: O HTML precisa ser atribuído à variável 'full_html' usando f-string (f""")
         full_html = f"""<!DOCTYPE html>
 <html lang="pt-BR">
@@ -125,6 +141,25 @@ class ReportService:
             color: #7f8c8d;
             margin: -5px 0;
         }}
+        .stats-table {{
+            width: 100%;
+            border-collapse: collapse;
+            margin: 15px 0;
+            font-size: 0.9em;
+        }}
+        .stats-table th, .stats-table td {{
+            border-bottom: 1px solid #e1e4e8;
+            padding: 6px 8px;
+            text-align: left;
+        }}
+        .stats-table th {{
+            background-color: #f8f9fa;
+        }}
+        .heatmap-container img {{
+            max-width: 100%;
+            border-radius: 8px;
+            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
+        }}
         .footer {{
             margin-top: 40px;
             text-align: center;
@@ -154,6 +189,55 @@ class ReportService:
         print(f"Report saved to {report_path}")
         return report_path
 
+    @staticmethod
+    def extract_flowchart(raw_text):
+        """Returns the FLOWCHART_JSON steps of an analysis, or None if it has none or they do not parse."""
+        json_match = re.search(FLOWCHART_PATTERN, raw_text, re.DOTALL)
+        if not json_match:
+            return None
+        try:
+            steps = json.loads(json_match.group(1).strip())
+        except ValueError:
+            return None
+        return steps if isinstance(steps, list) else None
+
+    def _generate_process_stats_html(self, process_stats):
+        """Generates the activity and transition tables computed locally (empty without data)."""
+        if not process_stats or not process_stats.get("activities"):
+            return ""
+        html_output = '<div class="process-stats">\n<h2>Atividades e Transições (medido localmente)</h2>\n'
+        html_output += ('<table class="stats-table">\n<tr><th>Atividade</th><th>Visitas</th><th>Tempo total</th>'
+                        '<th>Média</th><th>p50</th><th>p95</th></tr>\n')
+        for item in process_stats["activities"]:
+            html_output += (f'<tr><td>{html.escape(item["label"])}</td><td>{item["visits"]}</td>'
+                            f'<td>{format_duration(item["total_s"])}</td><td>{format_duration(item["mean_s"])}</td>'
+                            f'<td>&le; {format_duration(item["p50_s"])}</td><td>&le; {format_duration(item["p95_s"])}</td></tr>\n')
+        html_output += '</table>\n'
+        if process_stats.get("transitions"):
+            html_output += '<table class="stats-table">\n<tr><th>De</th><th>Para</th><th>Vezes</th></tr>\n'
+            for edge in process_stats["transitions"]:
+                html_output += (f'<tr><td>{html.escape(edge["from_label"])}</td><td>{html.escape(edge["to_label"])}</td>'
+                                f'<td>{edge["count"]}</td></tr>\n')
+            html_output += '</table>\n'
+        html_output += '</div>'
+        return html_output
+
+    def _generate_heatmap_html(self, heatmap_png, hotspot_lines):
+        """Generates the click heatmap section (empty when there is nothing to show)."""
+        if not heatmap_png and not hotspot_lines:
+            return ""
+        html_output = '<div class="heatmap-container">\n<h2>Mapa de Cliques</h2>\n'
+        if heatmap_png:
+            encoded = base64.b64encode(heatmap_png).decode("ascii")
+            html_output += f'<img src="data:image/png;base64,{encoded}" alt="Mapa de cliques">\n'
+        if hotspot_lines:
+            html_output += '<ul>\n'
+            for line in hotspot_lines:
+                html_output += f'<li>{html.escape(line)}</li>\n'
+            html_output += '</ul>\n'
+        html_output += '</div>'
+        return html_output
+
     def _generate_flowchart_html(self, steps):
         """Generates HTML for the flowchart from steps list."""
         html_output = '<div class="flowchart-container">\n<h3>Fluxo do Processo</h3>\n'
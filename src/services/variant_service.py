@@ -0,0 +1,192 @@
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.services.journal_service import JournalService, JOURNAL_SUFFIX
+from src.utils.trace_distance import nearest_centers
+
+
+class VariantService:
+    """
+    Compares many recordings of the same process.
+
+    Each session journal becomes a trace: its sequence of window activities
+    (normalized titles), encoded as an integer array with consecutive repeats
+    collapsed. Identical traces are grouped by hashing their bytes, so the
+    expensive part only runs once per distinct variant. The most frequent
+    variants become cluster centers; every other variant is assigned to its
+    nearest center by edit distance, computed in a process pool, or reported
+    as an outlier when no center is close enough.
+    """
+
+    def __init__(self, max_centers=20, min_support=2, similarity=0.3, workers=None, chunk_size=32,
+                 pool_min_journals=200):
+        """
+        Args:
+            max_centers (int): Most frequent variants used as cluster centers.
+            min_support (int): Sessions a variant needs to become a center (the top one always is).
+            similarity (float): Largest edit distance, as a fraction of the longer trace, to join a cluster.
+            workers (int): Processes for the distance computation (None: one per CPU).
+            chunk_size (int): Variants per task sent to a worker.
+            pool_min_journals (int): Journals needed before they are parsed in a process pool.
+        """
+        self.max_centers = max_centers
+        self.min_support = min_support
+        self.similarity = similarity
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.pool_min_journals = pool_min_journals
+
+    def load_traces(self, paths):
+        """
+        Reads the activity sequence of each journal.
+
+        Returns:
+            dict: Session name -> list of activity labels (sessions without window activity are left out).
+        """
+        paths = list(paths)
+        if (self.workers or os.cpu_count() or 1) == 1 or len(paths) < self.pool_min_journals:
+            # Not worth starting processes for a few journals
+            return self._collect_traces(paths, map(JournalService.read_activities, paths))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return self._collect_traces(paths, executor.map(JournalService.read_activities, paths, chunksize=8))
+
+    @staticmethod
+    def _collect_traces(paths, activities):
+        traces = {}
+        for path, labels in zip(paths, activities):
+            if labels:
+                traces[os.path.basename(path)[:-len(JOURNAL_SUFFIX)]] = labels
+        return traces
+
+    def analyze(self, traces):
+        """
+        Groups the traces into variants and clusters them.
+
+        Args:
+            traces (dict): Session name -> list of activity labels.
+
+        Returns:
+            dict: "sessions" (count), "activities" (label of each id), "variants" (list,
+            most frequent first; each with rank, activities, count, share, sessions,
+            cluster and distance), "happy_path" (the top variant), "clusters" and "outliers".
+        """
+        activity_ids = {}
+        variants = {}
+        for name, labels in traces.items():
+            sequence = self._encode(labels, activity_ids)
+            if not len(sequence):
+                continue
+            key = sequence.tobytes()
+            variant = variants.get(key)
+            if variant is None:
+                variant = variants[key] = {"sequence": sequence, "sessions": []}
+            variant["sessions"].append(name)
+
+        total = sum(len(variant["sessions"]) for variant in variants.values())
+        labels = list(activity_ids)
+        ranked = sorted(variants.values(), key=lambda v: (-len(v["sessions"]), len(v["sequence"])))
+        for rank, variant in enumerate(ranked, start=1):
+            count = len(variant["sessions"])
+            variant.update(rank=rank, count=count, share=count / total if total else 0.0,
+                           activities=[labels[i] for i in variant["sequence"]], cluster=None, distance=None)
+
+        centers = [v for v in ranked[:self.max_centers] if v["count"] >= self.min_support] or ranked[:1]
+        for center in centers:
+            center.update(cluster=center["rank"], distance=0.0)
+        others = ranked[len(centers):]
+        for variant, (index, distance) in zip(others, self._nearest_centers(others, centers)):
+            if index is not None:
+                variant.update(cluster=centers[index]["rank"], distance=round(distance, 3))
+
+        clusters = []
+        for center in centers:
+            members = [v for v in ranked if v["cluster"] == center["rank"]]
+            sessions = sum(v["count"] for v in members)
+            clusters.append({"center": center["rank"], "variants": len(members), "sessions": sessions,
+                             "share": sessions / total if total else 0.0})
+
+        for variant in ranked:
+            variant.pop("sequence")
+        return {
+            "sessions": total,
+            "activities": labels,
+            "variants": ranked,
+            "happy_path": ranked[0] if ranked else None,
+            "clusters": clusters,
+            "outliers": [v for v in ranked if v["cluster"] is None],
+        }
+
+    def _nearest_centers(self, variants, centers):
+        if not variants:
+            return []
+        center_sequences = [center["sequence"] for center in centers]
+        tasks = [([v["sequence"] for v in variants[i:i + self.chunk_size]], center_sequences, self.similarity)
+                 for i in range(0, len(variants), self.chunk_size)]
+        if len(tasks) == 1:
+            # Not worth starting processes for a handful of variants
+            return nearest_centers(tasks[0])
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in executor.map(nearest_centers, tasks):
+                results.extend(chunk)
+        return results
+
+    @staticmethod
+    def _encode(labels, activity_ids):
+        """Activity ids of a trace, skipping "no window" and consecutive repeats."""
+        sequence = []
+        for label in labels:
+            if not label:
+                continue
+            activity = activity_ids.setdefault(label, len(activity_ids))
+            if not sequence or sequence[-1] != activity:
+                sequence.append(activity)
+        return np.array(sequence, dtype=np.int32)
+
+
+def describe_variants(result, max_variants=15, max_outliers=10, max_steps=12):
+    """
+    Markdown summary of a variant analysis, rendered by ReportService like an AI analysis.
+
+    Args:
+        result (dict): Output of `VariantService.analyze`.
+        max_variants (int): Variants listed in the frequency table.
+        max_outliers (int): Outliers listed.
+        max_steps (int): Steps shown per variant in the tables (the happy path is shown in full).
+    """
+    def path(variant, limit=None):
+        # Labels hold placeholders like "<n>", which markdown would pass through as HTML tags
+        steps = [html.escape(step) for step in variant["activities"]]
+        if limit and len(steps) > limit:
+            return " → ".join(steps[:limit]) + f" → … (+{len(steps) - limit})"
+        return " → ".join(steps)
+
+    lines = ["# Análise de Variantes do Processo", "",
+             f"{result['sessions']} sessões, {len(result['variants'])} variantes distintas, "
+             f"{len(result['activities'])} atividades.", ""]
+    happy = result["happy_path"]
+    if happy:
+        lines += ["## Caminho principal", "",
+                  f"Seguido em {happy['count']} sessões ({happy['share']:.0%}):", "", path(happy), ""]
+
+    lines += ["## Variantes mais frequentes", "",
+              "| # | Sessões | % | Grupo | Distância | Passos |", "|---|---|---|---|---|---|"]
+    for variant in result["variants"][:max_variants]:
+        cluster = f"#{variant['cluster']}" if variant["cluster"] is not None else "outlier"
+        distance = f"{variant['distance']:.2f}" if variant["distance"] is not None else "-"
+        lines.append(f"| {variant['rank']} | {variant['count']} | {variant['share']:.0%} | {cluster} | {distance} | "
+                     f"{path(variant, max_steps).replace('|', '/')} |")
+    lines.append("")
+
+    lines += ["## Grupos de variantes", "", "| Centro | Variantes | Sessões | % |", "|---|---|---|---|"]
+    for cluster in result["clusters"]:
+        lines.append(f"| #{cluster['center']} | {cluster['variants']} | {cluster['sessions']} | {cluster['share']:.0%} |")
+    lines.append("")
+
+    if result["outliers"]:
+        lines += ["## Sessões atípicas", ""]
+        for variant in result["outliers"][:max_outliers]:
+            lines.append(f"- {html.escape(', '.join(variant['sessions']))}: {path(variant, max_steps)}")
+        lines.append("")
+    return "\n".join(lines)
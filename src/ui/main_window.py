@@ -32,7 +32,9 @@ class MainWindow(ctk.CTk):
             on_timer_update=self.update_timer,
             on_log_message=self.append_log,
             on_stage_change=self.show_stage,
-            on_error=self.show_error
+            on_error=self.show_error,
+            on_recording_stats=self.update_recording_stats,
+            on_preview_change=self.update_preview
         )
         
         # Initial State
@@ -106,6 +108,7 @@ class MainWindow(ctk.CTk):
             self.view_start.pack(expand=True, fill="both")
             self.stepper.update_step(0)
             self.view_start.check_api_key() # Re-check in case it was just set
+            self.view_start.update_recovery()
         elif stage_name == "recording":
             self.view_recording.pack(expand=True, fill="both")
             self.stepper.update_step(0)
@@ -116,6 +119,7 @@ class MainWindow(ctk.CTk):
         elif stage_name == "results":
             self.view_result.pack(expand=True, fill="both")
             self.stepper.update_step(2)
+            self.view_result.update_reference()
 
     def update_status(self, message):
         self.lbl_status.configure(text=f"Status: {message}")
@@ -123,6 +127,13 @@ class MainWindow(ctk.CTk):
     def update_timer(self, time_str):
         self.view_recording.update_timer(time_str)
 
+    def update_recording_stats(self, stats):
+        self.view_recording.update_stats(stats)
+
+    def update_preview(self, enabled):
+        # Called from the preview thread; Tk widgets are touched on the main loop
+        self.after(0, self.view_recording.set_preview, enabled)
+
     def append_log(self, message):
         if self.log_window and self.log_window.winfo_exists():
             self.log_textbox.configure(state="normal")
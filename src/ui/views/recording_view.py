@@ -12,15 +12,40 @@ class RecordingView(ctk.CTkFrame):
         lbl_rec.pack(pady=(40, 10))
 
         self.lbl_timer = ctk.CTkLabel(self, text="00:00:00", font=FONT_TIMER, text_color="#fff")
-        self.lbl_timer.pack(pady=20)
+        self.lbl_timer.pack(pady=(20, 0))
+
+        self.lbl_stats = ctk.CTkLabel(self, text="", font=("Roboto", 12), text_color="#888")
+        self.lbl_stats.pack(pady=(0, 10))
 
         lbl_info = ctk.CTkLabel(self, text="Minimize esta janela e realize o processo.", font=("Roboto", 14), text_color="#aaa")
         lbl_info.pack(pady=10)
 
+        self.switch_preview = ctk.CTkSwitch(self, text="Pré-visualização", font=("Roboto", 12),
+                                            command=self._on_toggle_preview)
+        if self.controller.preview_enabled:
+            self.switch_preview.select()
+        self.switch_preview.pack(pady=5)
+
         btn_stop = ctk.CTkButton(self, text="⏹ Parar e Analisar", font=("Roboto", 18, "bold"),
                                  fg_color=COLOR_DANGER, hover_color=COLOR_DANGER_HOVER, width=250, height=60, corner_radius=30,
                                  command=self.controller.stop_and_analyze)
-        btn_stop.pack(pady=30)
+        btn_stop.pack(pady=25)
+
+    def _on_toggle_preview(self):
+        self.controller.set_preview_enabled(bool(self.switch_preview.get()))
+
+    def set_preview(self, enabled):
+        """Reflects a preview change made outside the switch (e.g. 'q' in the preview window)."""
+        if enabled:
+            self.switch_preview.select()
+        else:
+            self.switch_preview.deselect()
 
     def update_timer(self, time_str):
         self.lbl_timer.configure(text=time_str)
+
+    def update_stats(self, stats):
+        text = f"{stats['achieved_fps']:.1f} / {stats['target_fps']:g} fps"
+        if stats["frames_dropped"] or stats["missed_deadlines"]:
+            text += f"  ·  {stats['frames_dropped']} descartados, {stats['missed_deadlines']} atrasados"
+        self.lbl_stats.configure(text=text)
@@ -21,10 +21,28 @@ class ResultView(ctk.CTkFrame):
                                  command=self._open_report)
         btn_view.pack(pady=30)
 
-        btn_back = ctk.CTkButton(self, text="Voltar ao Início", font=("Roboto", 14),
+        self.btn_reference = ctk.CTkButton(self, text="📌 Salvar fluxo como referência", font=("Roboto", 14),
+                                           fg_color="#555", hover_color="#666", width=250, height=35,
+                                           command=self._save_reference)
+
+        self.btn_back = ctk.CTkButton(self, text="Voltar ao Início", font=("Roboto", 14),
                                  fg_color="transparent", border_width=1, border_color="#555", hover_color="#333",
                                  command=self.controller.reset)
-        btn_back.pack(pady=10)
+        self.btn_back.pack(pady=10)
+
+    def update_reference(self):
+        """Offers to save the flowchart only after an analysis that produced one."""
+        self.btn_reference.configure(state="normal", text="📌 Salvar fluxo como referência")
+        if self.controller.can_save_reference():
+            self.btn_reference.pack(pady=(0, 10), before=self.btn_back)
+        else:
+            self.btn_reference.pack_forget()
+
+    def _save_reference(self):
+        dialog = ctk.CTkInputDialog(text="Nome da referência:", title="Salvar referência")
+        name = dialog.get_input()
+        if name and self.controller.save_reference(name.strip()):
+            self.btn_reference.configure(state="disabled", text="✔ Referência salva")
 
     def _open_report(self):
         path = self.controller.get_last_report_path()
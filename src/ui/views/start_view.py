@@ -1,7 +1,16 @@
 import customtkinter as ctk
-from config.settings import COLOR_SUCCESS, COLOR_SUCCESS_HOVER
+from tkinter import filedialog
+from config.settings import (
+    COLOR_SUCCESS, COLOR_SUCCESS_HOVER, RECORDING_PROFILES, RECORDING_PROFILE, ANALYSIS_MODE, REFERENCES_DIR
+)
 from config.secrets_manager import SecretsManager
 
+ANALYSIS_MODE_LABELS = {
+    "video": "Vídeo completo",
+    "stills": "Imagens-chave (mais rápido)",
+}
+MORE_ACTIONS_LABEL = "⋯ Mais ações"
+
 class StartView(ctk.CTkFrame):
     def __init__(self, master, controller):
         super().__init__(master, fg_color="transparent")
@@ -10,17 +19,54 @@ class StartView(ctk.CTkFrame):
 
     def _create_widgets(self):
         lbl_hint = ctk.CTkLabel(self, text="Selecione o idioma e inicie a gravação", font=("Roboto", 16), text_color="#ccc")
-        lbl_hint.pack(pady=(40, 20))
+        lbl_hint.pack(pady=(30, 15))
 
         self.cmb_language = ctk.CTkComboBox(self, values=["Português", "English", "Español"], 
                                             width=200, height=35, font=("Roboto", 14), state="readonly")
         self.cmb_language.set("Português")
-        self.cmb_language.pack(pady=10)
+        self.cmb_language.pack(pady=5)
+
+        # Recording and analysis options side by side
+        frame_options = ctk.CTkFrame(self, fg_color="transparent")
+        frame_options.pack(pady=5)
+
+        ctk.CTkLabel(frame_options, text="Resolução da gravação", font=("Roboto", 12),
+                     text_color="#aaa").grid(row=0, column=0, padx=10)
+        self.cmb_profile = ctk.CTkComboBox(frame_options, values=list(RECORDING_PROFILES.keys()),
+                                           width=200, height=35, font=("Roboto", 14), state="readonly")
+        self.cmb_profile.set(RECORDING_PROFILE)
+        self.cmb_profile.grid(row=1, column=0, padx=10)
+
+        ctk.CTkLabel(frame_options, text="Modo de análise", font=("Roboto", 12),
+                     text_color="#aaa").grid(row=0, column=1, padx=10)
+        self.cmb_mode = ctk.CTkComboBox(frame_options, values=list(ANALYSIS_MODE_LABELS.values()),
+                                        width=200, height=35, font=("Roboto", 14), state="readonly")
+        self.cmb_mode.set(ANALYSIS_MODE_LABELS.get(ANALYSIS_MODE, ANALYSIS_MODE_LABELS["video"]))
+        self.cmb_mode.grid(row=1, column=1, padx=10)
 
         self.btn_start = ctk.CTkButton(self, text="🔴 Iniciar Gravação", font=("Roboto", 18, "bold"),
                                   fg_color=COLOR_SUCCESS, hover_color=COLOR_SUCCESS_HOVER, width=250, height=60, corner_radius=30,
                                   command=self._on_start)
-        self.btn_start.pack(pady=30)
+        self.btn_start.pack(pady=15)
+
+        self.btn_recover = ctk.CTkButton(self, text="♻️ Analisar sessão interrompida", font=("Roboto", 14),
+                                         fg_color="#555", hover_color="#666", width=250, height=35,
+                                         command=self._on_recover)
+
+        # Analyses of past sessions and event-log tools share one menu
+        self._more_actions = {
+            "📊 Comparar sessões gravadas": self.controller.analyze_variants,
+            "📤 Exportar XES/CSV": self._on_export_event_log,
+            "📥 Importar log": self._on_import_event_log,
+            "🧭 Conformidade": self._on_check_conformance,
+        }
+        self.menu_more = ctk.CTkOptionMenu(self, values=list(self._more_actions), font=("Roboto", 14),
+                                           fg_color="#555", button_color="#555", button_hover_color="#666",
+                                           width=250, height=35, dynamic_resizing=False,
+                                           command=self._on_more_action)
+        self.menu_more.set(MORE_ACTIONS_LABEL)
+        self.menu_more.pack(pady=(0, 10))
+        self.update_recovery()
         
         self.check_api_key()
 
@@ -30,6 +76,42 @@ class StartView(ctk.CTkFrame):
         else:
             self.btn_start.configure(state="normal", fg_color=COLOR_SUCCESS, text="🔴 Iniciar Gravação")
 
+    def update_recovery(self):
+        """Shows the recovery button while a crashed session is waiting to be analyzed."""
+        if self.controller.recoverable_sessions:
+            self.btn_recover.pack(pady=(0, 10), before=self.menu_more)
+        else:
+            self.btn_recover.pack_forget()
+
+    def _on_recover(self):
+        self.controller.analyze_recovered_session(self.cmb_language.get())
+        self.update_recovery()
+
+    def _on_more_action(self, choice):
+        # The menu is a launcher: show its title again once the action runs
+        self.menu_more.set(MORE_ACTIONS_LABEL)
+        self._more_actions[choice]()
+
+    def _on_export_event_log(self):
+        path = filedialog.asksaveasfilename(title="Exportar log de eventos", defaultextension=".xes",
+                                            filetypes=[("XES", "*.xes"), ("CSV", "*.csv")])
+        if path:
+            self.controller.export_event_log(path)
+
+    def _on_import_event_log(self):
+        path = filedialog.askopenfilename(title="Importar log de eventos",
+                                          filetypes=[("Logs de eventos", "*.xes *.csv"), ("Todos", "*.*")])
+        if path:
+            self.controller.import_event_log(path)
+
+    def _on_check_conformance(self):
+        path = filedialog.askopenfilename(title="Escolher referência", initialdir=REFERENCES_DIR,
+                                          filetypes=[("Referências", "*.json")])
+        if path:
+            self.controller.check_conformance(path)
+
     def _on_start(self):
         language = self.cmb_language.get()
-        self.controller.start_recording(language)
+        profile = self.cmb_profile.get()
+        mode = next((key for key, label in ANALYSIS_MODE_LABELS.items() if label == self.cmb_mode.get()), "video")
+        self.controller.start_recording(language, profile, mode)
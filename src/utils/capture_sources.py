@@ -0,0 +1,132 @@
+import time
+import cv2
+import mss
+import numpy as np
+
+
+class MssCaptureSource:
+    """
+    Grabs the real screen with mss.
+
+    Capture sources are used as context managers by the recorder thread (mss
+    handles are thread-bound) and expose `monitor` (primary monitor), `screen`
+    (union of all monitors) and `grab(region)` returning a BGRA frame.
+    """
+
+    def __init__(self):
+        self._sct = None
+
+    def __enter__(self):
+        self._sct = mss.mss()
+        self._sct.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._sct.__exit__(*exc_info)
+        self._sct = None
+
+    @property
+    def monitor(self):
+        return self._sct.monitors[1]
+
+    @property
+    def screen(self):
+        # monitors[0] is the union of all monitors
+        return self._sct.monitors[0]
+
+    def grab(self, region):
+        """Returns the mss ScreenShot of `region` (dict with left, top, width, height)."""
+        return self._sct.grab(region)
+
+
+class SyntheticCaptureSource:
+    """
+    Generates screen-like BGRA frames, so the recorder runs without a display.
+
+    The frames mimic an office session: mostly static application windows, a text
+    field being typed into at `typing_rate` characters per second, a blinking
+    caret, and a switch to another application every `switch_seconds`. Frames
+    depend only on the time since the source was opened, so a slow pipeline sees
+    the same content a real screen would show.
+    """
+
+    def __init__(self, width=1920, height=1080, typing_rate=5.0, switch_seconds=20.0, apps=3, seed=0):
+        """
+        Args:
+            width (int): Screen width in pixels.
+            height (int): Screen height in pixels.
+            typing_rate (float): Characters typed per second (0 for a fully static screen).
+            switch_seconds (float): Seconds between application switches (0 disables them).
+            apps (int): Number of distinct application layouts cycled through.
+            seed (int): Seed for the layouts, so runs are reproducible.
+        """
+        self.width = width
+        self.height = height
+        self.typing_rate = typing_rate
+        self.switch_seconds = switch_seconds
+        self.apps = max(1, apps)
+        self.seed = seed
+        self.frames_generated = 0
+        self._layouts = None
+        self._start = None
+
+    def __enter__(self):
+        rng = np.random.default_rng(self.seed)
+        self._layouts = [self._render_layout(rng) for _ in range(self.apps)]
+        self._start = time.monotonic()
+        self.frames_generated = 0
+        return self
+
+    def __exit__(self, *exc_info):
+        self._layouts = None
+
+    @property
+    def monitor(self):
+        return {"left": 0, "top": 0, "width": self.width, "height": self.height}
+
+    @property
+    def screen(self):
+        return self.monitor
+
+    def grab(self, region):
+        """Returns a new BGRA array with the screen content of `region` at the current time."""
+        elapsed = time.monotonic() - self._start
+        app = int(elapsed // self.switch_seconds) % self.apps if self.switch_seconds else 0
+        # A fresh array per grab, like mss: queued frames must not change afterwards
+        frame = self._layouts[app].copy()
+
+        field_left, field_top = self.width // 4 + 10, self.height // 8
+        typed = int(elapsed * self.typing_rate) % 60 if self.typing_rate else 0
+        text = "Pedido 4711 - cliente ACME - " + "x" * typed
+        scale = self.height / 1400
+        cv2.putText(frame, text, (field_left, field_top + self.height // 40), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, (20, 20, 20, 255), 2)
+        if int(elapsed * 2) % 2 == 0:
+            (text_width, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+            caret_left = field_left + text_width + 2
+            cv2.line(frame, (caret_left, field_top + 4), (caret_left, field_top + self.height // 30 - 4),
+                     (0, 0, 0, 255), 2)
+        self.frames_generated += 1
+
+        left, top = region["left"] - self.monitor["left"], region["top"] - self.monitor["top"]
+        if (left, top, region["width"], region["height"]) == (0, 0, self.width, self.height):
+            return frame
+        return np.ascontiguousarray(frame[top:top + region["height"], left:left + region["width"]])
+
+    def _render_layout(self, rng):
+        width, height = self.width, self.height
+        background = int(rng.integers(235, 250))
+        accent = tuple(int(c) for c in rng.integers(40, 200, 3)) + (255,)
+        frame = np.full((height, width, 4), background, dtype=np.uint8)
+        frame[..., 3] = 255
+        frame[:height // 20] = accent                                   # title bar
+        frame[height // 20:, :width // 6] = (230, 225, 220, 255)        # side panel
+        for row in range(int(rng.integers(4, 9))):
+            top = height // 5 + row * height // 12
+            cv2.rectangle(frame, (width // 4, top), (width * 3 // 4, top + height // 30), (200, 200, 200, 255), 2)
+            cv2.putText(frame, f"Campo {row + 1}", (width // 4, top - 6), cv2.FONT_HERSHEY_SIMPLEX,
+                        height / 1800, (90, 90, 90, 255), 1)
+        # Text field being typed into
+        cv2.rectangle(frame, (width // 4, height // 8), (width * 3 // 4, height // 8 + height // 30),
+                      (120, 120, 120, 255), 2)
+        return frame
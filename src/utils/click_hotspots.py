@@ -0,0 +1,174 @@
+import math
+from collections import defaultdict
+import cv2
+import numpy as np
+
+
+class Hotspot:
+    """A screen area clicked repeatedly."""
+
+    __slots__ = ("rank", "x", "y", "radius", "timestamps")
+
+    def __init__(self, x, y, radius, timestamps):
+        self.rank = 0
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.timestamps = timestamps  # Sorted time.monotonic_ns() of every click in the cluster
+
+    @property
+    def count(self):
+        return len(self.timestamps)
+
+    @property
+    def median_interval(self):
+        """Median seconds between consecutive clicks on this spot."""
+        gaps = [(b - a) / 1e9 for a, b in zip(self.timestamps, self.timestamps[1:])]
+        return float(np.median(gaps)) if gaps else 0.0
+
+
+class ClickHotspotAnalyzer:
+    """
+    Clusters click coordinates into hotspots with a uniform spatial grid.
+
+    Cells are `radius / sqrt(2)` wide, so every click in a cell is within
+    `radius` of the others and a cell is merged in one step; only pairs of
+    neighbouring cells need a distance check. Clicks closer than `radius` end
+    up in the same cluster (single linkage), and clusters with at least
+    `min_clicks` clicks are ranked by count, then by how quickly they repeat.
+    """
+
+    def __init__(self, radius=24, min_clicks=3):
+        """
+        Args:
+            radius (float): Pixels between two clicks on the same target.
+            min_clicks (int): Clicks needed for a cluster to count as a hotspot.
+        """
+        self.radius = radius
+        self.min_clicks = min_clicks
+
+    def analyze(self, clicks):
+        """
+        Args:
+            clicks (list): (timestamp_ns, x, y) tuples.
+
+        Returns:
+            list: Hotspots, best ranked first (`rank` starts at 1).
+        """
+        if not clicks:
+            return []
+        cell_size = max(1.0, self.radius / math.sqrt(2))
+        grid = defaultdict(list)
+        for index, (_, x, y) in enumerate(clicks):
+            grid[(int(x // cell_size), int(y // cell_size))].append(index)
+
+        # Union-find over cells; a cell is a single node since its clicks are all within range
+        parent = {cell: cell for cell in grid}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        radius_sq = self.radius * self.radius
+        reach = 2  # radius spans sqrt(2) cells, so neighbours up to two cells away can be in range
+        for (cx, cy), members in grid.items():
+            for dx in range(-reach, reach + 1):
+                for dy in range(-reach, reach + 1):
+                    other = (cx + dx, cy + dy)
+                    # Visit every unordered pair of cells once
+                    if other <= (cx, cy) or other not in grid or find(other) == find((cx, cy)):
+                        continue
+                    if self._cells_touch(clicks, members, grid[other], radius_sq):
+                        parent[find(other)] = find((cx, cy))
+
+        clusters = defaultdict(list)
+        for cell, members in grid.items():
+            clusters[find(cell)].extend(members)
+
+        hotspots = []
+        for members in clusters.values():
+            if len(members) < self.min_clicks:
+                continue
+            xs = np.array([clicks[i][1] for i in members])
+            ys = np.array([clicks[i][2] for i in members])
+            x, y = int(np.median(xs)), int(np.median(ys))
+            spread = int(np.max(np.hypot(xs - x, ys - y)))
+            hotspots.append(Hotspot(x, y, spread, sorted(clicks[i][0] for i in members)))
+
+        hotspots.sort(key=lambda hotspot: (-hotspot.count, hotspot.median_interval))
+        for rank, hotspot in enumerate(hotspots, start=1):
+            hotspot.rank = rank
+        return hotspots
+
+    @staticmethod
+    def _cells_touch(clicks, members, others, radius_sq):
+        for i in members:
+            _, x1, y1 = clicks[i]
+            for j in others:
+                _, x2, y2 = clicks[j]
+                if (x1 - x2) ** 2 + (y1 - y2) ** 2 <= radius_sq:
+                    return True
+        return False
+
+
+def describe_hotspot(hotspot, clock):
+    """
+    One prompt line per hotspot, e.g. "Click hotspot #3 at (812, 440): clicked 148 times,
+    median 2.1 s apart, 10:01:05-10:40:12".
+
+    Args:
+        hotspot (Hotspot): The hotspot.
+        clock (callable): Formats a monotonic ns timestamp as HH:MM:SS.
+    """
+    return (f"Click hotspot #{hotspot.rank} at ({hotspot.x}, {hotspot.y}), within {hotspot.radius} px: "
+            f"clicked {hotspot.count} times, median {hotspot.median_interval:.1f} s apart, "
+            f"{clock(hotspot.timestamps[0])}-{clock(hotspot.timestamps[-1])}")
+
+
+def render_heatmap(frame, clicks, region, hotspots=(), sigma=None, alpha=0.55):
+    """
+    Overlays a click heatmap on a recorded frame.
+
+    Args:
+        frame (np.ndarray): BGR frame of the recording.
+        clicks (list): (timestamp_ns, x, y) tuples in screen coordinates.
+        region (dict): Screen area the frame shows (left, top, width, height).
+        hotspots (list): Hotspots to label with their rank.
+        sigma (float): Blur radius in frame pixels; defaults to 1/80 of the frame width.
+        alpha (float): Opacity of the heat layer.
+
+    Returns:
+        bytes: The overlaid frame, PNG encoded.
+    """
+    height, width = frame.shape[:2]
+    scale_x, scale_y = width / region["width"], height / region["height"]
+
+    def to_frame(x, y):
+        return int((x - region["left"]) * scale_x), int((y - region["top"]) * scale_y)
+
+    heat = np.zeros((height, width), dtype=np.float32)
+    for _, x, y in clicks:
+        fx, fy = to_frame(x, y)
+        if 0 <= fx < width and 0 <= fy < height:
+            heat[fy, fx] += 1.0
+
+    sigma = sigma or max(2.0, width / 80)
+    heat = cv2.GaussianBlur(heat, (0, 0), sigma)
+    output = frame.copy()
+    if heat.max() > 0:
+        heat = (heat / heat.max() * 255).astype(np.uint8)
+        colored = cv2.applyColorMap(heat, cv2.COLORMAP_JET)
+        # Blend only where there is heat, so the rest of the screen stays readable
+        weight = (heat.astype(np.float32) / 255 * alpha)[..., None]
+        output = (output * (1 - weight) + colored * weight).astype(np.uint8)
+
+    for hotspot in hotspots:
+        fx, fy = to_frame(hotspot.x, hotspot.y)
+        cv2.circle(output, (fx, fy), max(8, int(hotspot.radius * scale_x) + 6), (255, 255, 255), 2)
+        cv2.putText(output, f"#{hotspot.rank}", (fx + 10, fy - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (255, 255, 255), 2)
+
+    ok, png = cv2.imencode(".png", output)
+    return png.tobytes() if ok else None
@@ -0,0 +1,148 @@
+from collections import deque
+
+# Alignment moves
+SYNC = "sync"    # The trace and the model agree
+MODEL = "model"  # A step of the model was skipped in the trace
+LOG = "log"      # The trace has an activity the model does not expect here
+
+
+class ReferenceModel:
+    """
+    A flowchart (FLOWCHART_JSON steps) used as the expected process.
+
+    Each step may name the activity (normalized window title) it happens in;
+    steps without one are silent and can be passed without a matching event.
+    `next` is a step id, a list of ids (branches) or null for an end step.
+    """
+
+    def __init__(self, steps):
+        """
+        Args:
+            steps (list): Dicts with id, label, next and optionally activity.
+        """
+        self.steps = [step for step in steps if step.get("id") is not None]
+        self.index = {step["id"]: i for i, step in enumerate(self.steps)}
+        self.activities = [step.get("activity") or None for step in self.steps]
+        self.successors = []
+        for step in self.steps:
+            targets = step.get("next")
+            targets = targets if isinstance(targets, list) else [targets]
+            self.successors.append([self.index[t] for t in targets if t in self.index])
+        targeted = {s for successors in self.successors for s in successors}
+        starts = [i for i in range(len(self.steps)) if i not in targeted]
+        self.start = starts[0] if starts else 0
+
+    def __len__(self):
+        return len(self.steps)
+
+    def next_states(self, step):
+        """Steps that may follow `step`; `len(self)` stands for the end of the process."""
+        return self.successors[step] or [len(self.steps)]
+
+    def shortest_visible_path(self):
+        """Fewest non-silent steps on any path from the start to the end (the cost of an empty trace)."""
+        end = len(self.steps)
+        if not self.steps:
+            return 0
+        costs = {self.start: 0 if self.activities[self.start] is None else 1}
+        queue = deque([self.start])
+        while queue:
+            step = queue.popleft()
+            if step == end:
+                continue
+            for target in self.next_states(step):
+                cost = costs[step] + (0 if target == end or self.activities[target] is None else 1)
+                if cost < costs.get(target, float("inf")):
+                    costs[target] = cost
+                    # 0-1 BFS: free moves go to the front
+                    if cost == costs[step]:
+                        queue.appendleft(target)
+                    else:
+                        queue.append(target)
+        return costs.get(end, 0)
+
+
+def align(trace, model):
+    """
+    Cost-optimal alignment of a trace against a ReferenceModel.
+
+    Searches the product of trace positions and model steps with a 0-1 BFS:
+    synchronous moves cost 0, skipping a step (model move) or an unexpected
+    event (log move) cost 1. Silent steps cost 0, and so does a step in the
+    same activity as the event just matched, since one window visit usually
+    covers several consecutive steps. O(len(trace) * len(model)) states.
+
+    Args:
+        trace (list): Activity labels, in order (consecutive repeats collapsed).
+        model (ReferenceModel): The expected process.
+
+    Returns:
+        dict: "cost", "fitness" (1 = perfect), "moves" (list of (move, label)),
+        "skipped" (labels of skipped steps) and "extra" (unexpected activities).
+    """
+    end = len(model)
+    n = len(trace)
+    start = (0, model.start if end else end)
+    costs = {start: 0}
+    previous = {start: None}
+    queue = deque([start])
+    goal = (n, end)
+
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            break
+        i, step = state
+        cost = costs[state]
+        moves = []
+        if i < n:
+            moves.append(((i + 1, step), 1, LOG))
+        if step < end:
+            activity = model.activities[step]
+            targets = model.next_states(step)
+            if i < n and activity == trace[i]:
+                moves.extend(((i + 1, target), 0, SYNC) for target in targets)
+            free = activity is None or (i > 0 and activity == trace[i - 1])
+            moves.extend(((i, target), 0 if free else 1, MODEL) for target in targets)
+        for target, move_cost, kind in moves:
+            new_cost = cost + move_cost
+            if new_cost < costs.get(target, float("inf")):
+                costs[target] = new_cost
+                previous[target] = (state, kind, move_cost)
+                if move_cost:
+                    queue.append(target)
+                else:
+                    queue.appendleft(target)
+
+    worst = n + model.shortest_visible_path()
+    if goal not in costs:
+        # The model has no path to its end (e.g. a loop without exit): everything is a deviation
+        return {"cost": worst, "fitness": 0.0, "moves": [], "skipped": [], "extra": list(trace)}
+
+    # Walk back from the goal to list the moves; free model moves (silent or same window) are not deviations
+    moves, skipped, extra = [], [], []
+    state = goal
+    while previous[state] is not None:
+        before, kind, move_cost = previous[state]
+        if kind == LOG:
+            label = trace[before[0]]
+            extra.append(label)
+        else:
+            step = model.steps[before[1]]
+            label = step.get("label") or step["id"]
+            if kind == MODEL and move_cost:
+                skipped.append(label)
+        moves.append((kind, label))
+        state = before
+    moves.reverse()
+    skipped.reverse()
+    extra.reverse()
+
+    cost = costs[goal]
+    return {
+        "cost": cost,
+        "fitness": 1.0 - cost / worst if worst else 1.0,
+        "moves": moves,
+        "skipped": skipped,
+        "extra": extra,
+    }
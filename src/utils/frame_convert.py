@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+
+
+def bgra_view(shot):
+    """
+    Wraps an mss screenshot buffer as a (height, width, 4) BGRA array without copying.
+
+    Arrays (e.g. frames already downscaled by the capture thread) are returned as is.
+    """
+    if isinstance(shot, np.ndarray):
+        return shot
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+class FrameConverter:
+    """
+    Converts BGRA captures to BGR into a preallocated, reused destination array.
+
+    The returned array is overwritten by the next `convert()` call, so each thread
+    needs its own converter and must be done with a frame (e.g. written it to the
+    encoder) before converting the next one.
+    """
+
+    def __init__(self):
+        self._dst = None
+
+    def convert(self, shot):
+        """
+        Args:
+            shot: mss ScreenShot or BGRA np.ndarray.
+
+        Returns:
+            np.ndarray: BGR frame backed by the reused buffer.
+        """
+        src = bgra_view(shot)
+        height, width = src.shape[:2]
+        if self._dst is None or self._dst.shape[:2] != (height, width):
+            self._dst = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.cvtColor(src, cv2.COLOR_BGRA2BGR, dst=self._dst)
+        return self._dst
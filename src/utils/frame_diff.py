@@ -0,0 +1,73 @@
+import cv2
+import numpy as np
+
+
+class FrameChangeDetector:
+    """
+    Decides whether a captured frame differs enough from the last written one.
+
+    Frames are compared on a small area-averaged thumbnail, so the cost per frame
+    is a single downscale plus a diff over a few thousand pixels.
+    """
+
+    def __init__(self, threshold=0.0002, pixel_delta=12, scale=8, max_skip_seconds=5.0):
+        """
+        Args:
+            threshold (float): Fraction of thumbnail pixels that must change for a frame to be kept.
+            pixel_delta (int): Minimum per-channel difference (0-255) for a thumbnail pixel to count as changed.
+            scale (int): Downscale factor used to build the thumbnail.
+            max_skip_seconds (float): Keep one frame at least this often, even on a static screen.
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.scale = max(1, int(scale))
+        self.max_skip_seconds = max_skip_seconds
+        self._reference = None
+        self._reference_time = None
+        self.last_change_time = None
+
+    def thumbnail(self, frame):
+        """Returns the downscaled frame used for comparisons (safe to call from any thread)."""
+        height, width = frame.shape[:2]
+        size = (max(1, width // self.scale), max(1, height // self.scale))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def should_keep(self, thumb, timestamp):
+        """
+        Compares a thumbnail with the last kept one and updates the reference if it is kept.
+
+        Must be called in capture order.
+
+        Args:
+            thumb (np.ndarray): Thumbnail returned by `thumbnail()`.
+            timestamp (float): Capture time of the frame, in seconds.
+
+        Returns:
+            bool: True if the frame should be written.
+        """
+        if self._reference is None or self._reference.shape != thumb.shape:
+            self.last_change_time = timestamp
+            return self._keep(thumb, timestamp)
+
+        if self.max_skip_seconds and timestamp - self._reference_time >= self.max_skip_seconds:
+            return self._keep(thumb, timestamp)
+
+        diff = cv2.absdiff(thumb, self._reference)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+        changed = np.count_nonzero(diff > self.pixel_delta)
+        if changed > self.threshold * diff.size:
+            self.last_change_time = timestamp
+            return self._keep(thumb, timestamp)
+        return False
+
+    def reset(self):
+        """Forgets the reference frame, so the next frame is always kept."""
+        self._reference = None
+        self._reference_time = None
+        self.last_change_time = None
+
+    def _keep(self, thumb, timestamp):
+        self._reference = thumb
+        self._reference_time = timestamp
+        return True
@@ -0,0 +1,132 @@
+import threading
+from collections import deque
+
+# Back-pressure policies
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class FrameQueue:
+    """
+    Bounded ring buffer between the screen capture thread and the encoder workers.
+
+    When the buffer is full, the back-pressure policy decides what happens:
+    DROP_OLDEST evicts the oldest queued frame (the capture thread never waits),
+    BLOCK makes the capture thread wait until an encoder frees a slot.
+    """
+
+    def __init__(self, maxsize=32, policy=DROP_OLDEST):
+        """
+        Args:
+            maxsize (int): Maximum number of frames held in the buffer.
+            policy (str): DROP_OLDEST or BLOCK.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown back-pressure policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.enqueued = 0
+        self._items = deque()
+        self._closed = False
+        self._next_ticket = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def put(self, item):
+        """
+        Adds an item to the buffer, applying the back-pressure policy if it is full.
+
+        Returns:
+            The evicted item when DROP_OLDEST had to discard one, otherwise None.
+        """
+        evicted = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("put() on a closed FrameQueue.")
+
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    evicted = self._items.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._not_full.wait()
+
+            self._items.append(item)
+            self.enqueued += 1
+            self._not_empty.notify()
+        return evicted
+
+    def get(self, timeout=None):
+        """
+        Removes the oldest item from the buffer.
+
+        Each item is returned together with a write ticket. Tickets are contiguous
+        in dequeue order (dropped frames never get one), so several workers can
+        convert frames in parallel and still write them in order.
+
+        Returns:
+            tuple: (ticket, item), or None when the queue is closed and drained
+            (or the timeout expired).
+        """
+        with self._lock:
+            while not self._items:
+                if self._closed:
+                    return None
+                if not self._not_empty.wait(timeout):
+                    return None
+
+            item = self._items.popleft()
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._not_full.notify()
+            return ticket, item
+
+    def close(self):
+        """Stops accepting new items and wakes up every waiting thread."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox holding only the most recent frame.
+
+    The capture thread overwrites the slot without ever waiting; slow readers
+    (such as the preview) simply see fewer frames.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._version = 0
+
+    def publish(self, frame):
+        """Replaces the stored frame."""
+        with self._lock:
+            self._frame = frame
+            self._version += 1
+
+    def latest(self):
+        """
+        Returns:
+            tuple: (version, frame). The version increases on every publish, so
+            readers can tell whether the frame is new.
+        """
+        with self._lock:
+            return self._version, self._frame
+
+    def clear(self):
+        with self._lock:
+            self._frame = None
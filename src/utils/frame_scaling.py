@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+
+def compute_output_size(width, height, max_size):
+    """
+    Fits a frame inside a recording profile box, keeping the aspect ratio.
+
+    Frames are never upscaled, and the result is rounded to even dimensions
+    because most video codecs (libx264 with yuv420p among them) reject odd
+    widths and heights; this includes the native size.
+
+    Args:
+        width (int): Source frame width.
+        height (int): Source frame height.
+        max_size (tuple | None): (max_width, max_height) of the profile, or None for native size.
+
+    Returns:
+        tuple: (width, height) of the encoded frames.
+    """
+    if not max_size:
+        return max(2, width // 2 * 2), max(2, height // 2 * 2)
+
+    max_width, max_height = max_size
+    scale = min(max_width / width, max_height / height, 1.0)
+    out_width = max(2, int(width * scale) // 2 * 2)
+    out_height = max(2, int(height * scale) // 2 * 2)
+    return out_width, out_height
+
+
+def scale_frame(frame, size):
+    """
+    Downscales a frame to `size` (width, height), or returns it untouched if it already matches.
+    A size at most one pixel smaller in each direction is cropped, without copying.
+
+    Large reductions are done as repeated 2x INTER_AREA halvings, which OpenCV
+    implements as a fast box average, followed by one INTER_LINEAR step for the
+    remaining (< 2x) ratio. This keeps text legible at a fraction of the cost of a
+    single non-integer INTER_AREA resize.
+    """
+    target_width, target_height = size
+    height, width = frame.shape[:2]
+    if (width, height) == (target_width, target_height):
+        return frame
+    if 0 <= width - target_width <= 1 and 0 <= height - target_height <= 1:
+        # Native size rounded down to even: crop the odd row / column instead of resampling
+        return frame[:target_height, :target_width]
+
+    while width >= target_width * 2 and height >= target_height * 2:
+        width, height = width // 2, height // 2
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    if (width, height) != (target_width, target_height):
+        frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
+    return frame
+
+
+def letterbox(frame, size):
+    """
+    Fits a frame of any size into a fixed `size` (width, height) canvas.
+
+    The frame is downscaled (never upscaled, so small windows stay crisp) to fit,
+    keeping its aspect ratio, and centered on a black background.
+    """
+    target_width, target_height = size
+    height, width = frame.shape[:2]
+    scale = min(target_width / width, target_height / height, 1.0)
+    fitted_width = max(1, int(width * scale))
+    fitted_height = max(1, int(height * scale))
+    if (fitted_width, fitted_height) != (width, height):
+        frame = scale_frame(frame, (fitted_width, fitted_height))
+    if (fitted_width, fitted_height) == (target_width, target_height):
+        return frame
+
+    canvas = np.zeros((target_height, target_width) + frame.shape[2:], dtype=frame.dtype)
+    top = (target_height - fitted_height) // 2
+    left = (target_width - fitted_width) // 2
+    canvas[top:top + fitted_height, left:left + fitted_width] = frame
+    return canvas
@@ -0,0 +1,73 @@
+import time
+
+# Late-frame policies
+SKIP = "skip"
+CATCH_UP = "catch_up"
+
+
+class FrameScheduler:
+    """
+    Paces a capture loop on absolute deadlines of time.monotonic().
+
+    Deadlines are `start + n * period`, so sleep jitter never accumulates and
+    wall-clock changes (NTP, DST) have no effect. When the loop falls behind:
+    SKIP drops the missed slots and realigns on the next deadline, CATCH_UP runs
+    the missed slots back to back (up to `max_catch_up`) to keep the frame count.
+    """
+
+    def __init__(self, fps, policy=SKIP, max_catch_up=3):
+        """
+        Args:
+            fps (float): Target frame rate.
+            policy (str): SKIP or CATCH_UP.
+            max_catch_up (int): Maximum burst of late frames under CATCH_UP.
+        """
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"Unknown scheduler policy: {policy}")
+        self.period = 1.0 / fps
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.missed = 0
+        self._next_deadline = None
+
+    def start(self):
+        """Sets the first deadline to now."""
+        self.missed = 0
+        self._next_deadline = time.monotonic()
+
+    def wait(self, stop_event=None):
+        """
+        Waits for the next deadline.
+
+        Args:
+            stop_event (threading.Event): Interrupts the wait when set.
+
+        Returns:
+            int: Number of frame slots that were missed since the previous call.
+        """
+        if self._next_deadline is None:
+            self.start()
+
+        self._next_deadline += self.period
+        now = time.monotonic()
+        missed = 0
+
+        if now > self._next_deadline:
+            late_slots = int((now - self._next_deadline) / self.period)
+            if self.policy == SKIP:
+                missed = late_slots
+                self._next_deadline += late_slots * self.period
+            elif late_slots > self.max_catch_up:
+                missed = late_slots - self.max_catch_up
+                self._next_deadline += missed * self.period
+            self.missed += missed
+            if self.policy == CATCH_UP and now >= self._next_deadline:
+                return missed
+
+        delay = self._next_deadline - now
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+        return missed
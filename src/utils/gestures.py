@@ -0,0 +1,145 @@
+import math
+
+
+def douglas_peucker(points, epsilon):
+    """
+    Simplifies a polyline with the Douglas-Peucker algorithm.
+
+    Args:
+        points (list): (timestamp_ns, x, y) tuples, in order.
+        epsilon (float): Largest distance, in pixels, a dropped point may lie from the simplified line.
+
+    Returns:
+        list: The kept points (always including the first and the last one).
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        _, x1, y1 = points[first]
+        _, x2, y2 = points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+
+        farthest, max_distance = None, epsilon
+        for index in range(first + 1, last):
+            _, x, y = points[index]
+            if length:
+                distance = abs(dy * (x - x1) - dx * (y - y1)) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > max_distance:
+                farthest, max_distance = index, distance
+
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def path_length(points):
+    """Length in pixels of a (timestamp_ns, x, y) polyline."""
+    return sum(math.hypot(b[1] - a[1], b[2] - a[2]) for a, b in zip(points, points[1:]))
+
+
+class MovePathBuilder:
+    """
+    Groups decimated mouse positions into paths and simplifies each one.
+
+    A path ends when the pointer rests for more than `gap_seconds` (or when
+    `flush()` is called, e.g. on a click), and is then reduced with Douglas-Peucker.
+    """
+
+    def __init__(self, gap_seconds=0.5, epsilon=6.0):
+        """
+        Args:
+            gap_seconds (float): Pause that ends a path.
+            epsilon (float): Douglas-Peucker tolerance in pixels.
+        """
+        self.gap_ns = int(gap_seconds * 1e9)
+        self.epsilon = epsilon
+        self._points = []
+
+    def add(self, timestamp_ns, x, y):
+        """
+        Adds one position.
+
+        Returns:
+            list: The simplified path this position closed, or None.
+        """
+        finished = None
+        if self._points and timestamp_ns - self._points[-1][0] > self.gap_ns:
+            finished = self.flush()
+        self._points.append((timestamp_ns, x, y))
+        return finished
+
+    def flush(self):
+        """Returns the simplified path in progress (None if it has fewer than two points) and starts over."""
+        points, self._points = self._points, []
+        if len(points) < 2:
+            return None
+        return douglas_peucker(points, self.epsilon)
+
+
+class ScrollSession:
+    """Consecutive scroll steps with no pause longer than the session gap."""
+
+    __slots__ = ("start_ns", "end_ns", "x", "y", "dx", "dy", "steps")
+
+    def __init__(self, start_ns, x, y):
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.x = x
+        self.y = y
+        self.dx = 0
+        self.dy = 0
+        self.steps = 0
+
+    @property
+    def duration(self):
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def direction(self):
+        """"up", "down", "left" or "right" (pynput reports negative dy when scrolling down)."""
+        if abs(self.dx) > abs(self.dy):
+            return "right" if self.dx > 0 else "left"
+        return "up" if self.dy > 0 else "down"
+
+
+class ScrollAggregator:
+    """Merges scroll steps into ScrollSessions; a session ends after `gap_seconds` without scrolling."""
+
+    def __init__(self, gap_seconds=1.0):
+        self.gap_ns = int(gap_seconds * 1e9)
+        self._current = None
+
+    def add(self, timestamp_ns, x, y, dx, dy):
+        """
+        Adds one scroll step.
+
+        Returns:
+            ScrollSession: The session this step closed, or None.
+        """
+        finished = None
+        if self._current is not None and timestamp_ns - self._current.end_ns > self.gap_ns:
+            finished = self.flush()
+        if self._current is None:
+            self._current = ScrollSession(timestamp_ns, x, y)
+        session = self._current
+        session.end_ns = timestamp_ns
+        session.dx += dx
+        session.dy += dy
+        session.steps += max(1, abs(dx) + abs(dy))
+        return finished
+
+    def flush(self):
+        """Returns the session in progress (or None) and starts over."""
+        current, self._current = self._current, None
+        return current
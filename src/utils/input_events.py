@@ -0,0 +1,281 @@
+import threading
+import time
+from array import array
+from datetime import datetime
+from src.utils.gestures import ScrollAggregator, path_length
+
+# Event kinds
+CLICK = "click"
+KEY = "key"
+MOVE_START = "move_start"  # First point of a simplified mouse path
+MOVE = "move"              # Following points of the same path
+SCROLL = "scroll"
+DRAG = "drag"              # Button released away from where it was pressed (end point)
+
+EVENT_KINDS = (CLICK, KEY, MOVE_START, MOVE, SCROLL, DRAG)
+MOUSE_BUTTONS = (None, "left", "right", "middle")
+
+
+class InputEvent:
+    """
+    One mouse or keyboard event.
+
+    `timestamp_ns` is time.monotonic_ns(). Key events never carry the key itself;
+    `dx` / `dy` are the scroll steps of SCROLL events.
+    """
+
+    __slots__ = ("kind", "timestamp_ns", "x", "y", "button", "dx", "dy")
+
+    def __init__(self, kind, timestamp_ns, x=None, y=None, button=None, dx=0, dy=0):
+        self.kind = kind
+        self.timestamp_ns = timestamp_ns
+        self.x = x
+        self.y = y
+        self.button = button
+        self.dx = dx
+        self.dy = dy
+
+    def __repr__(self):
+        return (f"InputEvent({self.kind!r}, {self.timestamp_ns}, x={self.x}, y={self.y}, "
+                f"button={self.button!r}, dx={self.dx}, dy={self.dy})")
+
+
+class TypingBurst:
+    """A typing session: consecutive key presses with no pause longer than the burst gap."""
+
+    __slots__ = ("start_ns", "end_ns", "keys")
+
+    def __init__(self, start_ns, end_ns, keys):
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.keys = keys
+
+    @property
+    def duration(self):
+        """Seconds between the first and the last key press."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def keys_per_second(self):
+        # A single key (or a very short burst) counts as one second of typing
+        return self.keys / max(self.duration, 1.0)
+
+
+class TypingBurstAggregator:
+    """
+    Merges key press timestamps into TypingBursts.
+
+    Feed it timestamps in order; a burst ends when the next key comes more than
+    `gap_seconds` after the previous one. Key identity is never involved.
+    """
+
+    def __init__(self, gap_seconds=2.0):
+        self.gap_ns = int(gap_seconds * 1e9)
+        self._current = None
+
+    def add(self, timestamp_ns):
+        """
+        Adds one key press.
+
+        Returns:
+            TypingBurst: The burst this key closed, or None.
+        """
+        current = self._current
+        if current is not None and timestamp_ns - current.end_ns <= self.gap_ns:
+            current.end_ns = timestamp_ns
+            current.keys += 1
+            return None
+        self._current = TypingBurst(timestamp_ns, timestamp_ns, 1)
+        return current
+
+    def flush(self):
+        """Returns the burst in progress (or None) and starts over."""
+        current, self._current = self._current, None
+        return current
+
+
+class InputEventLog:
+    """
+    Compact, append-only store of input events.
+
+    Events are stored column-wise in typed arrays (kind, monotonic ns timestamp,
+    x, y, button, scroll dx/dy), about 22 bytes per event, and read back as InputEvent
+    records. The text lines sent to the model are only rendered by `render()`
+    when the prompt is built. A wall-clock anchor taken at creation converts the
+    monotonic timestamps back to time of day.
+
+    With `max_events`, only the newest events are kept (the full history then
+    lives in the session journal).
+    """
+
+    def __init__(self, start_ns=None, start_wall=None, max_events=None):
+        """
+        Args:
+            start_ns (int): time.monotonic_ns() anchor; defaults to now.
+            start_wall (float): time.time() at `start_ns`; defaults to now.
+            max_events (int): Keep at most about this many of the newest events (None keeps all).
+        """
+        self.start_ns = time.monotonic_ns() if start_ns is None else start_ns
+        self.start_wall = time.time() if start_wall is None else start_wall
+        self.max_events = max_events
+        self.dropped = 0
+        self._kinds = array("b")
+        self._timestamps = array("q")
+        self._xs = array("i")
+        self._ys = array("i")
+        self._buttons = array("b")
+        self._dxs = array("h")
+        self._dys = array("h")
+        self._lock = threading.Lock()
+
+    def add(self, kind, timestamp_ns, x=None, y=None, button=None, dx=0, dy=0):
+        """
+        Appends one event.
+
+        Args:
+            kind (str): One of EVENT_KINDS.
+            timestamp_ns (int): time.monotonic_ns() of the event.
+            x (int): Pointer x coordinate, if any.
+            y (int): Pointer y coordinate, if any.
+            button (str): Mouse button name ("left", "right", "middle"), if any.
+            dx (int): Horizontal scroll steps (SCROLL only).
+            dy (int): Vertical scroll steps (SCROLL only).
+        """
+        button_code = MOUSE_BUTTONS.index(button) if button in MOUSE_BUTTONS else 0
+        # The mouse and keyboard listeners run on different threads; keep the columns aligned
+        with self._lock:
+            self._kinds.append(EVENT_KINDS.index(kind))
+            self._timestamps.append(timestamp_ns)
+            self._xs.append(int(x or 0))
+            self._ys.append(int(y or 0))
+            self._buttons.append(button_code)
+            self._dxs.append(dx)
+            self._dys.append(dy)
+            # Trim in batches so the cost of shifting the arrays is amortized
+            if self.max_events and len(self._kinds) >= 2 * self.max_events:
+                excess = len(self._kinds) - self.max_events
+                for column in (self._kinds, self._timestamps, self._xs, self._ys, self._buttons, self._dxs, self._dys):
+                    del column[:excess]
+                self.dropped += excess
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def __getitem__(self, index):
+        kind = EVENT_KINDS[self._kinds[index]]
+        if kind == KEY:
+            return InputEvent(kind, self._timestamps[index])
+        return InputEvent(kind, self._timestamps[index], self._xs[index], self._ys[index],
+                          MOUSE_BUTTONS[self._buttons[index]], self._dxs[index], self._dys[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def elapsed(self, timestamp_ns):
+        """Seconds between the start of the log and `timestamp_ns`."""
+        return (timestamp_ns - self.start_ns) / 1e9
+
+    def wall_time(self, timestamp_ns):
+        """Converts a monotonic timestamp to a time.time() value."""
+        return self.start_wall + self.elapsed(timestamp_ns)
+
+    def typing_bursts(self, gap_seconds=2.0):
+        """Returns the key presses merged into TypingBursts, in order."""
+        aggregator = TypingBurstAggregator(gap_seconds)
+        bursts = []
+        for index in range(len(self)):
+            if EVENT_KINDS[self._kinds[index]] == KEY:
+                burst = aggregator.add(self._timestamps[index])
+                if burst:
+                    bursts.append(burst)
+        burst = aggregator.flush()
+        if burst:
+            bursts.append(burst)
+        return bursts
+
+    def clicks(self):
+        """Returns every click as a (timestamp_ns, x, y) tuple."""
+        click = EVENT_KINDS.index(CLICK)
+        return [(self._timestamps[i], self._xs[i], self._ys[i]) for i in range(len(self)) if self._kinds[i] == click]
+
+    def render(self, typing_gap=2.0, scroll_gap=1.0, exclude_clicks=None):
+        """
+        Renders the events as "[HH:MM:SS] ..." log lines.
+
+        Key presses become one line per typing session (see TypingBurstAggregator),
+        scroll steps one line per scroll session, mouse paths one line each, and a
+        press followed by a drag one "Drag" line.
+
+        Args:
+            typing_gap (float): Longest pause, in seconds, inside one typing session.
+            scroll_gap (float): Longest pause, in seconds, inside one scroll session.
+            exclude_clicks (set): Timestamps of clicks to leave out (e.g. those summarized as hotspots).
+
+        Returns:
+            list: The log lines, ordered by time.
+        """
+        exclude_clicks = exclude_clicks or ()
+        entries = []
+        presses = {}  # button -> (index in entries or None if excluded, click event)
+        path = []
+        scrolls = ScrollAggregator(scroll_gap)
+        sessions = []
+        for event in self:
+            if event.kind in (MOVE_START, MOVE):
+                if event.kind == MOVE_START and path:
+                    entries.append(self._path_entry(path))
+                    path = []
+                path.append((event.timestamp_ns, event.x, event.y))
+            elif event.kind == CLICK:
+                if event.timestamp_ns in exclude_clicks:
+                    presses[event.button] = (None, event)
+                    continue
+                label = "Mouse Click" if event.button in (None, "left") else f"Mouse {event.button.capitalize()} Click"
+                presses[event.button] = (len(entries), event)
+                entries.append((event.timestamp_ns, f"{label} at ({event.x}, {event.y})", event))
+            elif event.kind == DRAG and event.button in presses:
+                # Replace the click line with the whole drag
+                index, press = presses.pop(event.button)
+                start_ns = press.timestamp_ns
+                entry = (start_ns, f"Drag ({event.button}) from ({press.x}, {press.y}) to "
+                                   f"({event.x}, {event.y}) in {(event.timestamp_ns - start_ns) / 1e9:.1f}s", None)
+                if index is None:
+                    entries.append(entry)
+                else:
+                    entries[index] = entry
+            elif event.kind == SCROLL:
+                session = scrolls.add(event.timestamp_ns, event.x, event.y, event.dx, event.dy)
+                if session:
+                    sessions.append(session)
+        if path:
+            entries.append(self._path_entry(path))
+        session = scrolls.flush()
+        if session:
+            sessions.append(session)
+
+        entries = [(timestamp_ns, text) for timestamp_ns, text, _ in entries]
+        for session in sessions:
+            entries.append((session.start_ns, f"Scroll {session.direction} {session.steps} steps at "
+                                              f"({session.x}, {session.y}) in {session.duration:.1f}s"))
+        for burst in self.typing_bursts(typing_gap):
+            if burst.keys == 1:
+                text = "Typing: 1 key"
+            else:
+                text = (f"Typing: {burst.keys} keys in {burst.duration:.1f}s ({burst.keys_per_second:.1f} keys/s) "
+                        f"until {self.clock(burst.end_ns)}")
+            entries.append((burst.start_ns, text))
+        entries.sort(key=lambda entry: entry[0])
+        return [f"[{self.clock(timestamp_ns)}] {text}" for timestamp_ns, text in entries]
+
+    @staticmethod
+    def _path_entry(points):
+        start_ns, x0, y0 = points[0]
+        end_ns, x1, y1 = points[-1]
+        text = (f"Mouse path from ({x0}, {y0}) to ({x1}, {y1}): {path_length(points):.0f} px "
+                f"in {(end_ns - start_ns) / 1e9:.1f}s, {max(0, len(points) - 2)} turns")
+        return start_ns, text, None
+
+    def clock(self, timestamp_ns):
+        """Formats a monotonic ns timestamp as HH:MM:SS (local time)."""
+        return datetime.fromtimestamp(self.wall_time(timestamp_ns)).strftime("%H:%M:%S")
@@ -0,0 +1,168 @@
+from src.utils.recorder_stats import LatencyHistogram
+
+# Dwell-time bucket upper bounds in milliseconds (1 s ... 1 h, roughly logarithmic)
+DWELL_BUCKETS_MS = (1000, 2000, 5000, 10000, 15000, 30000, 60000, 120000, 300000, 600000, 1200000, 1800000, 3600000)
+
+
+def format_duration(seconds):
+    """Formats seconds as "42s", "3m05s" or "1h02m"."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02}m"
+
+
+class DirectlyFollowsGraph:
+    """
+    Directly-follows graph of activities, maintained incrementally.
+
+    Every `add()` is O(1): it bumps the activity's visit count, the count of
+    the edge from the previous activity, and records how long the previous
+    activity lasted in a fixed-bucket histogram (mean and percentiles without
+    keeping the samples). Memory only grows with the number of distinct
+    activities and edges, not with the session length.
+
+    Activities are any hashable ids, e.g. the title ids of a TitleDictionary.
+    Several cases (sessions) can be fed interleaved by passing `case`; edges
+    never cross cases. Repeating the current activity adds a visit but no edge.
+    """
+
+    def __init__(self, buckets_ms=DWELL_BUCKETS_MS):
+        """
+        Args:
+            buckets_ms (tuple): Dwell-time histogram bucket bounds, in milliseconds.
+        """
+        self.buckets_ms = buckets_ms
+        self.frequencies = {}        # activity -> visits
+        self.transitions = {}        # (from, to) -> count
+        self.dwell = {}              # activity -> LatencyHistogram of visit durations
+        self.start_activities = {}   # activity -> cases that started with it
+        self.events = 0
+        self._open = {}      # case -> (activity, start timestamp) of the visit in progress
+        self._previous = {}  # case -> last activity, kept across pauses so the flow stays connected
+
+    @property
+    def start_activity(self):
+        """Most common first activity."""
+        return max(self.start_activities, key=self.start_activities.get) if self.start_activities else None
+
+    def add(self, activity, timestamp, case=None):
+        """
+        Records that `activity` became active.
+
+        Args:
+            activity: Activity id.
+            timestamp (float): Seconds, on any clock used consistently (e.g. time.time()).
+            case: Case (session) the event belongs to.
+        """
+        self._close(case, timestamp)
+        self.events += 1
+        self.frequencies[activity] = self.frequencies.get(activity, 0) + 1
+        previous = self._previous.get(case)
+        if previous is None:
+            self.start_activities[activity] = self.start_activities.get(activity, 0) + 1
+        elif previous != activity:
+            edge = (previous, activity)
+            self.transitions[edge] = self.transitions.get(edge, 0) + 1
+        self._open[case] = (activity, timestamp)
+        self._previous[case] = activity
+
+    def pause(self, timestamp, case=None):
+        """Ends the current visit without a transition (e.g. the user went idle)."""
+        self._close(case, timestamp)
+
+    def finish(self, timestamp):
+        """Ends the visits in progress of every case."""
+        for case in list(self._open):
+            self._close(case, timestamp)
+
+    def end_case(self, case, timestamp=None):
+        """
+        Ends a case; its next event starts a new trace.
+
+        Args:
+            timestamp (float): End of the last visit; without it (e.g. an imported
+                log of instantaneous events) the last visit has no known duration and
+                is not counted in the dwell times.
+        """
+        if timestamp is None:
+            self._open.pop(case, None)
+        else:
+            self._close(case, timestamp)
+        self._previous.pop(case, None)
+
+    def _close(self, case, timestamp):
+        visit = self._open.pop(case, None)
+        if visit is None:
+            return
+        activity, start = visit
+        histogram = self.dwell.get(activity)
+        if histogram is None:
+            histogram = self.dwell[activity] = LatencyHistogram(self.buckets_ms)
+        histogram.record(max(0.0, timestamp - start))
+
+    def activity_stats(self, label=str):
+        """
+        Per-activity statistics, longest total time first.
+
+        Args:
+            label (callable): Turns an activity id into its display name.
+
+        Returns:
+            list: Dicts with id, label, visits, total_s, mean_s, p50_s, p95_s and max_s.
+        """
+        stats = []
+        for activity, visits in self.frequencies.items():
+            histogram = self.dwell.get(activity)
+            summary = histogram.summary() if histogram else None
+            stats.append({
+                "id": activity,
+                "label": label(activity),
+                "visits": visits,
+                "total_s": histogram.total / 1000.0 if histogram else 0.0,
+                "mean_s": summary["mean_ms"] / 1000.0 if summary else 0.0,
+                "p50_s": summary["p50_ms"] / 1000.0 if summary else 0.0,
+                "p95_s": summary["p95_ms"] / 1000.0 if summary else 0.0,
+                "max_s": summary["max_ms"] / 1000.0 if summary else 0.0,
+            })
+        stats.sort(key=lambda item: (-item["total_s"], -item["visits"]))
+        return stats
+
+    def top_transitions(self, limit=10, label=str):
+        """
+        Most frequent edges.
+
+        Returns:
+            list: Dicts with from, to, from_label, to_label and count, most frequent first.
+        """
+        edges = sorted(self.transitions.items(), key=lambda item: -item[1])[:limit]
+        return [{"from": a, "to": b, "from_label": label(a), "to_label": label(b), "count": count}
+                for (a, b), count in edges]
+
+
+def describe_graph(graph, label, max_activities=10, max_transitions=10):
+    """
+    Short text summary of a DirectlyFollowsGraph for the prompt.
+
+    Args:
+        graph (DirectlyFollowsGraph): The graph.
+        label (callable): Turns an activity id into its display name.
+        max_activities (int): Activities listed (by total time).
+        max_transitions (int): Transitions listed (by count).
+
+    Returns:
+        list: Summary lines (empty when there was no activity).
+    """
+    if not graph.frequencies:
+        return []
+    lines = [f"Process graph: {len(graph.frequencies)} activities, {len(graph.transitions)} distinct transitions, "
+             f"{graph.events} activity switches."]
+    for item in graph.activity_stats(label)[:max_activities]:
+        lines.append(f"Activity {item['label']}: {item['visits']} visits, {format_duration(item['total_s'])} total, "
+                     f"mean {format_duration(item['mean_s'])}, p50 <= {format_duration(item['p50_s'])}, "
+                     f"p95 <= {format_duration(item['p95_s'])}")
+    for edge in graph.top_transitions(max_transitions, label):
+        lines.append(f"Transition {edge['from_label']} -> {edge['to_label']}: {edge['count']} times")
+    return lines
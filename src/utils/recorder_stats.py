@@ -0,0 +1,130 @@
+import bisect
+import threading
+import time
+
+# Bucket upper bounds in milliseconds (roughly logarithmic)
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 15, 20, 25, 33, 40, 50, 67, 80, 100, 110, 125, 150, 200, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations; O(1) memory, thread-safe."""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Adds one duration, in seconds."""
+        ms = seconds * 1000.0
+        index = bisect.bisect_left(self.buckets_ms, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += ms
+            if ms > self.max:
+                self.max = ms
+
+    def percentile(self, fraction):
+        """Approximate percentile (upper bound of the bucket), in milliseconds."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max
+            return self.max
+
+    def summary(self):
+        """Returns count, mean, p50, p95, max (ms) and the raw bucket counts."""
+        mean = self.total / self.count if self.count else 0.0
+        buckets = {f"<={bound}ms": count for bound, count in zip(self.buckets_ms, self.counts)}
+        buckets[f">{self.buckets_ms[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(mean, 2),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets": buckets,
+        }
+
+
+class RecorderStats:
+    """Per-stage timing of the recording pipeline and the frame rate actually achieved."""
+
+    STAGES = ("capture", "convert", "encode", "frame_interval")
+
+    def __init__(self, target_fps):
+        self.target_fps = target_fps
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.frames = 0
+        self.missed_deadlines = 0
+        self._started = None
+        self._stopped = None
+        self._last_frame = None
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._started = time.monotonic()
+        self._stopped = None
+        self._last_frame = None
+        self._paused_at = None
+        self._paused_total = 0.0
+
+    def stop(self):
+        """Freezes the elapsed time used by `achieved_fps`."""
+        self.resume()
+        self._stopped = time.monotonic()
+
+    def pause(self):
+        """Stops the clock while the capture is paused, so idle time does not lower the frame rate."""
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+
+    def resume(self):
+        """Restarts the clock; the first frame after a pause does not count as a frame interval."""
+        with self._lock:
+            if self._paused_at is not None:
+                self._paused_total += time.monotonic() - self._paused_at
+                self._paused_at = None
+                self._last_frame = None
+
+    def record(self, stage, seconds):
+        self.histograms[stage].record(seconds)
+
+    def frame_captured(self, timestamp, missed=0):
+        """Counts a captured frame at `timestamp` (monotonic seconds)."""
+        with self._lock:
+            if self._last_frame is not None:
+                self.histograms["frame_interval"].record(timestamp - self._last_frame)
+            self._last_frame = timestamp
+            self.frames += 1
+            self.missed_deadlines += missed
+
+    def achieved_fps(self):
+        """Average capture rate since the start of the recording."""
+        if not self._started or not self.frames:
+            return 0.0
+        end = self._stopped or self._paused_at or time.monotonic()
+        elapsed = end - self._started - self._paused_total
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """Returns a dict with the frame rates, missed deadlines and every stage histogram."""
+        return {
+            "target_fps": self.target_fps,
+            "achieved_fps": round(self.achieved_fps(), 2),
+            "frames": self.frames,
+            "missed_deadlines": self.missed_deadlines,
+            "latency": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+        }
@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+import cv2
+from src.utils.video_encoders import BACKEND_AUTO, create_encoder, resolve_backend
+
+
+class SegmentedVideoWriter:
+    """
+    Writes frames to MP4, optionally rotating into numbered, self-contained chunks.
+
+    With rotation enabled, `recording.mp4` becomes `recording_part000.mp4`,
+    `recording_part001.mp4`, ... Each chunk is closed (and therefore playable on
+    its own) before the next one starts, and `recording.manifest.json` lists the
+    start and end time of every finished chunk. The real capture time of every
+    written frame goes to `recording.timestamps.csv`.
+    """
+
+    def __init__(self, output_file, fps, size, segment_seconds=0, segment_mb=0, on_segment_complete=None,
+                 backend=BACKEND_AUTO, encoder_options=None):
+        """
+        Args:
+            output_file (str): Path of the video (base name of the chunks when segmenting).
+            fps (float): Nominal frame rate written to the container.
+            size (tuple): (width, height) of the frames.
+            segment_seconds (float): Rotate after this many seconds of recording (0 disables).
+            segment_mb (float): Rotate once a chunk reaches this many megabytes (0 disables).
+            on_segment_complete (callable): Called with the segment dict each time a chunk is closed.
+                Runs on the encoder thread, so it must return quickly.
+            backend (str): Encoder backend ("auto", "opencv" or "ffmpeg").
+            encoder_options (dict): Backend options such as crf, preset or tune.
+        """
+        self.output_file = output_file
+        self.fps = fps
+        self.size = tuple(size)
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = int(segment_mb * 1024 * 1024)
+        self.on_segment_complete = on_segment_complete
+        self.segmented = bool(segment_seconds or segment_mb)
+        self.encoder_options = dict(encoder_options or {})
+        self.backend = resolve_backend(backend, self.encoder_options.get("ffmpeg_path"))
+
+        base = os.path.splitext(output_file)[0]
+        self.base_path = base
+        self.timestamps_file = base + ".timestamps.csv"
+        self.manifest_file = base + ".manifest.json"
+
+        self.segments = []
+        self.frames_written = 0
+        self._writer = None
+        self._current = None
+        self._last_timestamp = 0.0
+        self._timestamps = open(self.timestamps_file, "w", encoding="utf-8")
+        self._timestamps.write("frame,timestamp_s,segment\n")
+
+    def write(self, frame, timestamp):
+        """
+        Writes one BGR frame.
+
+        Args:
+            frame (np.ndarray): Frame of `size`.
+            timestamp (float): Seconds since the start of the recording.
+        """
+        if self._writer is None:
+            self._open_segment(timestamp)
+        elif self._should_rotate(timestamp):
+            self._close_segment(timestamp)
+            self._open_segment(timestamp)
+
+        self._writer.write(frame)
+        self._timestamps.write(f"{self.frames_written},{timestamp:.3f},{self._current['index']}\n")
+        self._current["frames"] += 1
+        self.frames_written += 1
+        self._last_timestamp = timestamp
+
+    def close(self, end_timestamp=None):
+        """Closes the current chunk, the timestamp track and the manifest."""
+        if self._writer is not None:
+            self._close_segment(self._last_timestamp if end_timestamp is None else end_timestamp)
+        if self._timestamps:
+            self._timestamps.close()
+            self._timestamps = None
+
+    @property
+    def paths(self):
+        """Paths of the finished chunks, in order."""
+        return [segment["path"] for segment in self.segments]
+
+    def _segment_path(self, index):
+        if not self.segmented:
+            return self.output_file
+        return f"{self.base_path}_part{index:03d}.mp4"
+
+    def _should_rotate(self, timestamp):
+        if not self.segmented or self._current["frames"] == 0:
+            return False
+        if self.segment_seconds and timestamp - self._current["start_s"] >= self.segment_seconds:
+            return True
+        if self.segment_bytes and self._current["frames"] % max(1, int(self.fps)) == 0:
+            # The MP4 grows as frames are written; stat it about once per second of video
+            return os.path.getsize(self._current["path"]) >= self.segment_bytes
+        return False
+
+    def _open_segment(self, timestamp):
+        index = len(self.segments)
+        path = self._segment_path(index)
+        self._writer = create_encoder(path, self.fps, self.size, backend=self.backend,
+                                      options=self.encoder_options)
+        self._current = {"index": index, "path": path, "start_s": round(timestamp, 3),
+                         "end_s": None, "frames": 0, "bytes": 0}
+
+    def _close_segment(self, timestamp):
+        self._writer.release()
+        self._writer = None
+        segment = self._current
+        self._current = None
+        segment["end_s"] = round(timestamp, 3)
+        segment["bytes"] = os.path.getsize(segment["path"]) if os.path.exists(segment["path"]) else 0
+        self.segments.append(segment)
+
+        if self.segmented:
+            self._write_manifest()
+        if self.on_segment_complete:
+            try:
+                self.on_segment_complete(segment)
+            except Exception as e:
+                print(f"Error in segment callback: {e}")
+
+    def _write_manifest(self):
+        manifest = {
+            "video": self.output_file,
+            "fps": self.fps,
+            "encoder": self.backend,
+            "size": list(self.size),
+            "timestamps": self.timestamps_file,
+            "segments": self.segments,
+        }
+        tmp_path = self.manifest_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_file)
+
+
+def read_frame_at(video_paths, timestamps_file, timestamp_s):
+    """
+    Reads the recorded frame closest to a moment of the recording.
+
+    Uses the timestamp track to find the frame and its chunk; without it the
+    frame is located at `timestamp_s * fps` in the first video.
+
+    Args:
+        video_paths (list): Chunks of the recording, in order.
+        timestamps_file (str): The `<video>.timestamps.csv` written with them.
+        timestamp_s (float): Seconds since the start of the recording.
+
+    Returns:
+        np.ndarray: The BGR frame, or None if it cannot be read.
+    """
+    segment, frame_in_segment = 0, None
+    if timestamps_file and os.path.exists(timestamps_file):
+        best, first_frame = None, {}
+        with open(timestamps_file, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                index, chunk = int(row["frame"]), int(row["segment"])
+                first_frame.setdefault(chunk, index)
+                distance = abs(float(row["timestamp_s"]) - timestamp_s)
+                if best is None or distance < best[0]:
+                    best = (distance, index, chunk)
+        if best is not None:
+            _, index, segment = best
+            frame_in_segment = index - first_frame[segment]
+
+    if segment >= len(video_paths):
+        return None
+    cap = cv2.VideoCapture(video_paths[segment])
+    try:
+        if not cap.isOpened():
+            return None
+        if frame_in_segment is None:
+            frame_in_segment = int(timestamp_s * (cap.get(cv2.CAP_PROP_FPS) or 1))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total > 0:
+            frame_in_segment = min(frame_in_segment, total - 1)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_in_segment)
+        ok, frame = cap.read()
+        return frame if ok else None
+    finally:
+        cap.release()
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Levenshtein distance between two integer sequences.
+
+    Works one row of the DP table at a time with numpy: substitutions and
+    deletions are element-wise, and insertions (which depend on the cell to the
+    left) become a running minimum, since row[j] = j + min(candidate[k] - k, k <= j).
+
+    Args:
+        a (sequence): Activity ids.
+        b (sequence): Activity ids.
+        max_distance (int): Cap: any distance above it is returned as
+            `max_distance + 1`, stopping early once it must be exceeded.
+
+    Returns:
+        int: Insertions, deletions and substitutions turning `a` into `b`.
+    """
+    a = np.asarray(a, dtype=np.int32)
+    b = np.asarray(b, dtype=np.int32)
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    if not len(b):
+        return len(a)
+
+    offsets = np.arange(len(b) + 1, dtype=np.int32)
+    row = offsets.copy()
+    candidates = np.empty_like(row)
+    for i, symbol in enumerate(a, start=1):
+        candidates[0] = i
+        np.minimum(row[1:] + 1, row[:-1] + (b != symbol), out=candidates[1:])
+        row = np.minimum.accumulate(candidates - offsets) + offsets
+        if max_distance is not None and row.min() > max_distance:
+            return max_distance + 1
+    if max_distance is not None:
+        return min(int(row[-1]), max_distance + 1)
+    return int(row[-1])
+
+
+def nearest_centers(task):
+    """
+    Nearest center of each sequence, by normalized edit distance.
+
+    Module-level so it can run in a ProcessPoolExecutor.
+
+    Args:
+        task (tuple): (sequences, centers, threshold). Distances are divided by
+            the longer length; pairs beyond `threshold` are cut short.
+
+    Returns:
+        list: (center index or None, normalized distance or None) per sequence.
+    """
+    sequences, centers, threshold = task
+    results = []
+    for sequence in sequences:
+        best, best_distance = None, None
+        for index, center in enumerate(centers):
+            longest = max(len(sequence), len(center)) or 1
+            limit = int(threshold * longest)
+            if best_distance is not None:
+                limit = min(limit, int(best_distance * longest))
+            distance = edit_distance(sequence, center, limit)
+            if distance <= limit:
+                normalized = distance / longest
+                if best_distance is None or normalized < best_distance:
+                    best, best_distance = index, normalized
+        results.append((best, best_distance))
+    return results
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+HASH_CHUNK_BYTES = 1024 * 1024
+DEFAULT_TTL_SECONDS = 47 * 3600   # Gemini deletes uploaded files after 48 h
+EXPIRY_MARGIN_SECONDS = 600       # Entries this close to expiring are not reused
+
+
+def file_sha256(path, chunk_size=HASH_CHUNK_BYTES):
+    """SHA-256 hex digest of a file, read in fixed-size chunks so large videos are never loaded whole."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        chunk = f.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            chunk = f.read(chunk_size)
+    return digest.hexdigest()
+
+
+class UploadCache:
+    """
+    Content-addressed record of the videos already uploaded to Gemini.
+
+    Entries are keyed by the SHA-256 of the file, so a re-analysis of the same
+    recording (or a copy of it) finds the uploaded file whatever its path, and
+    hold the Gemini file name, its expiry and the account (API key
+    fingerprint) it belongs to. The digest of each path is remembered with its
+    size and mtime, so an unchanged file is not hashed twice.
+
+    The cache is a small JSON file, rewritten atomically on every change.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): JSON file of the cache.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}  # sha256 -> {"name", "uri", "account", "expires", "size"}
+        self._paths = {}    # file path -> {"sha256", "size", "mtime_ns"}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Upload cache unreadable, starting empty: {e}")
+            return
+        now = time.time()
+        self._entries = {digest: entry for digest, entry in data.get("uploads", {}).items()
+                         if entry.get("expires", 0) > now}
+        self._paths = data.get("paths", {})
+
+    def _save(self):
+        """Writes the cache; called with the lock held."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"uploads": self._entries, "paths": self._paths}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def digest(self, path):
+        """
+        SHA-256 of a file, reusing the remembered digest while its size and mtime are unchanged.
+
+        Args:
+            path (str): File to hash.
+
+        Returns:
+            str: Hex digest.
+        """
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            known = self._paths.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        digest = file_sha256(path)
+        with self._lock:
+            self._paths[key] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            # Forget paths that no longer exist so the file stays small
+            self._paths = {p: info for p, info in self._paths.items() if os.path.exists(p)}
+            self._save()
+        return digest
+
+    def get(self, digest, account=None):
+        """
+        Cached upload of a file, if it is still usable.
+
+        Args:
+            digest (str): SHA-256 of the file.
+            account (str): Fingerprint of the API key in use; uploads of another account are ignored.
+
+        Returns:
+            dict: The entry (name, uri, account, expires, size), or None.
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+        if entry is None or entry.get("account") != account:
+            return None
+        if entry["expires"] - EXPIRY_MARGIN_SECONDS <= time.time():
+            self.remove(digest)
+            return None
+        return entry
+
+    def put(self, digest, video_file, size=None, account=None):
+        """
+        Records an uploaded, processed file.
+
+        Args:
+            digest (str): SHA-256 of the local file.
+            video_file: The Gemini file (name, uri and, when known, expiration_time).
+            size (int): Local file size, in bytes.
+            account (str): Fingerprint of the API key the file was uploaded with.
+        """
+        expiration = getattr(video_file, "expiration_time", None)
+        try:
+            expires = expiration.timestamp()
+        except (AttributeError, TypeError, ValueError, OSError):
+            expires = time.time() + DEFAULT_TTL_SECONDS
+        entry = {
+            "name": video_file.name,
+            "uri": getattr(video_file, "uri", None),
+            "account": account,
+            "expires": expires,
+            "size": size,
+        }
+        with self._lock:
+            self._entries[digest] = entry
+            now = time.time()
+            self._entries = {d: e for d, e in self._entries.items() if e["expires"] > now}
+            self._save()
+
+    def remove(self, digest):
+        """Forgets an upload (expired, failed or deleted on the server)."""
+        with self._lock:
+            if self._entries.pop(digest, None) is not None:
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def account_fingerprint(api_key):
+    """Short, non-reversible id of an API key, to tell apart uploads of different accounts."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] if api_key else None
@@ -0,0 +1,180 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import cv2
+
+# Encoder backends
+BACKEND_AUTO = "auto"
+BACKEND_OPENCV = "opencv"
+BACKEND_FFMPEG = "ffmpeg"
+
+
+class OpenCVEncoder:
+    """Writes BGR frames with cv2.VideoWriter (mp4v by default). Always available."""
+
+    name = BACKEND_OPENCV
+
+    def __init__(self, output_file, fps, size, fourcc="mp4v"):
+        """
+        Args:
+            output_file (str): Path of the MP4 file.
+            fps (float): Frame rate written to the container.
+            size (tuple): (width, height) of the frames.
+            fourcc (str): Four-character codec code.
+        """
+        self.output_file = output_file
+        self._writer = cv2.VideoWriter(output_file, cv2.VideoWriter_fourcc(*fourcc), fps, tuple(size))
+        if not self._writer.isOpened():
+            raise RuntimeError(f"OpenCV could not open a '{fourcc}' writer for {output_file}")
+
+    @staticmethod
+    def available():
+        return True
+
+    def write(self, frame):
+        self._writer.write(frame)
+
+    def release(self):
+        self._writer.release()
+
+
+class FFmpegPipeEncoder:
+    """
+    Streams raw BGR frames to an ffmpeg process encoding H.264 (libx264).
+
+    Screen content (flat areas, sharp text, little motion) compresses far better
+    with x264 than with mp4v, which directly shrinks the upload to Gemini.
+    """
+
+    name = BACKEND_FFMPEG
+
+    def __init__(self, output_file, fps, size, crf=28, preset="veryfast", tune="stillimage", ffmpeg_path=None):
+        """
+        Args:
+            output_file (str): Path of the MP4 file.
+            fps (float): Frame rate written to the container.
+            size (tuple): (width, height) of the frames.
+            crf (int): x264 constant rate factor (higher is smaller and blurrier).
+            preset (str): x264 speed/size preset (ultrafast ... veryslow).
+            tune (str): x264 tune; "stillimage" suits mostly static screens, None disables it.
+            ffmpeg_path (str): ffmpeg executable; defaults to the one on PATH.
+        """
+        executable = ffmpeg_path or FFmpegPipeEncoder.find_executable()
+        if not executable:
+            raise RuntimeError("ffmpeg executable not found.")
+
+        width, height = size
+        self.output_file = output_file
+        command = [
+            executable, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            "-an", "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+        ]
+        if tune:
+            command += ["-tune", tune]
+        command += ["-pix_fmt", "yuv420p", "-movflags", "+faststart", output_file]
+
+        # stderr goes to a file: a pipe that is only read at close would fill up
+        # on a long encode with warnings and block the frame writes
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr,
+            # Avoid flashing a console window on Windows
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+
+    @staticmethod
+    def find_executable(ffmpeg_path=None):
+        """Returns the ffmpeg executable to use, or None if there is none."""
+        candidate = ffmpeg_path or os.environ.get("FFMPEG_PATH")
+        if candidate and os.path.isfile(candidate):
+            return candidate
+        return shutil.which("ffmpeg")
+
+    @staticmethod
+    def available(ffmpeg_path=None):
+        return FFmpegPipeEncoder.find_executable(ffmpeg_path) is not None
+
+    def write(self, frame):
+        try:
+            # Pass the frame buffer directly; cvtColor output is already contiguous
+            self._process.stdin.write(frame.data if frame.flags["C_CONTIGUOUS"] else frame.tobytes())
+        except (BrokenPipeError, OSError):
+            raise RuntimeError(f"ffmpeg stopped unexpectedly: {self._read_error()}")
+
+    def release(self):
+        if self._process.stdin and not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        if self._process.wait() != 0:
+            print(f"ffmpeg exited with code {self._process.returncode}: {self._read_error()}")
+        self._stderr.close()
+
+    def _read_error(self, max_bytes=4096):
+        """Last `max_bytes` of ffmpeg's error output."""
+        try:
+            self._stderr.seek(0, os.SEEK_END)
+            self._stderr.seek(max(0, self._stderr.tell() - max_bytes))
+            return self._stderr.read().decode(errors="replace").strip()
+        except Exception:
+            return ""
+
+
+ENCODER_BACKENDS = {
+    BACKEND_OPENCV: OpenCVEncoder,
+    BACKEND_FFMPEG: FFmpegPipeEncoder,
+}
+
+
+def resolve_backend(backend=BACKEND_AUTO, ffmpeg_path=None):
+    """
+    Picks the encoder backend to use.
+
+    "auto" prefers ffmpeg when an executable is found and falls back to OpenCV.
+    """
+    if backend == BACKEND_AUTO:
+        return BACKEND_FFMPEG if FFmpegPipeEncoder.available(ffmpeg_path) else BACKEND_OPENCV
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend}")
+    return backend
+
+
+def create_encoder(output_file, fps, size, backend=BACKEND_AUTO, options=None):
+    """
+    Creates an encoder for `output_file`.
+
+    Args:
+        output_file (str): Path of the MP4 file.
+        fps (float): Frame rate written to the container.
+        size (tuple): (width, height) of the frames.
+        backend (str): "auto", "opencv" or "ffmpeg".
+        options (dict): Extra keyword arguments for the backend (e.g. crf, preset, tune).
+
+    Returns:
+        An object with `write(frame)` and `release()`.
+    """
+    options = dict(options or {})
+    backend = resolve_backend(backend, options.get("ffmpeg_path"))
+    if backend == BACKEND_OPENCV:
+        # x264 tuning options do not apply to the OpenCV writer
+        options = {key: value for key, value in options.items() if key == "fourcc"}
+    else:
+        options.pop("fourcc", None)
+    return ENCODER_BACKENDS[backend](output_file, fps, size, **options)
+
+
+def is_playable(path):
+    """Returns True if the first frame of a video file can be decoded (e.g. after a crash)."""
+    capture = cv2.VideoCapture(path)
+    try:
+        ok, _ = capture.read()
+        return bool(ok)
+    finally:
+        capture.release()
@@ -0,0 +1,110 @@
+import re
+import sys
+
+# Separators browsers and desktop apps put between the document and the application name
+_APP_SEPARATOR = re.compile(r"\s+[-\u2013\u2014|]\s+")
+
+# Volatile parts of window titles, replaced in order
+_VOLATILE = [
+    (re.compile(r"^\s*[(\[]\d+\+?[)\]]\s*"), ""),                             # "(3) Inbox", "[12] Chat" unread counters
+    (re.compile(r"\s*[(\[]\d+\+?[)\]]\s*$"), ""),                             # "Chat (3)"
+    (re.compile(r"\b(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})\b"), "<date>"),
+    (re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?\b"), "<time>"),
+    (re.compile(r"(?<!\S)(?:[A-Za-z]:\\|\\\\|~?/)(?:[^\\/\s]+[\\/])+([^\\/\s]+)"), r"\1"),  # Paths: keep the file name
+    (re.compile(r"\b\d{4,}\b"), "<n>"),                                        # Record / ticket / order numbers
+    (re.compile(r"\s{2,}"), " "),
+]
+
+
+def normalize_title(title):
+    """
+    Collapses the volatile parts of a window title (unread counters, dates,
+    times, long numbers and directories) so that the same screen always gets
+    the same key, e.g. "(3) Pedido 48213 - C:\\Vendas\\pedidos.xlsx - Excel"
+    becomes "Pedido <n> - pedidos.xlsx - Excel".
+    """
+    for pattern, replacement in _VOLATILE:
+        title = pattern.sub(replacement, title)
+    return title.strip()
+
+
+def split_application(title):
+    """
+    Splits a title into (document, application) at its last separator, e.g.
+    "Inbox - Google Chrome" -> ("Inbox", "Google Chrome"). Titles without a
+    separator are taken as the application name alone.
+    """
+    matches = list(_APP_SEPARATOR.finditer(title))
+    if not matches:
+        return "", title
+    last = matches[-1]
+    return title[:last.start()], title[last.end():]
+
+
+class TitleDictionary:
+    """
+    Interns window titles as small integer ids.
+
+    Each id stands for one normalized title (see `normalize_title`), so titles
+    that only differ in volatile parts share an id; its label, application and
+    document are stored once. Raw titles seen recently are cached to skip the
+    regular expressions on repeated polls.
+    """
+
+    def __init__(self, cache_size=4096):
+        """
+        Args:
+            cache_size (int): Raw titles remembered before the raw-title cache is cleared.
+        """
+        self.cache_size = cache_size
+        self._ids = {}          # normalized title -> id
+        self._labels = []       # id -> normalized title
+        self._applications = []  # id -> application name (interned)
+        self._documents = []    # id -> document part
+        self._raw = {}          # raw title -> id
+
+    def __len__(self):
+        return len(self._labels)
+
+    def intern(self, title):
+        """
+        Returns the id of a raw window title, adding it if it is new.
+
+        Args:
+            title (str): Title as reported by the OS (None for no active window).
+        """
+        title = title or ""
+        title_id = self._raw.get(title)
+        if title_id is not None:
+            return title_id
+
+        label = normalize_title(title)
+        title_id = self._ids.get(label)
+        if title_id is None:
+            title_id = len(self._labels)
+            document, application = split_application(label)
+            self._ids[label] = title_id
+            self._labels.append(label)
+            self._applications.append(sys.intern(application))
+            self._documents.append(document)
+
+        if len(self._raw) >= self.cache_size:
+            self._raw.clear()
+        self._raw[title] = title_id
+        return title_id
+
+    def label(self, title_id):
+        """Normalized title of an id."""
+        return self._labels[title_id]
+
+    def application(self, title_id):
+        """Application name of an id (e.g. "Google Chrome")."""
+        return self._applications[title_id]
+
+    def document(self, title_id):
+        """Title without the application suffix ("" when there is none)."""
+        return self._documents[title_id]
+
+    def applications(self):
+        """Distinct application names, in order of first appearance."""
+        return list(dict.fromkeys(self._applications))